@@ -50,14 +50,41 @@ Each entry in the jsonl file is a valid json/dictionary with the following struc
     "differentiation": "Unlike traditional multi-step checkout processes that require users to navigate through cart, billing, and shipping pages, One-Click ordering completes purchases instantly with minimal user effort. This dramatically reduces purchase friction, decreases abandonment rates, and creates a competitive advantage through superior user experience, particularly on mobile devices where lengthy checkout flows are especially cumbersome."
 }
 
+# Incremental compile
+A manifest next to the output ({category}_output.manifest.json) remembers every compiled file by
+mtime/size and sha256. A re-run only reads the new or changed files (in parallel, COMPILE_WORKERS threads),
+then merges their entries into the sorted output with a streaming k-way merge: the existing jsonl is read
+line by line, never loaded whole. Nothing is rewritten if no file changed. If the output was modified
+outside this script, the manifest no longer matches it and everything is recompiled.
+When several files hold the same publication number, the most recently modified one wins.
+
+# All categories
+With --all, every category under output/ is compiled in parallel (one process per category), then:
+- output/corpus_output.jsonl: every compiled entry with its "category", sorted by publication number
+  (k-way merge of the per-category outputs), with a publication_number -> byte offset sidecar
+  (corpus_output.jsonl.idx, same format as the knowledge index sidecars of patent_index.py),
+- output/compile_report.json: per category, the missing and unexpected patents, computed with set operations
+  against every knowledge/*/*.jsonl index, each read once. Unexpected patents expected in another category are
+  reported as misfiled, patents compiled in several categories as duplicates (the corpus keeps the first category).
+
 # Run
 uv run compile_result.py
+uv run compile_result.py --all
 '''
 
+import argparse
+import concurrent.futures
+import hashlib
+import heapq
 import json
 import os
+import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from patent_crew.patent_index import OFFSET_INDEX_SUFFIX
 
 # --- Configuration ---
 
@@ -73,6 +100,18 @@ INPUT_JSONL_DIR = PROJECT_ROOT / f"output/{CATEGORY}"
 OUTPUT_DIR = PROJECT_ROOT / f"output/{CATEGORY}"
 OUTPUT_JSONL_FILE = OUTPUT_DIR / f"{CATEGORY}_output.jsonl"
 
+INCREMENTAL = True # Only read files added or changed since the last compile (see the manifest above); False recompiles everything
+COMPILE_WORKERS = 8 # Threads reading and validating the output files
+READ_CHUNK_SIZE = 1000 # Files submitted to the threads at once
+
+# --all mode
+KNOWLEDGE_ROOT = PROJECT_ROOT / "knowledge"
+OUTPUT_ROOT = PROJECT_ROOT / "output"
+CORPUS_JSONL_FILE = OUTPUT_ROOT / "corpus_output.jsonl"
+COMPILE_REPORT_FILE = OUTPUT_ROOT / "compile_report.json"
+# Max categories compiled concurrently (None = one process per category, up to the CPU count)
+CATEGORY_WORKERS = None
+
 # --- End Configuration ---
 
 def get_expected_publication_numbers(jsonl_file: Path) -> set:
@@ -92,7 +131,7 @@ def get_expected_publication_numbers(jsonl_file: Path) -> set:
                 print(f"Warning: Could not decode JSON from line in {jsonl_file}: {line.strip()}")
     return expected_numbers
 
-def validate_entry(entry: dict) -> bool:
+def validate_entry(entry: dict, verbose: bool = False) -> bool:
     """Validates a single JSON entry based on the docstring requirements."""
     required_fields = {
         "publication_number": float('inf'),
@@ -102,18 +141,219 @@ def validate_entry(entry: dict) -> bool:
         "differentiation": 300,
     }
 
+    if not isinstance(entry, dict):
+        print("Validation failed: the entry is not a JSON object")
+        return False
     for field, max_len in required_fields.items():
         if field not in entry:
             print(f"Validation failed for {entry.get('publication_number', 'Unknown')}: Missing field '{field}'")
             return False
-        
+        if not isinstance(entry[field], str):
+            print(f"Validation failed for {entry.get('publication_number', 'Unknown')}: Field '{field}' is not a string")
+            return False
+
         field_len = len(entry[field])
-        print(f"  - Field '{field}': {field_len} characters.")
+        if verbose:
+            print(f"  - Field '{field}': {field_len} characters.")
         if field_len > max_len:
             print(f"Validation failed for {entry.get('publication_number', 'Unknown')}: Field '{field}' is too long ({field_len} > {max_len})")
             return False
     return True
 
+def get_manifest_path(output_jsonl_file: Path) -> Path:
+    return output_jsonl_file.with_suffix(".manifest.json")
+
+def file_signature(path: Path) -> Dict[str, int]:
+    stat = path.stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def load_manifest(manifest_path: Path, output_jsonl_file: Path) -> Optional[Dict[str, Dict[str, Any]]]:
+    """The compiled files recorded by the last run, or None if the output no longer matches them."""
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("output") == file_signature(output_jsonl_file):
+            return manifest["files"]
+    except (OSError, json.JSONDecodeError, KeyError):
+        pass
+    return None
+
+def save_manifest(manifest_path: Path, output_jsonl_file: Path, files: Dict[str, Dict[str, Any]]) -> None:
+    tmp_path = manifest_path.with_suffix(".tmp")
+    # One json.dumps call: the C encoder is much faster than json.dump's chunked writes on 100k records
+    content = json.dumps({"output": file_signature(output_jsonl_file), "files": files}, separators=(",", ":"))
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, manifest_path)
+
+def scan_output_files(output_dir: Path) -> Dict[str, Tuple[str, Dict[str, int]]]:
+    """relative path -> (absolute path, signature) of every *_output_short.json under output_dir."""
+    found = {}
+    pending = [(str(output_dir), "")]
+    while pending:
+        dir_path, rel_dir = pending.pop()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, rel_dir + entry.name + os.sep))
+                elif entry.name.endswith("_output_short.json"):
+                    stat = entry.stat()
+                    found[rel_dir + entry.name] = (entry.path, {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+    return found
+
+def read_output_file(file_path: str | Path, known_sha256: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[dict]]:
+    """
+    Reads and validates one *_output_short.json.
+
+    Returns:
+        (its manifest record, its entry if valid and the content changed). The entry is None when the
+        content is identical to known_sha256, since the output already holds it. A file that can no longer
+        be read (e.g. deleted since the scan) is reported as invalid and read again by the next run.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            content = f.read()
+        signature = file_signature(Path(file_path))
+    except OSError as e:
+        print(f"Warning: Could not read file: {file_path} ({e})")
+        return {"mtime_ns": -1, "size": -1, "sha256": None, "publication_number": None}, None
+    record = {**signature, "sha256": hashlib.sha256(content).hexdigest(), "publication_number": None}
+    if known_sha256 is not None and record["sha256"] == known_sha256:
+        return record, None
+    try:
+        data = json.loads(content)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        print(f"Warning: Could not decode JSON from file: {file_path}")
+        return record, None
+    if not validate_entry(data):
+        print(f"Skipping invalid data in file: {file_path}")
+        return record, None
+    record["publication_number"] = data["publication_number"]
+    return record, data
+
+def get_owners(files: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """publication_number -> the most recently modified valid file holding it."""
+    owners: Dict[str, str] = {}
+    for rel_path, record in files.items():
+        publication_number = record.get("publication_number")
+        if publication_number is None:
+            continue
+        current = owners.get(publication_number)
+        if current is None or (record["mtime_ns"], rel_path) > (files[current]["mtime_ns"], current):
+            owners[publication_number] = rel_path
+    return owners
+
+_PUBLICATION_NUMBER = re.compile(r'"publication_number":\s*"([^"\\]*)"')
+
+def iter_compiled_entries(output_jsonl_file: Path, exclude: set) -> Iterator[Tuple[str, str]]:
+    """Streams (publication_number, line) from the sorted output, skipping the excluded publication numbers."""
+    if not output_jsonl_file.exists():
+        return
+    with open(output_jsonl_file, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            match = _PUBLICATION_NUMBER.search(line)  # Avoids parsing every line; nested objects never hold this key
+            publication_number = match.group(1) if match else json.loads(line).get("publication_number", "")
+            if publication_number not in exclude:
+                yield publication_number, line.rstrip("\n")
+
+def compile_outputs(output_dir: Path, output_jsonl_file: Path, incremental: bool = INCREMENTAL,
+                    workers: int = COMPILE_WORKERS) -> Dict[str, Any]:
+    """
+    Compiles every valid *_output_short.json under output_dir into output_jsonl_file, sorted by publication number.
+
+    Returns:
+        dict: publication_numbers (set of the compiled ones), files, files_read, invalid_files, entries_updated, rewritten.
+    """
+    manifest_path = get_manifest_path(output_jsonl_file)
+    previous = load_manifest(manifest_path, output_jsonl_file) if incremental else None
+    # Without a manifest matching it, the existing output cannot be trusted for a merge: rebuild it
+    rebuild = previous is None
+    previous = previous or {}
+
+    on_disk = scan_output_files(output_dir)
+    files = {}
+    to_read = []
+    for rel_path, (_, signature) in on_disk.items():
+        record = previous.get(rel_path)
+        if record is not None and record["mtime_ns"] == signature["mtime_ns"] and record["size"] == signature["size"]:
+            files[rel_path] = record
+        else:
+            to_read.append(rel_path)
+
+    # Read and validate the new or changed files in parallel, submitted in chunks so a full rebuild never holds one
+    # future per file. Only the manifest records are kept: the merge reads the changed entries again, chunk by chunk
+    # in output order, so memory does not grow with the number of changed files
+    changed_files = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for chunk_start in range(0, len(to_read), READ_CHUNK_SIZE):
+            chunk = to_read[chunk_start:chunk_start + READ_CHUNK_SIZE]
+            results = executor.map(
+                lambda rel_path: read_output_file(on_disk[rel_path][0], (previous.get(rel_path) or {}).get("sha256")), chunk
+            )
+            for rel_path, (record, entry) in zip(chunk, results):
+                if entry is None and rel_path in previous and record["sha256"] == previous[rel_path]["sha256"]:
+                    record["publication_number"] = previous[rel_path]["publication_number"]  # Touched, not changed
+                files[rel_path] = record
+                if entry is not None:
+                    changed_files.add(rel_path)
+
+        previous_owners, owners = get_owners(previous), get_owners(files)
+        changed = {p for p in set(previous_owners) | set(owners)
+                   if previous_owners.get(p) != owners.get(p) or owners.get(p) in changed_files}
+
+        if changed or rebuild:
+            def iter_updates() -> Iterator[Tuple[str, str]]:
+                updates = sorted(p for p in changed if p in owners)
+                for chunk_start in range(0, len(updates), READ_CHUNK_SIZE):
+                    chunk = updates[chunk_start:chunk_start + READ_CHUNK_SIZE]
+                    results = executor.map(lambda p: read_output_file(on_disk[owners[p]][0]), chunk)
+                    for publication_number, (record, entry) in zip(chunk, results):
+                        if entry is None or entry["publication_number"] != publication_number:
+                            # Changed or deleted since it was read: left out, and read again by the next run
+                            files[owners[publication_number]] = {**record, "mtime_ns": -1}
+                            continue
+                        yield publication_number, json.dumps(entry)
+
+            # Streaming k-way merge of the sorted existing output with the sorted updates
+            output_jsonl_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = output_jsonl_file.with_suffix(".tmp")
+            with open(tmp_path, "w") as f_out:
+                existing = iter([]) if rebuild else iter_compiled_entries(output_jsonl_file, changed)
+                for _, line in heapq.merge(existing, iter_updates(), key=lambda item: item[0]):
+                    f_out.write(line)
+                    f_out.write('\n')
+            os.replace(tmp_path, output_jsonl_file)
+    if rebuild or changed or to_read or len(files) != len(previous):
+        save_manifest(manifest_path, output_jsonl_file, files)
+
+    return {
+        "publication_numbers": set(owners),
+        "files": len(files),
+        "files_read": len(to_read),
+        "invalid_files": sum(1 for record in files.values() if record["publication_number"] is None),
+        "entries_updated": len(changed),
+        "rewritten": bool(changed or rebuild),
+    }
+
+def report_missing_and_unexpected(expected_pub_numbers: set, processed_pub_numbers: set) -> None:
+    missing_pub_numbers = expected_pub_numbers - processed_pub_numbers
+    if missing_pub_numbers:
+        print("\n--- Missing Patents ---")
+        print(f"{len(missing_pub_numbers)} expected patents were not found in the output:")
+        for number in sorted(list(missing_pub_numbers)):
+            print(f"- {number}")
+    else:
+        print("\nAll expected patents were processed and included in the output.")
+
+    unexpected_pub_numbers = processed_pub_numbers - expected_pub_numbers
+    if unexpected_pub_numbers:
+        print("\n--- Unexpected Patents ---")
+        print(f"{len(unexpected_pub_numbers)} patents were found in output but not in the knowledge base:")
+        for number in sorted(list(unexpected_pub_numbers)):
+            print(f"- {number}")
+
 def main():
     """Main function to compile and validate patent data."""
     print(f"Starting compilation for category: {CATEGORY}")
@@ -125,63 +365,182 @@ def main():
     else:
         print(f"Found {len(expected_pub_numbers)} expected patents in {INPUT_JSONL_FILE}.")
 
-    # 2. Find all individual output JSON files
-    json_files = list(OUTPUT_DIR.glob("**/*_output_short.json"))
-    print(f"Found {len(json_files)} individual JSON files to process in {OUTPUT_DIR}.")
-
-    valid_entries = []
-    processed_pub_numbers = set()
-
-    # 3. Process and Validate each JSON file
-    for file_path in json_files:
-        try:
-            print(f"\n--- Processing file: {file_path.name} ---")
-            with open(file_path, "r") as f:
-                data = json.load(f)
-            
-            if validate_entry(data):
-                valid_entries.append(data)
-                if "publication_number" in data:
-                    processed_pub_numbers.add(data["publication_number"])
-            else:
-                print(f"Skipping invalid data in file: {file_path}")
-
-        except json.JSONDecodeError:
-            print(f"Warning: Could not decode JSON from file: {file_path}")
-        except Exception as e:
-            print(f"An error occurred while processing {file_path}: {e}")
-
-    print(f"Processed {len(valid_entries)} valid entries.")
-
-    # 4. Write Compiled Output
-    if valid_entries:
-        # Sort entries by publication_number for consistent output
-        valid_entries.sort(key=lambda x: x.get("publication_number", ""))
-        with open(OUTPUT_JSONL_FILE, "w") as f_out:
-            for entry in valid_entries:
-                json.dump(entry, f_out)
-                f_out.write('\n')
-        print(f"Successfully compiled results to {OUTPUT_JSONL_FILE}")
+    # 2.-4. Read the new or changed output files, validate them and merge them into the compiled output
+    summary = compile_outputs(OUTPUT_DIR, OUTPUT_JSONL_FILE)
+    print(f"Found {summary['files']} individual JSON files in {OUTPUT_DIR}, {summary['files_read']} new or changed.")
+    if summary['rewritten']:
+        print(f"Successfully compiled results to {OUTPUT_JSONL_FILE} ({summary['entries_updated']} entries updated, "
+              f"{len(summary['publication_numbers'])} in total, {summary['invalid_files']} invalid files skipped).")
     else:
-        print("No valid entries to write.")
+        print(f"{OUTPUT_JSONL_FILE} is up to date ({len(summary['publication_numbers'])} entries).")
 
     # 5. Verify and Report Missing Patents
     if expected_pub_numbers:
-        missing_pub_numbers = expected_pub_numbers - processed_pub_numbers
-        if missing_pub_numbers:
-            print("\n--- Missing Patents ---")
-            print(f"{len(missing_pub_numbers)} expected patents were not found in the output:")
-            for number in sorted(list(missing_pub_numbers)):
-                print(f"- {number}")
-        else:
-            print("\nAll expected patents were processed and included in the output.")
-    
-        unexpected_pub_numbers = processed_pub_numbers - expected_pub_numbers
-        if unexpected_pub_numbers:
-            print("\n--- Unexpected Patents ---")
-            print(f"{len(unexpected_pub_numbers)} patents were found in output but not in the knowledge base:")
-            for number in sorted(list(unexpected_pub_numbers)):
-                print(f"- {number}")
+        report_missing_and_unexpected(expected_pub_numbers, summary['publication_numbers'])
+
+def discover_output_categories(output_root: Path = OUTPUT_ROOT, knowledge_root: Path = KNOWLEDGE_ROOT) -> List[str]:
+    """Every directory under output/ with a knowledge index or batch directories, sorted by name."""
+    if not output_root.is_dir():
+        return []
+    return sorted(
+        item.name for item in output_root.iterdir()
+        if item.is_dir() and (
+            (knowledge_root / item.name / f"{item.name}.jsonl").is_file()
+            or any(child.is_dir() and child.name.isdigit() for child in item.iterdir())
+        )
+    )
+
+def compile_category(category: str, output_root: Path = OUTPUT_ROOT) -> Dict[str, Any]:
+    """
+    Compiles one category. Runs in a worker process for --all.
+
+    Returns:
+        dict: The compile_outputs summary, with "category" and "status" ("success" or "failed").
+    """
+    output_dir = output_root / category
+    try:
+        summary = compile_outputs(output_dir, output_dir / f"{category}_output.jsonl")
+    except Exception as e:
+        return {"category": category, "status": "failed", "error": str(e), "publication_numbers": set()}
+    return {**summary, "category": category, "status": "success"}
+
+def load_knowledge_indexes(knowledge_root: Path = KNOWLEDGE_ROOT) -> Dict[str, set]:
+    """category -> expected publication numbers, from every knowledge/{category}/{category}.jsonl, read in parallel."""
+    index_paths = {path.parent.name: path for path in knowledge_root.glob("*/*.jsonl") if path.stem == path.parent.name}
+    with ThreadPoolExecutor(max_workers=max(len(index_paths), 1)) as executor:
+        return dict(zip(index_paths, executor.map(get_expected_publication_numbers, index_paths.values())))
+
+def build_compile_report(compiled: Dict[str, set], expected: Dict[str, set]) -> Dict[str, Any]:
+    """Missing, unexpected, misfiled and duplicate patents across all categories."""
+    all_expected = set().union(*expected.values()) if expected else set()
+    expected_in: Dict[str, List[str]] = {}
+    for category, publication_numbers in expected.items():
+        for publication_number in publication_numbers:
+            expected_in.setdefault(publication_number, []).append(category)
+
+    categories = {}
+    misfiled = {}
+    for category in sorted(set(compiled) | set(expected)):
+        compiled_here, expected_here = compiled.get(category, set()), expected.get(category, set())
+        unexpected = compiled_here - expected_here
+        for publication_number in unexpected & all_expected:
+            misfiled[publication_number] = {"compiled_in": category, "expected_in": sorted(expected_in[publication_number])}
+        categories[category] = {
+            "expected": len(expected_here),
+            "compiled": len(compiled_here),
+            "missing": sorted(expected_here - compiled_here),
+            "unexpected": sorted(unexpected),
+        }
+
+    compiled_in: Dict[str, List[str]] = {}
+    for category, publication_numbers in compiled.items():
+        for publication_number in publication_numbers:
+            compiled_in.setdefault(publication_number, []).append(category)
+    all_compiled = set(compiled_in)
+    return {
+        "categories": categories,
+        "expected_total": len(all_expected),
+        "compiled_total": len(all_compiled),
+        "missing_total": len(all_expected - all_compiled),
+        "unknown": sorted(all_compiled - all_expected),  # In no knowledge index at all
+        "misfiled": misfiled,
+        "duplicates": {p: sorted(c) for p, c in compiled_in.items() if len(c) > 1},
+    }
+
+def iter_category_entries(category: str, output_jsonl_file: Path) -> Iterator[Tuple[str, str, str]]:
+    """Streams (publication_number, category, line) from one sorted category output."""
+    for publication_number, line in iter_compiled_entries(output_jsonl_file, set()):
+        yield publication_number, category, line
+
+def write_corpus(categories: List[str], corpus_jsonl_file: Path = CORPUS_JSONL_FILE, output_root: Path = OUTPUT_ROOT) -> int:
+    """
+    K-way merges the sorted per-category outputs into one corpus sorted by publication number, with its
+    publication_number -> byte offset sidecar. A publication number compiled in several categories is kept once.
+
+    Returns:
+        int: The number of corpus entries.
+    """
+    streams = [iter_category_entries(category, output_root / category / f"{category}_output.jsonl") for category in categories]
+    offsets: Dict[str, int] = {}
+    tmp_path = corpus_jsonl_file.with_suffix(".tmp")
+    offset = 0
+    with open(tmp_path, "wb") as f_out:
+        # Ties on publication_number resolve in category order
+        for publication_number, category, line in heapq.merge(*streams, key=lambda item: item[0]):
+            if publication_number in offsets:
+                continue
+            offsets[publication_number] = offset
+            data = (json.dumps({**json.loads(line), "category": category}) + "\n").encode("utf-8")
+            f_out.write(data)
+            offset += len(data)
+    os.replace(tmp_path, corpus_jsonl_file)
+
+    stat = corpus_jsonl_file.stat()
+    sidecar_path = corpus_jsonl_file.with_name(corpus_jsonl_file.name + OFFSET_INDEX_SUFFIX)
+    with open(sidecar_path, "w") as f_idx:
+        json.dump({"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns, "offsets": offsets}, f_idx, separators=(",", ":"))
+    return len(offsets)
+
+def compile_all_categories(categories: List[str], max_workers: Optional[int] = CATEGORY_WORKERS) -> Dict[str, Any]:
+    """
+    Compiles every category concurrently, one process per category, while the knowledge indexes are read;
+    then writes the merged corpus and the compile report.
+
+    Returns:
+        dict: The compile report.
+    """
+    print(f"Compiling {len(categories)} categories in parallel: {', '.join(categories)}")
+    summaries: Dict[str, Dict[str, Any]] = {}
+    # Resolved on use: importing ProcessPoolExecutor loads multiprocessing, which the per-category compile never needs
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers or min(len(categories), os.cpu_count() or 1)) as executor:
+        futures = {executor.submit(compile_category, category, OUTPUT_ROOT): category for category in categories}
+        expected = load_knowledge_indexes(KNOWLEDGE_ROOT)  # Meanwhile, in this process
+        for done_count, future in enumerate(as_completed(futures), 1):
+            category = futures[future]
+            try:
+                summaries[category] = future.result()
+            except Exception as e:
+                summaries[category] = {"category": category, "status": "failed", "error": str(e), "publication_numbers": set()}
+            summary = summaries[category]
+            if summary["status"] == "success":
+                print(f"[{done_count}/{len(categories)}] {category}: {len(summary['publication_numbers'])} entries, "
+                      f"{summary['files_read']} files read, {summary['invalid_files']} invalid.")
+            else:
+                print(f"[{done_count}/{len(categories)}] {category}: FAILED ({summary.get('error')})")
+
+    compiled_categories = [category for category in categories if summaries[category]["status"] == "success"]
+    corpus_size = write_corpus(compiled_categories, CORPUS_JSONL_FILE, OUTPUT_ROOT)
+    print(f"Merged corpus: {corpus_size} entries in {CORPUS_JSONL_FILE}")
+
+    report = build_compile_report({category: summaries[category]["publication_numbers"] for category in compiled_categories}, expected)
+    report["failed_categories"] = [category for category in categories if category not in compiled_categories]
+    with open(COMPILE_REPORT_FILE, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("\n--- Compile Summary ---")
+    for category, counts in report["categories"].items():
+        print(f"- {category}: {counts['compiled']}/{counts['expected']} compiled, "
+              f"{len(counts['missing'])} missing, {len(counts['unexpected'])} unexpected")
+    print(f"Total: {report['compiled_total']}/{report['expected_total']} compiled, {report['missing_total']} missing, "
+          f"{len(report['misfiled'])} misfiled, {len(report['duplicates'])} duplicates, {len(report['unknown'])} in no knowledge index.")
+    print(f"Details in {COMPILE_REPORT_FILE}")
+    return report
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Compile the *_output_short.json files into {category}_output.jsonl.")
+    parser.add_argument("--all", action="store_true",
+                        help="Compile every category under output/, then write the merged corpus and the compile report.")
+    parser.add_argument("--workers", type=int, default=CATEGORY_WORKERS,
+                        help="Number of categories compiled concurrently (--all).")
+    args = parser.parse_args()
+
+    if args.all:
+        categories = discover_output_categories()
+        if not categories:
+            print("Error: No categories found under output/.")
+            exit(1)
+        report = compile_all_categories(categories, args.workers)
+        if report["failed_categories"]:
+            exit(1)
+    else:
+        main()
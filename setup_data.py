@@ -27,8 +27,11 @@ Within each patent {publication_number}/ directory, there should be a json file
 - pdf file: {publication_number}.pdf
 - image files: numbering images, e.g. 1.png, 2.png, etc.
 
-2. Read the JSONL file from data/nlp/nlp.jsonl -> extract the patent data for the given publication number:
-- save it to the new JSON file in the knowledge/nlp/pdf_and_image/{publication_number}/ directory.
+2. Stream the JSONL file from data/nlp/nlp.jsonl line by line -> extract the patent data for the given publication number
+   (the corpus is never held in memory, see tests/benchmark_setup_data_memory.py):
+- append it to the packed category store knowledge/nlp/nlp.pack (offset index in knowledge/nlp/nlp.pack.idx),
+  which PatentJsonLoaderTool reads with one seek per patent (see src/patent_crew/patent_store.py).
+- optionally (WRITE_PATENT_JSON_FILES) also save it to the new JSON file in the knowledge/nlp/pdf_and_image/{publication_number}/ directory.
 - json file: {publication_number}.json
 
 3. For each category, create a new JSONL file: knowledge/{category}/{category}.jsonl
@@ -39,26 +42,42 @@ Within each patent {publication_number}/ directory, there should be a json file
   - image_file_paths: list of image absolute file paths [path_to_{1.png}, path_to_{2.png}, etc.]
 
 4. At the end, we have the final knowledge base structure:
+- knowledge/{category}/{category}.pack and {category}.pack.idx: packed patent JSON records
 - knowledge/{category}/pdf_and_image/{publication_number}/ with the following files:
-  - {publication_number}.json
+  - {publication_number}.json (only with WRITE_PATENT_JSON_FILES; json_file_path is resolved against the pack otherwise)
   - {publication_number}.pdf
   - {1.png}, {2.png}, etc.
 
+# Re-runs
+Syncing is incremental (INCREMENTAL_SYNC): artifacts whose mirror already matches (size+mtime, or sha256
+with CHANGE_DETECTION = "hash") are skipped. Patent directories are copied by COPY_WORKERS threads,
+using reflinks or hardlinks when the filesystem allows it (LINK_MODE).
+
 # Run
-uv run setup_data.py
+uv run setup_data.py                                    # default CATEGORY
+uv run setup_data.py --category nlp --category computer_science
+uv run setup_data.py --all                              # every data/{category}/{category}.jsonl, one process per category
 '''
 
+import argparse
+import hashlib
 import json
 import os
 import shutil
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from patent_crew.patent_store import PatentStoreWriter, store_path_for_category
 
 # --- Configuration ---
 
 # Detect project root directory (where this script is located)
 PROJECT_ROOT = Path(__file__).parent.resolve()
 
-# Change one category at a time {nlp, computer_science, material_chemistry}
+# Default category when no --category/--all is given {nlp, computer_science, material_chemistry}
 CATEGORY = "material_chemistry"  # reload the crew config to get specialized agents
 
 # All paths are now absolute and relative to project root
@@ -66,78 +85,268 @@ INPUT_FILE_PATH = PROJECT_ROOT / f"data/{CATEGORY}/{CATEGORY}.jsonl"
 SOURCE_PATENT_ARTIFACTS_DIR = PROJECT_ROOT / f"data/{CATEGORY}/pdf_and_image/"
 KNOWLEDGE_BASE_OUTPUT_DIR = PROJECT_ROOT / f"knowledge/{CATEGORY}/pdf_and_image/"
 
+# Also write one pretty-printed {publication_number}.json per patent next to its PDF.
+# Not needed by the crew: PatentJsonLoaderTool reads the packed store knowledge/{CATEGORY}/{CATEGORY}.pack
+WRITE_PATENT_JSON_FILES = False
+
+# Incremental sync: skip artifacts already up to date in the knowledge base.
+# CHANGE_DETECTION: "stat" (same size and mtime, cheap) or "hash" (same sha256, exact)
+INCREMENTAL_SYNC = True
+CHANGE_DETECTION = "stat"
+
+# Number of threads copying patent artifacts in parallel
+COPY_WORKERS = 8
+
+# How artifacts are materialized: "copy", "hardlink", "reflink" or "auto"
+# (auto tries reflink, then hardlink, then falls back to a regular copy)
+LINK_MODE = "auto"
+
+# Number of categories synced concurrently (one process each) in multi-category runs; None = all cores
+CATEGORY_WORKERS = None
+
 # --- End Configuration ---
 
-def validate_paths() -> bool:
+def get_category_paths(category: str) -> Tuple[Path, Path, Path]:
+    """Returns (input JSONL, source artifacts dir, knowledge base output dir) for a category."""
+    return (
+        PROJECT_ROOT / f"data/{category}/{category}.jsonl",
+        PROJECT_ROOT / f"data/{category}/pdf_and_image/",
+        PROJECT_ROOT / f"knowledge/{category}/pdf_and_image/",
+    )
+
+def discover_categories() -> List[str]:
+    """Returns every category with a data/{category}/{category}.jsonl file, sorted by name."""
+    data_dir = PROJECT_ROOT / "data"
+    if not data_dir.is_dir():
+        return []
+    return sorted(
+        item.name for item in data_dir.iterdir()
+        if item.is_dir() and (item / f"{item.name}.jsonl").is_file()
+    )
+
+def validate_paths(category: Optional[str] = None) -> bool:
     """
     Validate that all required paths exist before processing.
+
+    Args:
+        category (str): Category to check, defaults to CATEGORY.
     
     Returns:
         bool: True if all paths are valid, False otherwise.
     """
+    input_file_path, source_artifacts_dir, _ = get_category_paths(category or CATEGORY)
     
-    if not INPUT_FILE_PATH.exists():
-        print(f"Error: Input JSONL file not found at {INPUT_FILE_PATH}")
+    if not input_file_path.exists():
+        print(f"Error: Input JSONL file not found at {input_file_path}")
         return False
     
-    if not SOURCE_PATENT_ARTIFACTS_DIR.exists():
-        print(f"Error: Source artifacts directory not found at {SOURCE_PATENT_ARTIFACTS_DIR}")
+    if not source_artifacts_dir.exists():
+        print(f"Error: Source artifacts directory not found at {source_artifacts_dir}")
         return False
     
-    print("✓ All required paths validated successfully")
+    print(f"✓ All required paths validated successfully for category '{category or CATEGORY}'")
     return True
 
-def load_all_patent_data_from_jsonl(jsonl_file_path: Path) -> dict:
+def iter_patent_data_from_jsonl(jsonl_file_path: Path) -> Iterator[Tuple[str, dict]]:
     """
-    Reads a JSONL file and loads all patent data into a dictionary.
+    Streams (publication_number, patent_data) pairs from a JSONL file, one line at a time.
+    Invalid lines and lines without a publication number are reported and skipped.
 
     Args:
         jsonl_file_path (Path): Absolute path to the input JSONL file.
-
-    Returns:
-        dict: A dictionary where keys are publication numbers and values are
-              the corresponding patent data objects. Returns an empty dict
-              if the file is not found or in case of other errors.
     """
-    patent_data_map = {}
-
     if not jsonl_file_path.is_file():
         print(f"Error: Input JSONL file not found at {jsonl_file_path}")
-        return patent_data_map
+        return
 
     try:
         with open(jsonl_file_path, 'r', encoding='utf-8') as f_in:
             for line_number, line in enumerate(f_in, 1):
                 try:
                     patent_data = json.loads(line.strip())
-                    publication_number = patent_data.get("publication_number")
-                    if publication_number:
-                        patent_data_map[publication_number] = patent_data
-                    else:
-                        print(f"Warning: Missing 'publication_number' in line {line_number} of {jsonl_file_path}")
                 except json.JSONDecodeError:
-                    print(f"Warning: Skipping invalid JSON line {line_number} in {jsonl_file_path}: {line.strip()}")
+                    print(f"Warning: Skipping invalid JSON line {line_number} in {jsonl_file_path}: {line.strip()[:200]}")
                     continue
+                publication_number = patent_data.get("publication_number")
+                if publication_number:
+                    yield publication_number, patent_data
+                else:
+                    print(f"Warning: Missing 'publication_number' in line {line_number} of {jsonl_file_path}")
     except Exception as e:
         print(f"An error occurred while reading {jsonl_file_path}: {e}")
-    
-    return patent_data_map
 
-def synchronize_patent_knowledge_base(jsonl_data_path: Path, source_artifacts_path: Path, knowledge_base_path: Path) -> None:
+def load_all_patent_data_from_jsonl(jsonl_file_path: Path) -> dict:
+    """
+    Reads a JSONL file and loads all patent data into a dictionary.
+    Memory grows with the corpus: synchronize_patent_knowledge_base streams instead.
+
+    Args:
+        jsonl_file_path (Path): Absolute path to the input JSONL file.
+
+    Returns:
+        dict: A dictionary where keys are publication numbers and values are
+              the corresponding patent data objects. Returns an empty dict
+              if the file is not found or in case of other errors.
+    """
+    return dict(iter_patent_data_from_jsonl(jsonl_file_path))
+
+def _file_sha256(file_path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def is_artifact_up_to_date(source_file: Path, target_file: Path, change_detection: str | None = None) -> bool:
+    """
+    Checks whether target_file already mirrors source_file.
+
+    Args:
+        source_file (Path): The artifact in data/.
+        target_file (Path): Its mirror in knowledge/.
+        change_detection (str): "stat" compares size and mtime, "hash" compares content sha256.
+            Defaults to CHANGE_DETECTION.
+
+    Returns:
+        bool: True if the target can be kept as is.
+    """
+    change_detection = change_detection or CHANGE_DETECTION
+    try:
+        source_stat = source_file.stat()
+        target_stat = target_file.stat()
+    except FileNotFoundError:
+        return False
+
+    if source_stat.st_ino == target_stat.st_ino and source_stat.st_dev == target_stat.st_dev:
+        return True  # hardlinked
+    if source_stat.st_size != target_stat.st_size:
+        return False
+    if change_detection == "hash":
+        return _file_sha256(source_file) == _file_sha256(target_file)
+    # copy2 preserves mtime, so an untouched mirror has the same mtime as its source
+    return int(source_stat.st_mtime) == int(target_stat.st_mtime)
+
+def _reflink(source_file: Path, target_file: Path) -> None:
+    """Copy-on-write clone (Linux FICLONE ioctl, e.g. btrfs/xfs). Raises OSError if unsupported."""
+    import fcntl
+    FICLONE = 0x40049409
+    with open(source_file, 'rb') as f_src, open(target_file, 'wb') as f_dst:
+        fcntl.ioctl(f_dst.fileno(), FICLONE, f_src.fileno())
+    shutil.copystat(source_file, target_file)
+
+def materialize_artifact(source_file: Path, target_file: Path, link_mode: str | None = None) -> str:
+    """
+    Creates target_file from source_file using the cheapest method the filesystem allows
+    among those permitted by link_mode (defaults to LINK_MODE).
+
+    Returns:
+        str: The method used ("reflink", "hardlink" or "copy").
+    """
+    link_mode = link_mode or LINK_MODE
+    if target_file.exists() or target_file.is_symlink():
+        target_file.unlink()
+
+    if link_mode in ("auto", "reflink"):
+        try:
+            _reflink(source_file, target_file)
+            return "reflink"
+        except (OSError, ImportError):
+            target_file.unlink(missing_ok=True)
+            if link_mode == "reflink":
+                raise
+    if link_mode in ("auto", "hardlink"):
+        try:
+            os.link(source_file, target_file)
+            return "hardlink"
+        except OSError:
+            if link_mode == "hardlink":
+                raise
+    shutil.copy2(source_file, target_file)
+    return "copy"
+
+def sync_patent_artifacts(source_patent_subdir: Path, target_patent_subdir: Path) -> Tuple[int, int]:
+    """
+    Mirrors the PDF and numbered images of one patent directory.
+
+    Returns:
+        Tuple[int, int]: (number of artifacts copied, number of artifacts skipped as unchanged)
+    """
+    publication_number = source_patent_subdir.name
+    files_copied_count = 0
+    files_skipped_count = 0
+    target_patent_subdir.mkdir(parents=True, exist_ok=True)
+
+    for file_item in source_patent_subdir.iterdir():
+        is_artifact = (
+            file_item.name == f"{publication_number}.pdf"
+            or (file_item.suffix.lower() == '.png' and file_item.stem.isdigit())
+        )
+        if not is_artifact:
+            continue
+        target_file = target_patent_subdir / file_item.name
+        if INCREMENTAL_SYNC and is_artifact_up_to_date(file_item, target_file):
+            files_skipped_count += 1
+            continue
+        materialize_artifact(file_item, target_file)
+        files_copied_count += 1
+
+    return files_copied_count, files_skipped_count
+
+def write_json_if_changed(output_json_path: Path, patent_data: dict) -> bool:
+    """Writes the pretty-printed patent JSON unless an identical file is already there. Returns True if written."""
+    serialized = json.dumps(patent_data, indent=4)
+    if INCREMENTAL_SYNC and output_json_path.exists():
+        try:
+            if output_json_path.stat().st_size == len(serialized.encode('utf-8')) and output_json_path.read_text(encoding='utf-8') == serialized:
+                return False
+        except OSError:
+            pass
+    with open(output_json_path, 'w', encoding='utf-8') as f_out:
+        f_out.write(serialized)
+    return True
+
+def build_category_entry(knowledge_base_path: Path, pub_num: str, in_store: bool) -> dict:
+    """Builds the knowledge/{CATEGORY}/{CATEGORY}.jsonl entry tracking the files available for one patent."""
+    current_patent_knowledge_dir = knowledge_base_path / pub_num
+
+    json_file_path = (current_patent_knowledge_dir / f"{pub_num}.json").resolve()
+    pdf_file_path = (current_patent_knowledge_dir / f"{pub_num}.pdf").resolve()
+
+    image_file_paths_list = []
+    if current_patent_knowledge_dir.is_dir():
+        for file_item in current_patent_knowledge_dir.iterdir():
+            if file_item.suffix.lower() == '.png' and file_item.stem.isdigit():
+                image_file_paths_list.append(file_item.resolve())
+
+    return {
+        "publication_number": pub_num,
+        "json_file_path": str(json_file_path) if (in_store or json_file_path.exists()) else None,
+        "pdf_file_path": str(pdf_file_path) if pdf_file_path.exists() else None,
+        "image_file_paths": sorted([str(img_p) for img_p in image_file_paths_list])
+    }
+
+def synchronize_patent_knowledge_base(jsonl_data_path: Path, source_artifacts_path: Path, knowledge_base_path: Path, category: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Mirrors specified patent artifacts (PDFs, numbered images) and extracts/saves 
     patent-specific data from a JSONL file to the knowledge base.
     Also creates a category-level JSONL summary of available artifacts.
 
+    Single streaming pass over the JSONL: each line is written to the store (and optional JSON file)
+    and its category entry is emitted as soon as its artifacts are copied. Only a bounded window of
+    records (COPY_WORKERS * 4) is held in memory, so peak memory does not grow with the corpus.
+
     Args:
         jsonl_data_path (Path): Absolute path to the JSONL file containing patent data.
         source_artifacts_path (Path): Absolute path to the directory containing source patent artifacts.
         knowledge_base_path (Path): Absolute path to the base directory for the knowledge base output.
-    """
-    all_patent_data = load_all_patent_data_from_jsonl(jsonl_data_path)
+        category (str): Category name used for knowledge/{category}/{category}.jsonl, defaults to CATEGORY.
 
-    if not all_patent_data:
-        print("No patent data loaded from JSONL file. Exiting synchronization.")
+    Returns:
+        dict: Summary counts for the category, or None if synchronization could not run.
+    """
+    category = category or CATEGORY
+    if not jsonl_data_path.is_file():
+        print(f"Error: Input JSONL file not found at {jsonl_data_path}. Exiting synchronization.")
         return
 
     try:
@@ -151,95 +360,182 @@ def synchronize_patent_knowledge_base(jsonl_data_path: Path, source_artifacts_pa
         print(f"Error: Source artifacts directory not found at {source_artifacts_path}")
         return
 
-    print(f"Starting synchronization for category '{CATEGORY}' from {source_artifacts_path} to {knowledge_base_path}")
+    print(f"Starting synchronization for category '{category}' from {source_artifacts_path} to {knowledge_base_path}")
 
-    processed_publication_numbers = [] 
-
-    for item in source_artifacts_path.iterdir():
-        if item.is_dir():
-            publication_number = item.name
-            source_patent_subdir = item
-            target_patent_subdir = knowledge_base_path / publication_number
-            files_copied_count = 0
-
-            try:
-                target_patent_subdir.mkdir(parents=True, exist_ok=True)
-
-                for file_item in source_patent_subdir.iterdir():
-                    if file_item.name == f"{publication_number}.pdf":
-                        shutil.copy2(file_item, target_patent_subdir / file_item.name)
-                        files_copied_count += 1
-                    elif file_item.suffix.lower() == '.png' and file_item.stem.isdigit():
-                        shutil.copy2(file_item, target_patent_subdir / file_item.name)
-                        files_copied_count += 1
-                
-                if files_copied_count > 0:
-                    print(f"Copied {files_copied_count} artifact(s) for {publication_number}")
+    store_path = store_path_for_category(knowledge_base_path.parent)
+    category_jsonl_output_path = knowledge_base_path.parent / f"{category}.jsonl"
+    tmp_category_jsonl_path = category_jsonl_output_path.with_name(category_jsonl_output_path.name + ".tmp")
 
-            except Exception as e:
-                print(f"Error copying artifacts for {publication_number}: {e}")
-                continue 
+    seen_publication_numbers = set()  # publication numbers only, not records
+    processed_count = 0
+    total_copied = 0
+    total_skipped = 0
+    max_in_flight = COPY_WORKERS * 4
+    pending: Deque[Tuple[str, dict, Future]] = deque()
 
-            # Extract and Save Patent-Specific JSON
-            patent_specific_data = all_patent_data.get(publication_number)
+    def finish_oldest(store_writer: PatentStoreWriter, f_out_jsonl) -> None:
+        """Waits for the oldest in-flight copy, then writes its record and emits its index entry."""
+        nonlocal processed_count, total_copied, total_skipped
+        publication_number, patent_specific_data, future = pending.popleft()
+        try:
+            files_copied_count, files_skipped_count = future.result()
+            total_copied += files_copied_count
+            total_skipped += files_skipped_count
+            if files_copied_count > 0:
+                print(f"Copied {files_copied_count} artifact(s) for {publication_number}")
+        except Exception as e:
+            print(f"Error copying artifacts for {publication_number}: {e}")
+            return
 
-            if patent_specific_data:
-                output_json_path = target_patent_subdir / f"{publication_number}.json"
-                try:
-                    with open(output_json_path, 'w', encoding='utf-8') as f_out:
-                        json.dump(patent_specific_data, f_out, indent=4)
-                    processed_publication_numbers.append(publication_number) 
-                except Exception as e:
-                    print(f"Error saving JSON for {publication_number} to {output_json_path}: {e}")
-            else:
-                print(f"Warning: Patent data for {publication_number} not found in {jsonl_data_path.name}. JSON file not created.")
-    
-    # Create knowledge/{CATEGORY}/{CATEGORY}.jsonl
-    if processed_publication_numbers:
-        category_knowledge_entries = []
-        for pub_num in processed_publication_numbers:
-            current_patent_knowledge_dir = knowledge_base_path / pub_num
-            
-            json_file_path = (current_patent_knowledge_dir / f"{pub_num}.json").resolve()
-            pdf_file_path = (current_patent_knowledge_dir / f"{pub_num}.pdf").resolve()
-            
-            image_file_paths_list = []
-            if current_patent_knowledge_dir.is_dir(): 
-                for file_item in current_patent_knowledge_dir.iterdir():
-                    if file_item.suffix.lower() == '.png' and file_item.stem.isdigit():
-                        image_file_paths_list.append(file_item.resolve())
-            
-            patent_entry = {
-                "publication_number": pub_num,
-                "json_file_path": str(json_file_path) if json_file_path.exists() else None,
-                "pdf_file_path": str(pdf_file_path) if pdf_file_path.exists() else None,
-                "image_file_paths": sorted([str(img_p) for img_p in image_file_paths_list]) 
-            }
-            category_knowledge_entries.append(patent_entry)
-
-        category_jsonl_output_path = knowledge_base_path.parent / f"{CATEGORY}.jsonl"
+        # Extract and Save Patent-Specific JSON
+        output_json_path = knowledge_base_path / publication_number / f"{publication_number}.json"
         try:
-            with open(category_jsonl_output_path, 'w', encoding='utf-8') as f_out_jsonl:
-                for entry in category_knowledge_entries:
-                    f_out_jsonl.write(json.dumps(entry) + '\n')
-            print(f"Successfully created category knowledge summary: {category_jsonl_output_path}")
+            store_writer.add(publication_number, patent_specific_data)
+            if WRITE_PATENT_JSON_FILES:
+                write_json_if_changed(output_json_path, patent_specific_data)
         except Exception as e:
-            print(f"Error creating category knowledge summary {category_jsonl_output_path}: {e}")
+            print(f"Error saving JSON for {publication_number} to {output_json_path}: {e}")
+            return
+        f_out_jsonl.write(json.dumps(build_category_entry(knowledge_base_path, publication_number, True)) + '\n')
+        processed_count += 1
+
+    store_writer = PatentStoreWriter(store_path)
+    try:
+        with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor, \
+                open(tmp_category_jsonl_path, 'w', encoding='utf-8') as f_out_jsonl:
+            for publication_number, patent_specific_data in iter_patent_data_from_jsonl(jsonl_data_path):
+                if publication_number in seen_publication_numbers:
+                    print(f"Warning: Duplicate publication number {publication_number} in {jsonl_data_path.name}. Keeping the first record.")
+                    continue
+                seen_publication_numbers.add(publication_number)
+
+                source_patent_subdir = source_artifacts_path / publication_number
+                if not source_patent_subdir.is_dir():
+                    continue
+
+                future = executor.submit(sync_patent_artifacts, source_patent_subdir, knowledge_base_path / publication_number)
+                pending.append((publication_number, patent_specific_data, future))
+                if len(pending) >= max_in_flight:
+                    finish_oldest(store_writer, f_out_jsonl)
+
+            while pending:
+                finish_oldest(store_writer, f_out_jsonl)
+
+            # Artifact directories without a JSONL record are still mirrored, but not indexed
+            for item in source_artifacts_path.iterdir():
+                if item.is_dir() and item.name not in seen_publication_numbers:
+                    try:
+                        files_copied_count, files_skipped_count = sync_patent_artifacts(item, knowledge_base_path / item.name)
+                        total_copied += files_copied_count
+                        total_skipped += files_skipped_count
+                    except Exception as e:
+                        print(f"Error copying artifacts for {item.name}: {e}")
+                    print(f"Warning: Patent data for {item.name} not found in {jsonl_data_path.name}. JSON file not created.")
+
+        store_writer.close()
+        print(f"Successfully wrote packed patent store with {len(store_writer.index)} record(s): {store_path}")
+    except Exception as e:
+        print(f"Error during synchronization of category '{category}': {e}")
+        store_writer.abort()
+        tmp_category_jsonl_path.unlink(missing_ok=True)
+        return
+
+    print(f"Artifacts: {total_copied} copied, {total_skipped} unchanged and skipped.")
+
+    # Create knowledge/{category}/{category}.jsonl
+    if processed_count:
+        os.replace(tmp_category_jsonl_path, category_jsonl_output_path)
+        print(f"Successfully created category knowledge summary: {category_jsonl_output_path} ({processed_count} patents)")
     else:
-        print(f"No patents were successfully processed for category {CATEGORY}. Skipping creation of {CATEGORY}.jsonl.")
+        tmp_category_jsonl_path.unlink(missing_ok=True)
+        print(f"No patents were successfully processed for category {category}. Skipping creation of {category}.jsonl.")
+
+    print(f"Synchronization process completed for category '{category}'.")
+    return {
+        "category": category,
+        "patents_indexed": processed_count,
+        "store_records": len(store_writer.index),
+        "artifacts_copied": total_copied,
+        "artifacts_skipped": total_skipped,
+    }
+
+def sync_category(category: str) -> Dict[str, Any]:
+    """
+    Validates and synchronizes one category. Runs in a worker process for multi-category runs.
+
+    Returns:
+        dict: The category summary, with "status" set to "success" or "failed" and the duration in seconds.
+    """
+    start_time = time.monotonic()
+    if not validate_paths(category):
+        return {"category": category, "status": "failed", "error": "path validation failed", "duration_s": 0.0}
+
+    input_file_path, source_artifacts_dir, knowledge_base_output_dir = get_category_paths(category)
+    try:
+        summary = synchronize_patent_knowledge_base(input_file_path, source_artifacts_dir, knowledge_base_output_dir, category)
+    except Exception as e:
+        summary = None
+        print(f"Error synchronizing category '{category}': {e}")
+    duration = round(time.monotonic() - start_time, 2)
+    if summary is None:
+        return {"category": category, "status": "failed", "error": "synchronization did not complete", "duration_s": duration}
+    return {**summary, "status": "success", "duration_s": duration}
+
+def sync_categories(categories: List[str], max_workers: Optional[int] = CATEGORY_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Synchronizes several categories concurrently, one process per category, and prints a combined summary.
 
-    print(f"Synchronization process completed for category '{CATEGORY}'.")
+    Returns:
+        list: One summary dict per category, in the order given.
+    """
+    print(f"Synchronizing {len(categories)} categories in parallel: {', '.join(categories)}")
+    summaries: Dict[str, Dict[str, Any]] = {}
+    with ProcessPoolExecutor(max_workers=max_workers or min(len(categories), os.cpu_count() or 1)) as executor:
+        futures = {executor.submit(sync_category, category): category for category in categories}
+        for done_count, future in enumerate(as_completed(futures), 1):
+            category = futures[future]
+            try:
+                summaries[category] = future.result()
+            except Exception as e:
+                summaries[category] = {"category": category, "status": "failed", "error": str(e), "duration_s": 0.0}
+            print(f"[{done_count}/{len(categories)}] Category '{category}' finished: {summaries[category]['status']}")
+
+    ordered = [summaries[category] for category in categories]
+    print("\n--- Synchronization Summary ---")
+    for summary in ordered:
+        if summary["status"] == "success":
+            print(
+                f"- {summary['category']}: {summary['patents_indexed']} patents indexed, "
+                f"{summary['artifacts_copied']} artifacts copied, {summary['artifacts_skipped']} unchanged "
+                f"({summary['duration_s']}s)"
+            )
+        else:
+            print(f"- {summary['category']}: FAILED ({summary.get('error')})")
+    total_patents = sum(summary.get("patents_indexed", 0) for summary in ordered)
+    print(f"Total: {total_patents} patents indexed across {len(ordered)} categories.")
+    return ordered
 
 if __name__ == "__main__":
-    # Validate all paths before proceeding
-    if not validate_paths():
-        print("Path validation failed. Exiting.")
-        exit(1)
-    
-    # Ensure the configuration Path objects are correctly defined
-    if not (INPUT_FILE_PATH and SOURCE_PATENT_ARTIFACTS_DIR and KNOWLEDGE_BASE_OUTPUT_DIR):
-        print("Error: Configuration paths (INPUT_FILE_PATH, SOURCE_PATENT_ARTIFACTS_DIR, KNOWLEDGE_BASE_OUTPUT_DIR) must be set.")
+    parser = argparse.ArgumentParser(description="Prepare the knowledge base from data/.")
+    parser.add_argument("--category", action="append", dest="categories",
+                        help="Category to sync (repeatable). Defaults to CATEGORY.")
+    parser.add_argument("--all", action="store_true",
+                        help="Sync every category found as data/{category}/{category}.jsonl.")
+    parser.add_argument("--workers", type=int, default=CATEGORY_WORKERS,
+                        help="Number of categories synced concurrently.")
+    args = parser.parse_args()
+
+    categories = discover_categories() if args.all else (args.categories or [CATEGORY])
+    if not categories:
+        print("Error: No categories found under data/.")
         exit(1)
+
+    if len(categories) == 1:
+        summary = sync_category(categories[0])
+        if summary["status"] != "success":
+            print("Path validation or synchronization failed. Exiting.")
+            exit(1)
     else:
-        # Call the function to synchronize the patent knowledge base
-        synchronize_patent_knowledge_base(INPUT_FILE_PATH, SOURCE_PATENT_ARTIFACTS_DIR, KNOWLEDGE_BASE_OUTPUT_DIR)
+        summaries = sync_categories(categories, args.workers)
+        if any(summary["status"] != "success" for summary in summaries):
+            exit(1)
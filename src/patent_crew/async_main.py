@@ -14,75 +14,70 @@ import agentops
 from dotenv import load_dotenv
 load_dotenv() 
 
+from patent_crew.patent_index import get_patent_metadadata
 from patent_crew.crew import PatentAnalysisCrew # Import the original crew class
+from patent_crew.checkpoint_store import get_checkpoint_dir
+from patent_crew.dag_scheduler import kickoff_dag_async
+from patent_crew.output_manifest import scan_existing_outputs
+from patent_crew.phase_brief import measure_context_reduction, write_phase_brief_report
+from patent_crew.tools.search_cache import get_search_cache_stats, write_search_cache_report
+from patent_crew.work_pool import run_sliding_window
 
 # --- Global Configuration ---
 DEFAULT_CATEGORY = "material_chemistry"  # Choose category to process: {nlp, material_chemistry, computer_science}
 KNOWLEDGE_ROOT_DIR = "knowledge" # This is used as the base for making json_file_path relative
 OUTPUT_DIR = "output"
-MAX_BATCHES_TO_PROCESS = 10 # Set to 1 to process only first batch of 10 patents
-BATCH_SIZE = 5  # Number of patents to process in each batch
-START_BATCH_IDX = 0 # Set to a specific batch index to start from (e.g., 3)
+BATCH_SIZE = 5  # Number of patents per output/{category}/{batch_idx}/ directory
+SKIP_COMPLETED = True # Only enqueue patents without a valid output/{category}/**/{publication_number}_output.json
+MAX_PATENTS_TO_PROCESS = None # Cap on the patents enqueued in this run (e.g. 5 for a test run), None for all
+# Max patents in flight at once, per LLM provider used by the crew; the smallest applies
+PROVIDER_CONCURRENCY = {
+    "openai": 5,
+    "gemini": 5,
+}
+DEFAULT_PROVIDER_CONCURRENCY = 3 # For providers not listed above
+USE_DAG_SCHEDULER = True # Run independent tasks concurrently (dag_scheduler.py) instead of Process.sequential
+INSTRUMENTATION_FILE = "instrumentation.jsonl" # Per-task timing/token records under output/{category}/ (DAG scheduler only), None to disable
+RESUME_FROM_CHECKPOINTS = True # Checkpoint each task output under output/{category}/checkpoints/ and skip completed tasks on re-runs (DAG scheduler only)
 # ---------------------------
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
-def get_patent_metadadata(category: str, knowledge_root_dir: str = KNOWLEDGE_ROOT_DIR) -> List[Dict[str, Any]]:
+def get_crew_providers(crew) -> List[str]:
+    """Returns the LLM providers used by the crew's agents, e.g. ['gemini', 'openai']."""
+    providers = set()
+    for agent in crew.agents:
+        model = str(getattr(agent.llm, 'model', '') or '')
+        if '/' in model:
+            providers.add(model.split('/', 1)[0])
+        elif model.startswith(('gpt-', 'o1', 'o3', 'o4')):
+            providers.add('openai')
+        elif model:
+            providers.add(model)
+    return sorted(providers)
+
+def get_max_in_flight(providers: List[str]) -> int:
+    """The number of patents kept in flight: the tightest limit among the crew's providers."""
+    return min((PROVIDER_CONCURRENCY.get(p, DEFAULT_PROVIDER_CONCURRENCY) for p in providers), default=DEFAULT_PROVIDER_CONCURRENCY)
+
+async def process_patent(crew, patent_input: Dict[str, Any], repair_output: bool = False) -> Any:
     """
-    Reads the {category}.jsonl file to get patent metadata.
-    Args:
-        category: The category of patents to process (e.g., 'nlp').
-        knowledge_root_dir: The root directory of the knowledge base, used as a reference.
-
-    Returns:
-        A list of dictionaries, where each dictionary contains:
-        - 'publication_number': The publication number of the patent.
-        - 'json_file_path': Path to the JSON file, made relative to knowledge_root_dir.
-        - 'category': The category of the patent.
-        - 'absolute_image_paths': A list of verified absolute file paths for associated images.
+    Process one patent with its own copy of the crew.
+    With repair_output, the final task runs again even if checkpointed, since the output it wrote is invalid.
     """
-    patent_info_list: List[Dict[str, Any]] = []
-    jsonl_file_name = f"{category}.jsonl"
-    base_jsonl_path = Path(knowledge_root_dir) / category / jsonl_file_name
-
-    if not base_jsonl_path.exists():
-        raise FileNotFoundError(f"JSONL index file not found at {base_jsonl_path}")
-
-    with open(base_jsonl_path, 'r') as f_jsonl:
-        for line in f_jsonl:
-            patent_data = json.loads(line.strip())
-            publication_number = patent_data.get('publication_number')
-            json_path_str = patent_data.get('json_file_path')
-            image_paths_from_jsonl = patent_data.get('image_file_paths', [])
-
-            if publication_number and json_path_str:
-                pdf_path_str = json_path_str.rsplit('.', 1)[0] + '.pdf'
-                
-                absolute_image_paths = [
-                    p for p in image_paths_from_jsonl if os.path.isabs(p) and os.path.exists(p)
-                ]
-                
-                image_paths_str = "\n".join(absolute_image_paths)
-                patent_info_list.append({
-                    'publication_number': publication_number,
-                    'json_file_path': json_path_str,
-                    'category': category,
-                    'absolute_image_paths': absolute_image_paths,
-                    'image_path_str': image_paths_str,
-                    'pdf_file_path': pdf_path_str
-                })
-
-    return patent_info_list
-
-async def process_batch(crew, batch: List[Dict[str, Any]]) -> List[Any]:
-    """
-    Process a batch of patents with the crew.
-    """
-    return await crew.kickoff_for_each_async(inputs=batch)
+    if USE_DAG_SCHEDULER:
+        checkpoint_dir = None
+        if RESUME_FROM_CHECKPOINTS:
+            checkpoint_dir = str(get_checkpoint_dir(Path(OUTPUT_DIR) / DEFAULT_CATEGORY, patent_input['publication_number']))
+        instrumentation_path = str(Path(OUTPUT_DIR) / DEFAULT_CATEGORY / INSTRUMENTATION_FILE) if INSTRUMENTATION_FILE else None
+        return await kickoff_dag_async(crew, patent_input, checkpoint_dir=checkpoint_dir, instrumentation_path=instrumentation_path,
+                                       rerun_final_task=repair_output)
+    return await crew.copy().kickoff_async(inputs=patent_input)
 
 async def run_async():
     """
     Run the Patent Analysis crew for each patent found in the specified category's JSONL file using async kickoff.
+    Patents go through a sliding window: a new patent starts as soon as any in-flight one finishes.
     """
     
     print("Debug: Initiating async and agentops...")
@@ -96,53 +91,62 @@ async def run_async():
     if not patent_processing_inputs:
         return
 
-    batches = []
-    for i in range(0, len(patent_processing_inputs), BATCH_SIZE):
-        batch = patent_processing_inputs[i:i+BATCH_SIZE]
-        batches.append(batch)
-    
-    print(f"Debug: Created {len(batches)} batches of size {BATCH_SIZE}.")
-    
-    crew_instance_manager = PatentAnalysisCrew()
-    crew = crew_instance_manager.crew() 
+    done, invalid = scan_existing_outputs(output_base_dir) if SKIP_COMPLETED else (set(), {})
+    if SKIP_COMPLETED:
+        print(f"Debug: Found {len(done)} patents with a valid output and {len(invalid)} with an invalid one in {output_base_dir}.")
 
-    print("Debug: Starting batch processing loop...")
-    for batch_idx, batch in enumerate(batches):
-        print(f"Debug: Loop check: batch_idx={batch_idx}, START_BATCH_IDX={START_BATCH_IDX}, MAX_BATCHES_TO_PROCESS={MAX_BATCHES_TO_PROCESS}")
-        # Skip batches if the current batch index is less than the starting index
-        if batch_idx < START_BATCH_IDX:
-            print(f"Debug: Skipping batch {batch_idx + 1}...")
+    # batch_idx follows the patent's position in the index, so a re-run writes to the same directory as the first run
+    inputs_with_batch_idx = []
+    for i, patent_input in enumerate(patent_processing_inputs):
+        if patent_input['publication_number'] in done:
             continue
-        if batch_idx >= MAX_BATCHES_TO_PROCESS:
-            print(f"Debug: Max batches reached. Stopping loop.")
+        if MAX_PATENTS_TO_PROCESS is not None and len(inputs_with_batch_idx) >= MAX_PATENTS_TO_PROCESS:
             break
-        
-        print(f" ********** Processing Batch {batch_idx + 1} **********")
-        
-        # Create batch-specific output directory
-        batch_output_dir = output_base_dir / str(batch_idx)
-        batch_output_dir.mkdir(parents=True, exist_ok=True)
-        
-        session = agentops.start_session(tags=[f"batch_{batch_idx}"])
-
-        try:
-            # Add batch_idx to each input for dynamic file path generation
-            inputs_with_batch_idx = [{**patent_input, 'batch_idx': batch_idx} for patent_input in batch]
-            await process_batch(crew, inputs_with_batch_idx)
-            
-            # Finished 1 batch: sleep and end session
-            print(f"Batch {batch_idx + 1} success. Sleeping for 30 seconds...")
-            await asyncio.sleep(30)
-            agentops.end_session('Success')
-            await asyncio.sleep(10)
-        except Exception as e:
-            print("*" * 100)
-            print(f"Error processing batch {batch_idx + 1}: {e}")
-            agentops.end_session('Fail')
-            print("Continuing to next batch after 30 seconds...")
-            await asyncio.sleep(30)
+        batch_idx = i // BATCH_SIZE
+        inputs_with_batch_idx.append({**patent_input, 'batch_idx': batch_idx})
+        (output_base_dir / str(batch_idx)).mkdir(parents=True, exist_ok=True)
 
-    print("Debug: Batch processing loop finished.")
+    if not inputs_with_batch_idx:
+        print("Debug: Every patent already has a valid output, nothing to do.")
+        return
+
+    crew_instance_manager = PatentAnalysisCrew()
+    crew = crew_instance_manager.crew() 
+
+    providers = get_crew_providers(crew)
+    max_in_flight = get_max_in_flight(providers)
+    print(f"Debug: {len(inputs_with_batch_idx)} patents to process, {max_in_flight} in flight (providers: {', '.join(providers)}).")
+
+    def on_done(patent_input: Dict[str, Any], result: Any, error: BaseException | None) -> None:
+        if error is not None:
+            print("*" * 100)
+            print(f"Error processing patent {patent_input['publication_number']}: {error}")
+        else:
+            print(f"Patent {patent_input['publication_number']} (batch {patent_input['batch_idx']}) success.")
+            brief_report = measure_context_reduction(getattr(result, 'tasks_output', None) or [], patent_input['publication_number'])
+            if brief_report:
+                print(f"Debug: Phase brief saved ~{brief_report['tokens_saved']} context tokens ({brief_report['reduction']:.0%}).")
+                write_phase_brief_report(str(output_base_dir / "phase_brief_report.jsonl"), brief_report)
+
+    session = agentops.start_session(tags=[f"{DEFAULT_CATEGORY}_sliding_window"])
+    summary = await run_sliding_window(
+        inputs_with_batch_idx,
+        lambda patent_input: process_patent(crew, patent_input, repair_output=patent_input['publication_number'] in invalid),
+        max_in_flight,
+        on_done=on_done,
+    )
+    agentops.end_session('Success' if summary['failed'] == 0 else 'Fail')
+
+    print(
+        f"Debug: Processing finished: {summary['completed']} succeeded, {summary['failed']} failed "
+        f"in {summary['duration_s']}s ({summary['items_per_hour']} patents/hour)."
+    )
+    for agent_label, stats in get_search_cache_stats().items():
+        print(f"Debug: Search cache {agent_label}: {stats['hits']} hits / {stats['misses']} misses (hit rate {stats['hit_rate']:.0%}).")
+    write_search_cache_report(str(output_base_dir / "search_cache_report.jsonl"))
+    if USE_DAG_SCHEDULER and INSTRUMENTATION_FILE:
+        print(f"Debug: Per-task measurements in {output_base_dir / INSTRUMENTATION_FILE}, summarize with: "
+              f"python -m patent_crew.instrumentation {output_base_dir / INSTRUMENTATION_FILE}")
 
 def run():
     """
@@ -0,0 +1,100 @@
+'''
+Per-patent checkpoint store for crew runs.
+
+Every TaskOutput is written to {checkpoint_dir}/{task_name}.json as soon as the task completes. The caller
+passes one checkpoint_dir per patent: get_checkpoint_dir returns output/{category}/checkpoints/{publication_number},
+so deleting that directory drops the checkpoints of that patent only.
+When a run is resumed, run_crew_dag reuses the stored outputs and only executes the tasks that are missing,
+so retrying a failed evaluator costs one LLM call instead of eleven.
+
+A checkpoint is only reused if it was produced from the same interpolated task description; if a
+task has to run again, every task depending on it runs again too.
+'''
+
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from crewai import Task, TaskOutput
+from crewai.tasks.output_format import OutputFormat
+
+CHECKPOINT_DIR_NAME = "checkpoints"
+
+
+def get_checkpoint_dir(output_dir: str, publication_number: str) -> Path:
+    """Checkpoint directory of one patent, e.g. output/nlp/checkpoints/US-11423042-B2."""
+    return Path(output_dir) / CHECKPOINT_DIR_NAME / publication_number
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+
+
+class PatentCheckpointStore:
+    """Stores the TaskOutputs of one patent's crew run, one JSON file per task."""
+
+    def __init__(self, checkpoint_dir: str | Path):
+        self.checkpoint_dir = Path(checkpoint_dir)
+
+    def _path(self, task_name: str) -> Path:
+        return self.checkpoint_dir / f"{_safe_name(task_name)}.json"
+
+    def save(self, task_name: str, output: TaskOutput) -> None:
+        """Writes a task's output atomically, so an interrupted run never leaves a truncated checkpoint."""
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        record = {
+            "task_name": task_name,
+            "description": output.description,
+            "name": output.name,
+            "expected_output": output.expected_output,
+            "summary": output.summary,
+            "raw": output.raw,
+            "json_dict": output.json_dict,
+            "agent": output.agent,
+            "output_format": output.output_format.value if output.output_format else None,
+        }
+        path = self._path(task_name)
+        fd, tmp_path = tempfile.mkstemp(dir=self.checkpoint_dir, prefix=".tmp_", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False, indent=2, default=str)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self, task_name: str, task: Task) -> Optional[TaskOutput]:
+        """
+        Returns the stored output of a task, or None if there is none or it was produced from a
+        different description (e.g. edited prompt or other inputs).
+        """
+        path = self._path(task_name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record: Dict[str, Any] = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if record.get("description") != task.description:
+            return None
+
+        pydantic_output = None
+        if task.output_pydantic is not None and record.get("json_dict") is not None:
+            try:
+                pydantic_output = task.output_pydantic.model_validate(record["json_dict"])
+            except Exception:
+                return None
+        return TaskOutput(
+            description=record["description"],
+            name=record.get("name"),
+            expected_output=record.get("expected_output"),
+            summary=record.get("summary"),
+            raw=record.get("raw") or "",
+            pydantic=pydantic_output,
+            json_dict=record.get("json_dict"),
+            agent=record.get("agent") or "",
+            output_format=OutputFormat(record["output_format"]) if record.get("output_format") else OutputFormat.RAW,
+        )
@@ -6,12 +6,28 @@ from crewai_tools import LinkupSearchTool, SerperDevTool
 
 # Import the patent analysis tools
 from patent_crew.tools.custom_tool import PatentJsonLoaderTool, PatentGeminiPdfLoaderTool
+from patent_crew.tools.search_cache import CachedSearchTool
+from patent_crew.governed_llm import GovernedLLM
+from patent_crew.phase_brief import PHASE_BRIEF_TASK, ensure_phase_brief_bounded
+from patent_crew.output_guardrails import ensure_concept_json, ensure_evaluation_json, ensure_final_product_json
 
 # Ensure the output directory exists
 output_dir = "output/material_chemistry"
 os.makedirs(output_dir, exist_ok=True)
 
-# Guardrail Definition
+# Condense the Phase 1/2 outputs into one bounded brief for the Phase 3 tasks (phase_brief.py).
+# Off by default: compare quality first with tests/ab_phase_brief.py
+USE_PHASE_BRIEF = False
+
+# Serve repeated web searches from the on-disk search cache, see tools/search_cache.py
+USE_SEARCH_CACHE = True
+
+# Fields (and per-field token budgets) passed to the patent_analyst, None loads the full patent JSON.
+# Off by default: a projection truncates the claims and description. Try patent_projection.DEFAULT_PROJECTION on a
+# sample, then check the savings in projection_report.jsonl and the output quality before switching it on
+PATENT_JSON_PROJECTION = None
+
+# Guardrail Definition (the JSON-producing tasks use the schema-aware guardrails of output_guardrails.py)
 def ensure_output_exists(task_output: TaskOutput) -> Tuple[bool, Any]:
     """
     A simple guardrail to ensure the task's raw output is not empty.
@@ -24,7 +40,7 @@ def ensure_output_exists(task_output: TaskOutput) -> Tuple[bool, Any]:
 
 @CrewBase
 class PatentAnalysisCrew():
-    """Enhanced Patent-to-Product Analysis Crew with 11 tasks and 9 agents"""
+    """Enhanced Patent-to-Product Analysis Crew with 11 tasks and 9 agents (12 and 10 with USE_PHASE_BRIEF)"""
     agents_config = 'config/agents_mc.yaml'
     tasks_config = 'config/tasks_mc.yaml'
 
@@ -32,26 +48,27 @@ class PatentAnalysisCrew():
     agents: List[Agent]
     tasks: List[Task]
     
-    llm_small= LLM(
+    # GovernedLLM: per-model requests/min and tokens/min governor with 429 backoff, see rate_governor.py
+    llm_small= GovernedLLM(
         model="gemini/gemini-2.0-flash",
         temperature=0.1,
         timeout=180
     )
 
 # Rate limit exceeded
-    llm_large = LLM(
+    llm_large = GovernedLLM(
         model="gemini/gemini-2.5-pro-preview-05-06",
         temperature=0.3
     )
 
-    llm_openai_mini = LLM(
+    llm_openai_mini = GovernedLLM(
         model="gpt-4o-mini",
         # model="openai/o3-mini",
         temperature=0,
         timeout=180
     )
     
-    llm_openai_o3 = LLM(
+    llm_openai_o3 = GovernedLLM(
         # model="gpt-4o-mini",
         model="openai/o3-mini",
         temperature=0.2,
@@ -62,9 +79,18 @@ class PatentAnalysisCrew():
     # Instantiate tools
     linkup_search_tool = LinkupSearchTool(api_key=os.getenv("LINKUP_API_KEY"))
     serper_dev_tool = SerperDevTool(api_key=os.getenv("SERPER_API_KEY"))
-    patent_json_loader_tool = PatentJsonLoaderTool()
+    patent_json_loader_tool = PatentJsonLoaderTool(
+        projection=PATENT_JSON_PROJECTION,
+        projection_report_path=os.path.join(output_dir, "projection_report.jsonl")
+    )
     patent_gemini_pdf_loader_tool = PatentGeminiPdfLoaderTool()
 
+    def search_tool_for(self, agent_label: str):
+        """The shared Linkup search tool, behind the search cache with per-agent hit counts."""
+        if not USE_SEARCH_CACHE:
+            return self.linkup_search_tool
+        return CachedSearchTool.wrap(self.linkup_search_tool, agent_label=agent_label)
+
     # ===============================
     # PHASE 1: Patent & Technology Analysis (2 Agents)
     # ===============================
@@ -95,7 +121,7 @@ class PatentAnalysisCrew():
     def market_research_analyst(self) -> Agent:
         return Agent(
             config=self.agents_config['market_research_analyst'],
-            tools=[self.linkup_search_tool],
+            tools=[self.search_tool_for('market_research_analyst')],
             verbose=False,
             llm=self.llm_openai_o3,
         )
@@ -104,11 +130,23 @@ class PatentAnalysisCrew():
     def product_research_analyst(self) -> Agent:
         return Agent(
             config=self.agents_config['product_research_analyst'],
-            tools=[self.linkup_search_tool],
+            tools=[self.search_tool_for('product_research_analyst')],
             verbose=False,
             llm=self.llm_openai_o3
         )
 
+    # ===============================
+    # PHASE BRIEF (optional): Context Compaction (1 Agent)
+    # ===============================
+
+    @agent
+    def phase_brief_writer(self) -> Agent:
+        return Agent(
+            config=self.agents_config['phase_brief_writer'],
+            verbose=False,
+            llm=self.llm_small
+        )
+
     # ===============================
     # PHASE 3: Product Concept Generation (3 Agents)
     # ===============================
@@ -146,7 +184,7 @@ class PatentAnalysisCrew():
         return Agent(
             config=self.agents_config['product_evaluator_1'],
             verbose=False,
-            tools=[self.linkup_search_tool],
+            tools=[self.search_tool_for('product_evaluator_1')],
             llm=self.llm_openai_o3,
             max_retries=3
         )
@@ -156,7 +194,7 @@ class PatentAnalysisCrew():
         return Agent(
             config=self.agents_config['product_evaluator_2'],
             verbose=False,
-            tools=[self.linkup_search_tool],
+            tools=[self.search_tool_for('product_evaluator_2')],
             llm=self.llm_openai_o3,
             max_retries=3
         )
@@ -166,7 +204,7 @@ class PatentAnalysisCrew():
         return Agent(
             config=self.agents_config['product_evaluator_3'],
             verbose=False,
-            tools=[self.linkup_search_tool],
+            tools=[self.search_tool_for('product_evaluator_3')],
             llm=self.llm_openai_o3,
             max_retries=3
         )
@@ -232,22 +270,47 @@ class PatentAnalysisCrew():
         )
 
     # ===============================
-    # PHASE 3: Product Concept Generation (3 Tasks)
+    # PHASE BRIEF (optional): Context Compaction (1 Task)
     # ===============================
 
     @task
-    def product_concept_pm_task(self) -> Task:
+    def phase_brief_task(self) -> Task:
         return Task(
-            config=self.tasks_config['product_concept_pm_task'],
-            agent=self.product_manager(),
-            async_execution=True,
+            config=self.tasks_config['phase_brief_task'],
+            agent=self.phase_brief_writer(),
             context=[
                 self.market_opportunity_analysis_task(),
                 self.user_pain_point_validation_task(),
                 self.document_analysis_task(),
                 self.document_visual_analysis_task()
             ],
-            guardrail=ensure_output_exists,
+            guardrail=ensure_phase_brief_bounded,
+            max_retries=3
+        )
+
+    def phase_3_context(self) -> List[Task]:
+        """Context of the Phase 3 concept tasks: the phase brief, or the four Phase 1/2 outputs."""
+        if USE_PHASE_BRIEF:
+            return [self.phase_brief_task()]
+        return [
+            self.market_opportunity_analysis_task(),
+            self.user_pain_point_validation_task(),
+            self.document_analysis_task(),
+            self.document_visual_analysis_task()
+        ]
+
+    # ===============================
+    # PHASE 3: Product Concept Generation (3 Tasks)
+    # ===============================
+
+    @task
+    def product_concept_pm_task(self) -> Task:
+        return Task(
+            config=self.tasks_config['product_concept_pm_task'],
+            agent=self.product_manager(),
+            async_execution=True,
+            context=self.phase_3_context(),
+            guardrail=ensure_concept_json,
             max_retries=3
         )
 
@@ -257,13 +320,8 @@ class PatentAnalysisCrew():
             config=self.tasks_config['product_concept_entrepreneur_task'],
             agent=self.serial_entrepreneur(),
             async_execution=True,
-            context=[
-                self.market_opportunity_analysis_task(),
-                self.user_pain_point_validation_task(),
-                self.document_analysis_task(),
-                self.document_visual_analysis_task()
-            ],
-            guardrail=ensure_output_exists,
+            context=self.phase_3_context(),
+            guardrail=ensure_concept_json,
             max_retries=3
         )
 
@@ -273,13 +331,8 @@ class PatentAnalysisCrew():
             config=self.tasks_config['product_concept_research_task'],
             agent=self.research_commercialization_expert(),
             async_execution=True,
-            context=[
-                self.market_opportunity_analysis_task(),
-                self.user_pain_point_validation_task(),
-                self.document_analysis_task(),
-                self.document_visual_analysis_task()
-            ],
-            guardrail=ensure_output_exists,
+            context=self.phase_3_context(),
+            guardrail=ensure_concept_json,
             max_retries=3
         )
 
@@ -293,7 +346,7 @@ class PatentAnalysisCrew():
             config=self.tasks_config['product_evaluation_pm_task'],
             agent=self.product_evaluator_1(),
             context=[self.product_concept_pm_task()],
-            guardrail=ensure_output_exists,
+            guardrail=ensure_evaluation_json('product_evaluation_pm_task'),
             max_retries=3
         )
 
@@ -303,7 +356,7 @@ class PatentAnalysisCrew():
             config=self.tasks_config['product_evaluation_entrepreneur_task'],
             agent=self.product_evaluator_2(),
             context=[self.product_concept_entrepreneur_task()],
-            guardrail=ensure_output_exists,
+            guardrail=ensure_evaluation_json('product_evaluation_entrepreneur_task'),
             max_retries=3
         )
 
@@ -313,7 +366,7 @@ class PatentAnalysisCrew():
             config=self.tasks_config['product_evaluation_research_task'],
             agent=self.product_evaluator_3(),
             context=[self.product_concept_research_task()],
-            guardrail=ensure_output_exists,
+            guardrail=ensure_evaluation_json('product_evaluation_research_task'),
             max_retries=3
         )
 
@@ -327,15 +380,16 @@ class PatentAnalysisCrew():
                 self.product_evaluation_entrepreneur_task(),
                 self.product_evaluation_research_task()
             ],
-            guardrail=ensure_output_exists,
+            guardrail=ensure_final_product_json,
             max_retries=3
         )
 
     @crew
     def crew(self) -> Crew:
+        tasks = [t for t in self.tasks if USE_PHASE_BRIEF or t.name != PHASE_BRIEF_TASK]
         return Crew(
-            agents=self.agents,
-            tasks=self.tasks,
+            agents=[a for a in self.agents if any(t.agent is a for t in tasks)],
+            tasks=tasks,
             process=Process.sequential,
             memory=False,
             verbose=True
@@ -9,23 +9,36 @@ Upon rewriting, we want to check the length of each field, make sure it's less t
 
 Finally, we save the rewritten product concept in the same place, with a suffix:
 output/{CATEGORY}/{batch_idx}/{publication_number}_output_short.json
+
+The crew is built once; files go through a sliding window (work_pool.py) with MAX_CONCURRENT_REWRITES
+crew copies in flight, and each short file is written as soon as its rewrite completes.
+Files whose short version is newer than the source are skipped.
+
+Before the LLM, pre_shortener.py compacts over-long fields locally. A file whose fields all fit is saved
+without an LLM call; otherwise only the fields still over their limit are sent to the crew.
+The share of LLM calls avoided is printed at the end of each run.
 '''
 
+import asyncio
 import glob
 import json
 import os
-from typing import List, Tuple, Any, Dict
+from typing import List, Tuple, Any, Dict, Optional
 from crewai import Agent, Task, Crew, Process, LLM, TaskOutput
 from crewai.project import CrewBase, agent, crew, task
 
-# Import the patent analysis tools
-from patent_crew.tools.custom_tool import PatentJsonLoaderTool, PatentGeminiPdfLoaderTool
+from patent_crew.governed_llm import GovernedLLM
+from patent_crew.output_manifest import parse_output_text
+from patent_crew.pre_shortener import FIELD_LIMITS, pre_shorten_entry
+from patent_crew.work_pool import run_sliding_window
 
 # set to a specific patent number to process only that file, or None to process all files
 TARGET_PATENT_NUMBER = "US-12013751-B2" 
 
 # choose a category: nlp, computer_science, material_chemistry
 CATEGORY = "computer_science"
+MAX_CONCURRENT_REWRITES = 8 # Rewrites in flight at once; o3-mini calls are still paced by the rate governor
+SKIP_UP_TO_DATE = True # Skip files whose _output_short.json is newer than the _output.json
 # Ensure the output directory exists
 output_dir = f"output/{CATEGORY}"
 os.makedirs(output_dir, exist_ok=True)
@@ -58,7 +71,8 @@ class RewriteCrew():
     agents_config = 'config/rewrite_agents.yaml'
     tasks_config = 'config/rewrite_tasks.yaml'
     
-    llm_openai_o3 = LLM(
+    # GovernedLLM: rate governor, instrumentation and record/replay, see governed_llm.py
+    llm_openai_o3 = GovernedLLM(
         model="openai/o3-mini",
         temperature=0.2,
         timeout=180
@@ -94,64 +108,131 @@ def find_json_files(directory: str) -> List[str]:
     """Find all JSON files ending with '_output.json' in the specified directory."""
     return glob.glob(f"{directory}/**/*_output.json", recursive=True)
 
-if __name__ == '__main__':
-    json_files = find_json_files(output_dir)
-    
-    print(f"Found {len(json_files)} files to process.")
-    
-    if not json_files:
-        print(f"No '_output.json' files found in {output_dir}")
-    else:
-        print(f"First file: {json_files[0]}")
-        
-        # # test with a single file
-        # files_to_process = [json_files[0]]
-        # json_files = files_to_process
-        
-        print(f"Found {len(json_files)} files to process.")
-        
+def get_short_output_path(json_file: str) -> str:
+    return json_file.replace('_output.json', '_output_short.json')
 
+def is_short_output_up_to_date(json_file: str) -> bool:
+    """True if the short version exists and was written after the source was last modified."""
+    short_file = get_short_output_path(json_file)
+    try:
+        return os.path.getmtime(short_file) >= os.path.getmtime(json_file)
+    except OSError:
+        return False
+
+def parse_rewrite_result(result: Any) -> Optional[Dict[str, Any]]:
+    """The rewritten JSON from a CrewOutput, or None if the crew did not return valid JSON."""
+    # The result of a crew kickoff is a CrewOutput object.
+    # The final result is in the `raw` attribute.
+    if not (result and hasattr(result, 'raw') and result.raw):
+        return None
+    if isinstance(result.raw, dict):
+        return result.raw
+    try:
+        return json.loads(result.raw)
+    except json.JSONDecodeError:
+        return None
+
+def save_short_output(json_file: str, data: Dict[str, Any]) -> str:
+    """Writes the short version next to the source, atomically so an interrupted run never leaves a partial file."""
+    output_filename = get_short_output_path(json_file)
+    tmp_filename = f"{output_filename}.tmp"
+    with open(tmp_filename, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_filename, output_filename)
+    return output_filename
+
+async def rewrite_file(crew: Crew, json_file: str) -> Dict[str, Any]:
+    """
+    Shortens one file locally, then rewrites the fields still too long with its own copy of the crew,
+    and saves the short version. Raises on failure, including when a field is still over its limit after
+    the rewrite; nothing is saved then.
+
+    Returns:
+        dict: output_file, llm_call (whether the crew ran), fields_over_limit and fields_shortened_locally.
+    """
+    with open(json_file, 'r') as f:
+        file_content = f.read()
+    try:
+        entry = parse_output_text(file_content)
+    except json.JSONDecodeError:
+        entry = None
+    if not isinstance(entry, dict):
+        # Not a JSON object: the crew gets the whole file, as before
+        result = await crew.copy().kickoff_async(inputs={'json_file': file_content})
+        data_to_save = parse_rewrite_result(result)
+        if not data_to_save:
+            raise ValueError(f"Unexpected result format: {type(result)} -> {result}")
+        return {"output_file": save_short_output(json_file, data_to_save), "llm_call": True,
+                "fields_over_limit": 0, "fields_shortened_locally": 0}
+
+    fields_over_limit = [field for field, limit in FIELD_LIMITS.items() if isinstance(entry.get(field), str) and len(entry[field]) > limit]
+    shortened, remaining = pre_shorten_entry(entry)
+    report = {"llm_call": bool(remaining), "fields_over_limit": len(fields_over_limit),
+              "fields_shortened_locally": len(fields_over_limit) - len(remaining)}
+    if remaining:
+        to_rewrite = {'publication_number': entry.get('publication_number'), **{field: shortened[field] for field in remaining}}
+        result = await crew.copy().kickoff_async(inputs={'json_file': json.dumps(to_rewrite, indent=2)})
+        rewritten = parse_rewrite_result(result)
+        if not rewritten:
+            raise ValueError(f"Unexpected result format: {type(result)} -> {result}")
+        # The guardrail lets fields up to 350 characters through, the local pass brings them to the compile limits
+        shortened, still_over = pre_shorten_entry({**shortened, **{field: rewritten[field] for field in remaining if field in rewritten}})
+        if still_over:
+            # Left out by the crew or still too long: saving them would only move the failure to compile_result.py
+            raise ValueError(f"Fields still over their limit after the rewrite: {', '.join(still_over)}")
+    report["output_file"] = save_short_output(json_file, shortened)
+    return report
+
+async def rewrite_files(json_files: List[str], max_in_flight: int = MAX_CONCURRENT_REWRITES) -> Dict[str, Any]:
+    """
+    Rewrites every file with at most max_in_flight crews in flight.
+
+    Returns:
+        The run_sliding_window summary, plus llm_calls, llm_calls_avoided and the fields counts.
+    """
+    crew = RewriteCrew().crew()
+    totals = {"llm_calls": 0, "llm_calls_avoided": 0, "fields_over_limit": 0, "fields_shortened_locally": 0}
+
+    def on_done(json_file: str, report: Optional[Dict[str, Any]], error: BaseException | None) -> None:
+        if error is not None:
+            print(f"Failed to process {json_file}: {error}")
+            return
+        totals["llm_calls" if report["llm_call"] else "llm_calls_avoided"] += 1
+        totals["fields_over_limit"] += report["fields_over_limit"]
+        totals["fields_shortened_locally"] += report["fields_shortened_locally"]
+        how = "rewritten" if report["llm_call"] else "shortened locally"
+        print(f"Successfully {how} and saved to {report['output_file']}")
+
+    summary = await run_sliding_window(json_files, lambda json_file: rewrite_file(crew, json_file), max_in_flight, on_done=on_done)
+    return {**summary, **totals}
+
+def select_files_to_rewrite(json_files: List[str]) -> List[str]:
+    selected = []
     for json_file in json_files:
         if TARGET_PATENT_NUMBER and TARGET_PATENT_NUMBER not in json_file:
             continue
-            
-        print(f"\n----- Processing file: {json_file} -----")
-        try:
-            with open(json_file, 'r') as f:
-                file_content = f.read()
-            print(f"Successfully read file content. Size: {len(file_content)} bytes.")
-            
-            inputs = {'json_file': file_content}
-            
-            print("Kicking off RewriteCrew...")
-            rewrite_crew = RewriteCrew()
-            result = rewrite_crew.crew().kickoff(inputs=inputs)
-            print("RewriteCrew finished.")
-            
-            
-            # save the result to a new file
-            output_filename = json_file.replace('_output.json', '_output_short.json')
-            
-            data_to_save = None
-            # The result of a crew kickoff is a CrewOutput object.
-            # The final result is in the `raw` attribute.
-            if result and hasattr(result, 'raw') and result.raw:
-                if isinstance(result.raw, dict):
-                    data_to_save = result.raw
-                else:
-                    try:
-                        data_to_save = json.loads(result.raw)
-                    except json.JSONDecodeError:
-                        print(f"Failed to process {json_file}. Result.raw is a string but not valid JSON: {result.raw}")
-            else:
-                 print(f"Failed to process {json_file}. Unexpected result format: {type(result)} -> {result}")
-
-            if data_to_save:
-                with open(output_filename, 'w') as f:
-                    json.dump(data_to_save, f, indent=2)
-                print(f"Successfully rewritten and saved to {output_filename}")
-            else:
-                print(f"Failed to process {json_file}. Unexpected result format: {type(result)} -> {result}")
-
-        except Exception as e:
-            print(f"An error occurred while processing {json_file}: {e}") 
\ No newline at end of file
+        if SKIP_UP_TO_DATE and is_short_output_up_to_date(json_file):
+            continue
+        selected.append(json_file)
+    return selected
+
+if __name__ == '__main__':
+    json_files = find_json_files(output_dir)
+    print(f"Found {len(json_files)} files in {output_dir}.")
+
+    files_to_process = select_files_to_rewrite(json_files)
+    print(f"{len(files_to_process)} files to rewrite ({len(json_files) - len(files_to_process)} skipped), "
+          f"{MAX_CONCURRENT_REWRITES} in flight.")
+
+    if files_to_process:
+        summary = asyncio.run(rewrite_files(files_to_process))
+        print(
+            f"Rewrite finished: {summary['completed']} succeeded, {summary['failed']} failed "
+            f"in {summary['duration_s']}s ({summary['items_per_hour']} files/hour)."
+        )
+        files_done = summary['llm_calls'] + summary['llm_calls_avoided']
+        print(
+            f"Pre-shortener: {summary['llm_calls_avoided']}/{files_done} LLM calls avoided "
+            f"({summary['llm_calls_avoided'] / max(files_done, 1):.0%}), "
+            f"{summary['fields_shortened_locally']}/{summary['fields_over_limit']} over-long fields shortened locally."
+        )
@@ -0,0 +1,233 @@
+'''
+Dependency-aware scheduler for a crew's tasks.
+
+Process.sequential runs the 11 tasks of PatentAnalysisCrew one after the other; async_execution only
+overlaps a block of async tasks, and the next sync task waits for all of them. Yet the task graph
+declared with context=[...] in crew.py is much wider:
+
+    document_analysis ─┬─> market_opportunity ──┬─> concept_pm ───────> evaluation_pm ───────┐
+    document_visual ───┴─> user_pain_point ─────┼─> concept_entrepreneur > evaluation_entrepreneur ┼─> final_selection
+                                                └─> concept_research ─> evaluation_research ─┘
+
+run_crew_dag executes every task as soon as all tasks in its context are done, so the wall-clock per
+patent follows the critical path (5 LLM hops) instead of the sum of all 11.
+Tasks without a context depend on nothing; the async_execution flags are ignored in this mode.
+
+With an instrumentation_path, timing, queue wait, LLM and tool usage of every task are appended to that
+JSONL file (instrumentation.py).
+
+With a checkpoint_dir, every task output is checkpointed as it completes (checkpoint_store.py) and a
+re-run only executes the tasks whose checkpoint is missing or stale, plus the tasks depending on them.
+Restored tasks with an output_file write it again from their checkpoint. Executed tasks write it again too,
+with the output their guardrail repaired (Task.execute_sync writes the output from before the guardrail).
+'''
+
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from crewai import Crew, Task, TaskOutput
+from crewai.crews.crew_output import CrewOutput
+from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs
+
+from patent_crew.checkpoint_store import PatentCheckpointStore
+from patent_crew.instrumentation import task_span
+
+# Upper bound of tasks of one crew running at the same time
+DAG_MAX_WORKERS = 4
+
+
+def get_task_dependencies(tasks: List[Task]) -> Dict[int, List[int]]:
+    """
+    Reads the context=[...] edges of the tasks.
+
+    Returns:
+        A dict mapping each task index to the indices of the tasks it depends on.
+
+    Raises:
+        ValueError: If a task's context references a task that is not part of the crew.
+    """
+    index_by_id = {id(task): i for i, task in enumerate(tasks)}
+    dependencies: Dict[int, List[int]] = {}
+    for i, task in enumerate(tasks):
+        context = task.context if isinstance(task.context, list) else []
+        deps = []
+        for context_task in context:
+            if id(context_task) not in index_by_id:
+                raise ValueError(f"Task '{task.name or task.description[:40]}' has a context task that is not in the crew.")
+            deps.append(index_by_id[id(context_task)])
+        dependencies[i] = deps
+    return dependencies
+
+
+def get_critical_path_length(dependencies: Dict[int, List[int]]) -> int:
+    """Returns the number of tasks on the longest dependency chain. Raises ValueError on cycles."""
+    depth: Dict[int, int] = {}
+    visiting = set()
+
+    def visit(i: int) -> int:
+        if i in depth:
+            return depth[i]
+        if i in visiting:
+            raise ValueError("The task context graph has a cycle.")
+        visiting.add(i)
+        depth[i] = 1 + max((visit(d) for d in dependencies[i]), default=0)
+        visiting.discard(i)
+        return depth[i]
+
+    return max((visit(i) for i in dependencies), default=0)
+
+
+def _prepare_crew(crew: Crew, inputs: Optional[Dict[str, Any]]) -> None:
+    """Does the part of Crew.kickoff setup the tasks need: input interpolation and agent/crew wiring."""
+    if inputs:
+        crew._inputs = inputs
+        crew._interpolate_inputs(inputs)
+    for agent in crew.agents:
+        agent.crew = crew
+        if not agent.function_calling_llm and crew.function_calling_llm:
+            agent.function_calling_llm = crew.function_calling_llm
+        if not agent.step_callback and crew.step_callback:
+            agent.step_callback = crew.step_callback
+
+
+def get_task_key(task: Task, i: int) -> str:
+    """Stable name of a task for checkpoints: the @task method name, or its position."""
+    return task.name or f"task_{i}"
+
+
+def load_checkpointed_outputs(tasks: List[Task], dependencies: Dict[int, List[int]],
+                              store: PatentCheckpointStore) -> Dict[int, TaskOutput]:
+    """
+    Returns the checkpointed outputs that can be reused: a task's checkpoint counts only if it matches the
+    task's current description and every task it depends on is reused as well.
+    """
+    reused: Dict[int, TaskOutput] = {}
+    checked: Dict[int, bool] = {}
+
+    def is_reusable(i: int) -> bool:
+        if i not in checked:
+            checked[i] = False  # Guards against cycles; get_critical_path_length reports them
+            if all(is_reusable(d) for d in dependencies[i]):
+                output = store.load(get_task_key(tasks[i], i), tasks[i])
+                if output is not None:
+                    reused[i] = output
+                    checked[i] = True
+        return checked[i]
+
+    for i in range(len(tasks)):
+        is_reusable(i)
+    return reused
+
+
+def save_output_file(task: Task, output: TaskOutput) -> None:
+    """
+    Writes an output to the task's output_file, with the content Task.execute_sync writes for it. Used for restored
+    tasks, and after each run: execute_sync writes the raw output from before the guardrail, not the repaired one.
+    """
+    if output.json_dict:
+        content = output.json_dict
+    elif output.pydantic is not None:
+        content = output.pydantic.model_dump_json()
+    else:
+        content = output.raw
+    task._save_file(content)
+
+
+def run_crew_dag(crew: Crew, inputs: Optional[Dict[str, Any]] = None, max_workers: int = DAG_MAX_WORKERS,
+                 checkpoint_dir: Optional[str] = None, instrumentation_path: Optional[str] = None,
+                 rerun_final_task: bool = False) -> CrewOutput:
+    """
+    Runs a crew's tasks following their context dependencies, each ready task concurrently.
+
+    Args:
+        crew: The crew whose tasks to run (use crew.copy() to run several patents at once).
+        inputs: Inputs interpolated into the task and agent templates, as with Crew.kickoff.
+        max_workers: Maximum number of tasks running at the same time.
+        checkpoint_dir: Optional per-patent directory to checkpoint each task output into and resume from.
+        instrumentation_path: Optional JSONL file receiving one measurement record per executed task.
+        rerun_final_task: Runs the last task even if it has a checkpoint, e.g. when the output file it wrote is invalid.
+
+    Returns:
+        A CrewOutput whose raw/json/pydantic come from the last task, with tasks_output in declaration order.
+    """
+    tasks = crew.tasks
+    dependencies = get_task_dependencies(tasks)
+    print(f"[DEBUG dag_scheduler.py] {len(tasks)} tasks, critical path of {get_critical_path_length(dependencies)} tasks")
+    _prepare_crew(crew, inputs)
+
+    store = PatentCheckpointStore(checkpoint_dir) if checkpoint_dir else None
+    outputs: Dict[int, TaskOutput] = load_checkpointed_outputs(tasks, dependencies, store) if store else {}
+    if rerun_final_task:
+        outputs.pop(len(tasks) - 1, None)  # No task depends on it, the others stay reusable
+    if outputs:
+        print(f"[DEBUG dag_scheduler.py] Resuming: {len(outputs)}/{len(tasks)} tasks restored from {checkpoint_dir}")
+    for i, output in outputs.items():
+        # A restored task does not run, so its output file (e.g. a deleted _output.json) would never be written again
+        if tasks[i].output_file:
+            save_output_file(tasks[i], output)
+    # One agent never runs two tasks at once
+    agent_locks: Dict[int, threading.Lock] = {id(task.agent): threading.Lock() for task in tasks}
+
+    publication_number = (inputs or {}).get("publication_number")
+    ready_at: Dict[int, float] = {}
+
+    def execute(i: int) -> TaskOutput:
+        task = tasks[i]
+        context = aggregate_raw_outputs_from_task_outputs([outputs[d] for d in dependencies[i]])
+        tools = task.tools or task.agent.tools or []
+        with agent_locks[id(task.agent)]:
+            with task_span(instrumentation_path, publication_number, get_task_key(task, i), task.agent.role, ready_at[i]) as span:
+                try:
+                    output = task.execute_sync(agent=task.agent, context=context, tools=tools)
+                finally:
+                    span.guardrail_retries = getattr(task, "retry_count", 0)
+        if task.output_file:
+            save_output_file(task, output)
+        if store:
+            # Saved from the worker, so tasks finishing after a sibling failed are kept too
+            store.save(get_task_key(task, i), output)
+        return output
+
+    remaining = set(range(len(tasks))) - set(outputs)
+    running: Dict[Future, int] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while remaining or running:
+            ready = [i for i in sorted(remaining) if all(d in outputs for d in dependencies[i])]
+            for i in ready:
+                remaining.discard(i)
+                ready_at[i] = time.time()
+                running[executor.submit(execute, i)] = i
+            if not running:
+                raise ValueError("The task context graph has a cycle or an unsatisfiable dependency.")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                # Propagates the task's exception; pending tasks are left to finish by the executor shutdown
+                outputs[i] = future.result()
+
+    task_outputs = [outputs[i] for i in range(len(tasks))]
+    final_output = task_outputs[-1]
+    return CrewOutput(
+        raw=final_output.raw,
+        pydantic=final_output.pydantic,
+        json_dict=final_output.json_dict,
+        tasks_output=task_outputs,
+        token_usage=crew.calculate_usage_metrics(),
+    )
+
+
+async def kickoff_dag_async(crew: Crew, inputs: Dict[str, Any], max_workers: int = DAG_MAX_WORKERS,
+                            checkpoint_dir: Optional[str] = None, instrumentation_path: Optional[str] = None,
+                            rerun_final_task: bool = False) -> CrewOutput:
+    """Runs run_crew_dag on a copy of the crew without blocking the event loop."""
+    crew_copy = crew.copy()
+    return await asyncio.to_thread(run_crew_dag, crew_copy, inputs, max_workers, checkpoint_dir, instrumentation_path,
+                                   rerun_final_task)
+
+
+async def kickoff_for_each_dag_async(crew: Crew, inputs: List[Dict[str, Any]], max_workers: int = DAG_MAX_WORKERS) -> List[CrewOutput]:
+    """DAG counterpart of Crew.kickoff_for_each_async: one crew copy per input, all run concurrently."""
+    return await asyncio.gather(*(kickoff_dag_async(crew, input_data, max_workers) for input_data in inputs))
@@ -0,0 +1,51 @@
+'''
+crewai LLM whose calls go through the per-model rate governor (rate_governor.py).
+Drop-in replacement for LLM(...) in the crew definitions.
+Calls are also recorded or replayed by the replay backend (replay.py) when it is enabled.
+'''
+
+import json
+import time
+from typing import Any
+
+from crewai import LLM
+
+from patent_crew.instrumentation import record_llm_call
+from patent_crew.rate_governor import estimate_tokens, get_governor, governed_call
+from patent_crew.replay import get_replay_backend, synthetic_llm_response
+
+
+class GovernedLLM(LLM):
+    """LLM that waits for quota before each request and backs off on 429 responses."""
+
+    def call(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        prompt_text = messages if isinstance(messages, str) else json.dumps(messages, default=str)
+        estimated_tokens = estimate_tokens(prompt_text)
+        replay_backend = get_replay_backend()
+
+        if replay_backend.mode == "replay":
+            # No API call, so no quota to wait for
+            start = time.monotonic()
+            result = replay_backend.replay("llm", self.model, messages, lambda: synthetic_llm_response(messages))
+            record_llm_call(self.model, estimated_tokens, estimate_tokens(result), time.monotonic() - start)
+            return result
+
+        governor = get_governor(self.model)
+
+        attempts = 0
+
+        def attempt() -> Any:
+            nonlocal attempts
+            attempts += 1
+            return super(GovernedLLM, self).call(messages, *args, **kwargs)
+
+        start = time.monotonic()
+        result = governed_call(governor, attempt, estimated_tokens)
+        completion_tokens = estimate_tokens(result) if isinstance(result, str) else 0
+        # The completion also counts against tokens/min
+        governor.record_usage(0, completion_tokens)
+        duration_s = time.monotonic() - start
+        record_llm_call(self.model, estimated_tokens, completion_tokens, duration_s, retries=attempts - 1)
+        if replay_backend.mode == "record":
+            replay_backend.record("llm", self.model, messages, result, duration_s)
+        return result
@@ -0,0 +1,268 @@
+'''
+Local per-task instrumentation: timing, LLM usage and tool latency, without a SaaS dashboard.
+
+run_crew_dag opens a task span around every task. Inside it, GovernedLLM and the crew's tools report to the
+current span (through a context variable, so concurrent tasks and patents never mix):
+- start/end time and queue wait (from the moment the task was ready to the moment it started),
+- LLM call count, estimated prompt/completion tokens and rate-limit retries, per model,
+- tool call count and latency, per tool,
+- guardrail retries of the task.
+
+Each finished task is appended as one JSON line to the instrumentation file. The summary CLI prints p50/p95
+per task and the estimated cost per patent:
+
+    python -m patent_crew.instrumentation output/material_chemistry/instrumentation.jsonl
+'''
+
+import argparse
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# USD per 1M (prompt, completion) tokens; set to the account's actual prices
+MODEL_PRICES_PER_1M: Dict[str, Tuple[float, float]] = {
+    "gemini/gemini-2.0-flash": (0.10, 0.40),
+    "gemini/gemini-2.5-pro-preview-05-06": (1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "openai/o3-mini": (1.10, 4.40),
+}
+
+
+class TaskSpan:
+    """Measurements of one task run. Updated from the task's thread and the tools it calls."""
+
+    def __init__(self, publication_number: Optional[str], task_name: str, agent_role: str, ready_at: float):
+        self.publication_number = publication_number
+        self.task_name = task_name
+        self.agent_role = agent_role
+        self.ready_at = ready_at
+        self.started_at = time.time()
+        self.ended_at: Optional[float] = None
+        self.status = "running"
+        self.guardrail_retries = 0
+        self.llm: Dict[str, Dict[str, float]] = {}
+        self.tools: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def add_llm_call(self, model: str, prompt_tokens: int, completion_tokens: int, duration_s: float, retries: int) -> None:
+        with self._lock:
+            usage = self.llm.setdefault(model, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "time_s": 0.0, "retries": 0})
+            usage["calls"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+            usage["time_s"] += duration_s
+            usage["retries"] += retries
+
+    def add_tool_call(self, tool_name: str, duration_s: float) -> None:
+        with self._lock:
+            usage = self.tools.setdefault(tool_name, {"calls": 0, "time_s": 0.0})
+            usage["calls"] += 1
+            usage["time_s"] += duration_s
+
+    def to_record(self) -> Dict[str, Any]:
+        ended_at = self.ended_at or time.time()
+        return {
+            "publication_number": self.publication_number,
+            "task": self.task_name,
+            "agent": self.agent_role,
+            "status": self.status,
+            "started_at": round(self.started_at, 3),
+            "ended_at": round(ended_at, 3),
+            "queue_wait_s": round(max(0.0, self.started_at - self.ready_at), 3),
+            "duration_s": round(ended_at - self.started_at, 3),
+            "llm_calls": sum(int(u["calls"]) for u in self.llm.values()),
+            "prompt_tokens": sum(int(u["prompt_tokens"]) for u in self.llm.values()),
+            "completion_tokens": sum(int(u["completion_tokens"]) for u in self.llm.values()),
+            "rate_limit_retries": sum(int(u["retries"]) for u in self.llm.values()),
+            "guardrail_retries": self.guardrail_retries,
+            "tool_calls": sum(int(u["calls"]) for u in self.tools.values()),
+            "tool_time_s": round(sum(u["time_s"] for u in self.tools.values()), 3),
+            "llm_by_model": {model: {k: round(v, 3) for k, v in u.items()} for model, u in self.llm.items()},
+            "tools_by_name": {name: {k: round(v, 3) for k, v in u.items()} for name, u in self.tools.items()},
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[TaskSpan]] = contextvars.ContextVar("patent_crew_task_span", default=None)
+_write_lock = threading.Lock()
+
+
+def current_span() -> Optional[TaskSpan]:
+    return _current_span.get()
+
+
+@contextmanager
+def task_span(path: Optional[str], publication_number: Optional[str], task_name: str, agent_role: str,
+              ready_at: Optional[float] = None) -> Iterator[TaskSpan]:
+    """
+    Measures one task run and appends its record to path (nothing is written if path is None).
+    ready_at is the time.time() at which the task's dependencies were satisfied.
+    """
+    span = TaskSpan(publication_number, task_name, agent_role, ready_at if ready_at is not None else time.time())
+    token = _current_span.set(span)
+    try:
+        yield span
+        span.status = "completed"
+    except BaseException:
+        span.status = "failed"
+        raise
+    finally:
+        span.ended_at = time.time()
+        _current_span.reset(token)
+        if path:
+            write_record(path, span.to_record())
+
+
+@contextmanager
+def tool_span(tool_name: str) -> Iterator[None]:
+    """Times one tool call and charges it to the current task span, if any."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        span = _current_span.get()
+        if span is not None:
+            span.add_tool_call(tool_name, time.monotonic() - start)
+
+
+def instrumented_tool_call(fn: F) -> F:
+    """Decorator for a tool's _run / _arun: times the call under the tool's name."""
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            with tool_span(self.name):
+                return await fn(self, *args, **kwargs)
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        with tool_span(self.name):
+            return fn(self, *args, **kwargs)
+    return wrapper  # type: ignore[return-value]
+
+
+def record_llm_call(model: str, prompt_tokens: int, completion_tokens: int, duration_s: float, retries: int = 0) -> None:
+    """Charges one LLM call to the current task span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.add_llm_call(model, prompt_tokens, completion_tokens, duration_s, retries)
+
+
+def write_record(path: str, record: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps(record) + "\n"
+    with _write_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"Warning: skipping a malformed line in {path}")
+    return records
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def estimate_cost(llm_by_model: Dict[str, Dict[str, float]]) -> float:
+    """USD cost of a task's LLM usage, from MODEL_PRICES_PER_1M (models without a price count as 0)."""
+    cost = 0.0
+    for model, usage in llm_by_model.items():
+        prompt_price, completion_price = MODEL_PRICES_PER_1M.get(model, (0.0, 0.0))
+        cost += usage.get("prompt_tokens", 0) * prompt_price / 1e6 + usage.get("completion_tokens", 0) * completion_price / 1e6
+    return cost
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-task p50/p95 of duration, queue wait and tokens, and per-patent wall-clock, tokens and cost."""
+    by_task: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    by_patent: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for record in records:
+        by_task[record["task"]].append(record)
+        by_patent[record.get("publication_number") or "unknown"].append(record)
+
+    tasks = {}
+    for task_name, task_records in by_task.items():
+        durations = [r["duration_s"] for r in task_records]
+        waits = [r["queue_wait_s"] for r in task_records]
+        tokens = [r["prompt_tokens"] + r["completion_tokens"] for r in task_records]
+        tasks[task_name] = {
+            "runs": len(task_records),
+            "failed": sum(r["status"] != "completed" for r in task_records),
+            "duration_p50_s": percentile(durations, 50),
+            "duration_p95_s": percentile(durations, 95),
+            "queue_wait_p95_s": percentile(waits, 95),
+            "tokens_p50": percentile(tokens, 50),
+            "tokens_p95": percentile(tokens, 95),
+            "llm_calls_mean": round(sum(r["llm_calls"] for r in task_records) / len(task_records), 2),
+            "tool_time_p95_s": percentile([r["tool_time_s"] for r in task_records], 95),
+            "cost_mean_usd": round(sum(estimate_cost(r["llm_by_model"]) for r in task_records) / len(task_records), 5),
+        }
+
+    patents = {}
+    for publication_number, patent_records in by_patent.items():
+        patents[publication_number] = {
+            "tasks": len(patent_records),
+            "wall_clock_s": round(max(r["ended_at"] for r in patent_records) - min(r["started_at"] for r in patent_records), 2),
+            "tokens": sum(r["prompt_tokens"] + r["completion_tokens"] for r in patent_records),
+            "cost_usd": round(sum(estimate_cost(r["llm_by_model"]) for r in patent_records), 5),
+        }
+    costs = [p["cost_usd"] for p in patents.values()]
+    return {
+        "tasks": tasks,
+        "patents": patents,
+        "cost_per_patent_p50_usd": percentile(costs, 50),
+        "cost_per_patent_p95_usd": percentile(costs, 95),
+    }
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    print(f"{'task':40} {'runs':>5} {'fail':>5} {'p50 s':>8} {'p95 s':>8} {'wait p95':>9} {'tok p50':>8} {'tok p95':>8} {'$ mean':>9}")
+    for task_name, t in sorted(summary["tasks"].items(), key=lambda item: -item[1]["duration_p95_s"]):
+        print(f"{task_name:40} {t['runs']:>5} {t['failed']:>5} {t['duration_p50_s']:>8.1f} {t['duration_p95_s']:>8.1f} "
+              f"{t['queue_wait_p95_s']:>9.1f} {t['tokens_p50']:>8} {t['tokens_p95']:>8} {t['cost_mean_usd']:>9.4f}")
+    patents = summary["patents"]
+    if patents:
+        wall_clocks = [p["wall_clock_s"] for p in patents.values()]
+        print(f"\n{len(patents)} patents: wall-clock p50 {percentile(wall_clocks, 50):.1f}s / p95 {percentile(wall_clocks, 95):.1f}s, "
+              f"cost per patent p50 ${summary['cost_per_patent_p50_usd']:.4f} / p95 ${summary['cost_per_patent_p95_usd']:.4f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize a crew instrumentation JSONL file.")
+    parser.add_argument("path", help="e.g. output/material_chemistry/instrumentation.jsonl")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    summary = summarize(load_records(args.path))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,12 @@ import time
 from dotenv import load_dotenv
 load_dotenv() 
 
+from patent_crew.patent_index import get_patent_by_publication_number
 from patent_crew.crew import PatentAnalysisCrew 
+from patent_crew.checkpoint_store import get_checkpoint_dir
+from patent_crew.dag_scheduler import run_crew_dag
+from patent_crew.phase_brief import measure_context_reduction, write_phase_brief_report
+from patent_crew.tools.search_cache import get_search_cache_stats
 
 
 # --- Global Configuration ---
@@ -21,58 +26,13 @@ DEFAULT_CATEGORY = "nlp"  # Choose category to process: {nlp, material_chemistry
 KNOWLEDGE_ROOT_DIR = "knowledge" # This is used as the base for making json_file_path relative
 OUTPUT_DIR = "output"
 TARGET_PUBLICATION_NUMBER = "US-11423042-B2" # Specify the patent to process.
+USE_DAG_SCHEDULER = True # Run independent tasks concurrently (dag_scheduler.py) instead of Process.sequential
+INSTRUMENTATION_FILE = "instrumentation.jsonl" # Per-task timing/token records under output/{category}/ (DAG scheduler only), None to disable
+RESUME_FROM_CHECKPOINTS = True # Checkpoint each task output under output/{category}/checkpoints/ and skip completed tasks on re-runs (DAG scheduler only)
 # ---------------------------
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
-def get_patent_metadadata(category: str, knowledge_root_dir: str = KNOWLEDGE_ROOT_DIR) -> List[Dict[str, Any]]:
-    """
-    Reads the {category}.jsonl file to get patent metadata.
-    Args:
-        category: The category of patents to process (e.g., 'nlp').
-        knowledge_root_dir: The root directory of the knowledge base, used as a reference.
-
-    Returns:
-        A list of dictionaries, where each dictionary contains:
-        - 'publication_number': The publication number of the patent.
-        - 'json_file_path': Path to the JSON file, made relative to knowledge_root_dir.
-        - 'pdf_file_path': Path to the PDF file, derived from json_file_path.
-        - 'category': The category of the patent.
-        - 'absolute_image_paths': A list of verified absolute file paths for associated images.
-    """
-    patent_info_list: List[Dict[str, Any]] = []
-    jsonl_file_name = f"{category}.jsonl"
-    base_jsonl_path = Path(knowledge_root_dir) / category / jsonl_file_name
-
-    if not base_jsonl_path.exists():
-        raise FileNotFoundError(f"JSONL index file not found at {base_jsonl_path}")
-
-    with open(base_jsonl_path, 'r') as f_jsonl:
-        for line in f_jsonl:
-            patent_data = json.loads(line.strip())
-            publication_number = patent_data.get('publication_number')
-            json_path_str = patent_data.get('json_file_path')
-            image_paths_from_jsonl = patent_data.get('image_file_paths', [])
-
-            if publication_number and json_path_str:
-                pdf_path_str = json_path_str.rsplit('.', 1)[0] + '.pdf'
-                
-                absolute_image_paths = [
-                    p for p in image_paths_from_jsonl if os.path.isabs(p) and os.path.exists(p)
-                ]
-                
-                image_paths_str = "\n".join(absolute_image_paths)
-                patent_info_list.append({
-                    'publication_number': publication_number,
-                    'json_file_path': json_path_str,
-                    'category': category,
-                    'absolute_image_paths': absolute_image_paths,
-                    'image_path_str': image_paths_str,
-                    'pdf_file_path': pdf_path_str
-                })
-
-    return patent_info_list
-
 def run():
     """
     Run the Patent Analysis crew for a specific patent.
@@ -87,9 +47,7 @@ def run():
     output_base_dir = Path(OUTPUT_DIR) / DEFAULT_CATEGORY
     output_base_dir.mkdir(parents=True, exist_ok=True)
 
-    all_patents = get_patent_metadadata(DEFAULT_CATEGORY, KNOWLEDGE_ROOT_DIR)
-    
-    patent_to_process = next((p for p in all_patents if p['publication_number'] == TARGET_PUBLICATION_NUMBER), None)
+    patent_to_process = get_patent_by_publication_number(DEFAULT_CATEGORY, TARGET_PUBLICATION_NUMBER, KNOWLEDGE_ROOT_DIR)
 
     if not patent_to_process:
         print(f"Error: Patent with publication number '{TARGET_PUBLICATION_NUMBER}' not found in category '{DEFAULT_CATEGORY}'.")
@@ -101,10 +59,22 @@ def run():
 
     crew_instance_manager = PatentAnalysisCrew()
     crew = crew_instance_manager.crew()
-    crew.kickoff(inputs=patent_to_process)
+    if USE_DAG_SCHEDULER:
+        checkpoint_dir = str(get_checkpoint_dir(output_base_dir, TARGET_PUBLICATION_NUMBER)) if RESUME_FROM_CHECKPOINTS else None
+        instrumentation_path = str(output_base_dir / INSTRUMENTATION_FILE) if INSTRUMENTATION_FILE else None
+        result = run_crew_dag(crew, inputs=patent_to_process, checkpoint_dir=checkpoint_dir, instrumentation_path=instrumentation_path)
+    else:
+        result = crew.kickoff(inputs=patent_to_process)
+
+    brief_report = measure_context_reduction(result.tasks_output, TARGET_PUBLICATION_NUMBER)
+    if brief_report:
+        print(f"Phase brief saved ~{brief_report['tokens_saved']} context tokens ({brief_report['reduction']:.0%}).")
+        write_phase_brief_report(str(output_base_dir / "phase_brief_report.jsonl"), brief_report)
 
     duration = time.monotonic() - start_time
     print(f"Patent processing completed in {duration:.2f} seconds.")
+    for agent_label, stats in get_search_cache_stats().items():
+        print(f"Search cache {agent_label}: {stats['hits']} hits / {stats['misses']} misses (hit rate {stats['hit_rate']:.0%}).")
     agentops.end_session('Success')
 
 
@@ -0,0 +1,151 @@
+'''
+Schema-aware guardrails for the JSON-producing tasks of PatentAnalysisCrew.
+
+ensure_output_exists only rejects empty output, so malformed JSON used to surface in compile_result.py,
+after the paid run. These guardrails check each output against the structure its task asks for in the
+task YAML, right when the task finishes:
+- concept tasks: a title (title, concept_title or product_title: the task YAMLs use all three),
+  product_description, implementation, differentiation,
+- evaluation task n: {"product_n": {"product_n_full_json": {...}, "scores_n": {6 criteria in 1-5, total_score}}},
+- final_product_selection_task: the five compile fields.
+
+Trivially fixable output is repaired locally instead of spending a guardrail retry (an LLM call):
+surrounding text or ```json fences, trailing commas, a wrong total_score. The repaired JSON replaces the
+task's raw output. Validation stops at the first problem, whose message tells the agent what to fix.
+
+Uses orjson when it is installed (it is not a declared dependency), the standard json module otherwise.
+'''
+
+import json
+import re
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from crewai import TaskOutput
+
+try:
+    import orjson
+
+    def _loads(text: str) -> Any:
+        return orjson.loads(text)  # orjson.JSONDecodeError is a json.JSONDecodeError
+except ImportError:
+    _loads = json.loads
+
+CONCEPT_TITLE_FIELDS = ("title", "concept_title", "product_title")  # Any one of them names the concept
+CONCEPT_TEXT_FIELDS = ("product_description", "implementation", "differentiation")
+FINAL_OUTPUT_FIELDS = ("publication_number", "title", "product_description", "implementation", "differentiation")
+SCORE_CRITERIA = ("technical_validity", "innovativeness", "specificity", "need_validity", "market_size", "competitive_advantage")
+SCORE_RANGE = (1, 5)
+# Evaluation task -> n in product_n / product_n_full_json / scores_n
+EVALUATION_TASK_NUMBERS = {
+    "product_evaluation_pm_task": 1,
+    "product_evaluation_entrepreneur_task": 2,
+    "product_evaluation_research_task": 3,
+}
+
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+
+def repair_json_text(raw: str) -> str:
+    """Keeps the outermost JSON object (dropping fences and surrounding text) and removes trailing commas."""
+    text = raw.strip()
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        text = text[start:end + 1]
+    return _TRAILING_COMMA.sub(r"\1", text)
+
+
+def parse_json_output(raw: str) -> Tuple[Any, bool]:
+    """
+    Parses a task output, repairing it if needed. Raises json.JSONDecodeError if it cannot be repaired.
+
+    Returns:
+        (the parsed JSON, whether it was repaired)
+    """
+    try:
+        return _loads(raw), False
+    except json.JSONDecodeError:
+        return _loads(repair_json_text(raw)), True
+
+
+def _check_text_fields(data: Dict[str, Any], fields: Tuple[str, ...], where: str) -> Optional[str]:
+    for field in fields:
+        value = data.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return f"{where}: missing or empty '{field}'."
+    return None
+
+
+def validate_concept(data: Any) -> Tuple[Optional[str], Any]:
+    """Returns (error or None, data)."""
+    if not isinstance(data, dict):
+        return "The product concept must be a JSON object.", data
+    if not any(isinstance(data.get(key), str) and data[key].strip() for key in CONCEPT_TITLE_FIELDS):
+        return "The product concept is missing its 'title'.", data
+    return _check_text_fields(data, CONCEPT_TEXT_FIELDS, "The product concept"), data
+
+
+def validate_evaluation(data: Any, n: int) -> Tuple[Optional[str], Any]:
+    """Returns (error or None, data); a wrong total_score is recomputed rather than rejected."""
+    product_key, concept_key, scores_key = f"product_{n}", f"product_{n}_full_json", f"scores_{n}"
+    if not isinstance(data, dict) or not isinstance(data.get(product_key), dict):
+        return f"The evaluation must be a JSON object with a '{product_key}' object.", data
+    product = data[product_key]
+    concept = product.get(concept_key)
+    if not isinstance(concept, dict):
+        return f"'{product_key}' must contain a '{concept_key}' object.", data
+    error = _check_text_fields(concept, CONCEPT_TEXT_FIELDS, f"'{concept_key}'")
+    if error:
+        return error, data
+    scores = product.get(scores_key)
+    if not isinstance(scores, dict):
+        return f"'{product_key}' must contain a '{scores_key}' object.", data
+    for criterion in SCORE_CRITERIA:
+        score = scores.get(criterion)
+        if isinstance(score, str) and score.strip().isdigit():
+            score = scores[criterion] = int(score)
+        if not isinstance(score, int) or isinstance(score, bool) or not SCORE_RANGE[0] <= score <= SCORE_RANGE[1]:
+            return f"'{scores_key}.{criterion}' must be an integer from {SCORE_RANGE[0]} to {SCORE_RANGE[1]}.", data
+    scores["total_score"] = sum(scores[criterion] for criterion in SCORE_CRITERIA)
+    return None, data
+
+
+def validate_final_product(data: Any) -> Tuple[Optional[str], Any]:
+    """Returns (error or None, data), data reduced to the five compile fields."""
+    if not isinstance(data, dict):
+        return "The output must be a single JSON object.", data
+    error = _check_text_fields(data, FINAL_OUTPUT_FIELDS, "The output")
+    if error:
+        return error, data
+    return None, {field: data[field] for field in FINAL_OUTPUT_FIELDS}
+
+
+def make_json_guardrail(validate: Callable[[Any], Tuple[Optional[str], Any]]) -> Callable[[TaskOutput], Tuple[bool, Any]]:
+    """
+    Builds a guardrail from a validator. The task's raw output is kept when it passes as is,
+    and replaced by the normalized JSON when it had to be repaired.
+    """
+    def guardrail(task_output: TaskOutput) -> Tuple[bool, Any]:
+        raw = task_output.raw or ""
+        if not raw.strip():
+            return False, "The task did not produce any output."
+        try:
+            data, repaired = parse_json_output(raw)
+        except json.JSONDecodeError as e:
+            return False, f"The output is not valid JSON ({e}). Output only the JSON object."
+        before = json.dumps(data, sort_keys=True)
+        error, normalized = validate(data)  # May normalize data in place
+        if error:
+            return False, error
+        if repaired or json.dumps(normalized, sort_keys=True) != before:
+            return True, json.dumps(normalized, indent=2, ensure_ascii=False)
+        return True, raw
+    return guardrail
+
+
+ensure_concept_json = make_json_guardrail(validate_concept)
+ensure_final_product_json = make_json_guardrail(validate_final_product)
+
+
+def ensure_evaluation_json(task_name: str) -> Callable[[TaskOutput], Tuple[bool, Any]]:
+    n = EVALUATION_TASK_NUMBERS[task_name]
+    return make_json_guardrail(lambda data: validate_evaluation(data, n))
@@ -0,0 +1,61 @@
+'''
+Manifest of the patents a category already has a valid crew output for.
+
+The crew writes output/{category}/{batch_idx}/{publication_number}_output.json (output_file of the
+final task). scan_existing_outputs globs these once, the same way compile_result.py and crew_rewrite.py
+find their inputs, and sorts them into valid and invalid outputs, so a batch run can enqueue only the
+residue instead of relying on hand-edited batch ranges.
+'''
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+OUTPUT_SUFFIX = "_output.json"
+OUTPUT_GLOB = f"**/*{OUTPUT_SUFFIX}"
+REQUIRED_OUTPUT_FIELDS = ("publication_number", "title", "product_description", "implementation", "differentiation")
+
+
+def parse_output_text(text: str) -> Any:
+    """Parses a crew output, tolerating a surrounding ```json fence. Raises json.JSONDecodeError."""
+    text = text.strip()
+    fenced = re.match(r"^```(?:json)?\s*(.*?)\s*```$", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    return json.loads(text)
+
+
+def is_valid_output(file_path: Path) -> bool:
+    """A crew output is valid if it is a JSON object for the patent in its filename, with every required field non-empty."""
+    publication_number = file_path.name[: -len(OUTPUT_SUFFIX)]
+    try:
+        data = parse_output_text(file_path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+        return False
+    if not isinstance(data, dict) or data.get("publication_number") != publication_number:
+        return False
+    return all(isinstance(data.get(field), str) and data[field].strip() for field in REQUIRED_OUTPUT_FIELDS)
+
+
+def scan_existing_outputs(output_dir: str | Path) -> Tuple[Set[str], Dict[str, List[Path]]]:
+    """
+    Scans output_dir once for crew outputs.
+
+    Returns:
+        (done, invalid): the publication numbers with at least one valid output, and, for the others,
+        the invalid output files found (empty, truncated, not JSON, missing fields...).
+    """
+    done: Set[str] = set()
+    invalid: Dict[str, List[Path]] = {}
+    for file_path in Path(output_dir).glob(OUTPUT_GLOB):
+        publication_number = file_path.name[: -len(OUTPUT_SUFFIX)]
+        if publication_number in done:
+            continue
+        if is_valid_output(file_path):
+            done.add(publication_number)
+            invalid.pop(publication_number, None)
+        else:
+            invalid.setdefault(publication_number, []).append(file_path)
+    return done, invalid
+
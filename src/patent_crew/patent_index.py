@@ -0,0 +1,191 @@
+'''
+Reader for the knowledge/{category}/{category}.jsonl metadata index written by setup_data.py.
+
+- iter_patent_metadata: lazy generator over the index, one line at a time.
+- get_patent_metadadata: list API used by main.py / async_main.py (built on the generator).
+- get_patent_by_publication_number: O(1) lookup through a persisted sidecar index
+  knowledge/{category}/{category}.jsonl.idx mapping publication_number -> byte offset.
+  The sidecar is rebuilt automatically when the .jsonl changes (size or mtime).
+
+Image existence checks are batched: each patent directory is listed once instead of
+one os.path.exists call per image, and they can be skipped entirely (check_images=False)
+and done later with resolve_image_paths for the patents actually processed.
+'''
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+KNOWLEDGE_ROOT_DIR = "knowledge"
+OFFSET_INDEX_SUFFIX = ".idx"
+
+
+def get_index_path(category: str, knowledge_root_dir: str = KNOWLEDGE_ROOT_DIR) -> Path:
+    """Returns the path of knowledge/{category}/{category}.jsonl."""
+    return Path(knowledge_root_dir) / category / f"{category}.jsonl"
+
+
+def _existing_image_paths(image_paths: List[str], dir_listing_cache: Dict[str, set]) -> List[str]:
+    """Keeps absolute image paths that exist, listing each parent directory at most once."""
+    existing = []
+    for p in image_paths:
+        if not os.path.isabs(p):
+            continue
+        parent, name = os.path.split(p)
+        if parent not in dir_listing_cache:
+            try:
+                with os.scandir(parent) as it:
+                    dir_listing_cache[parent] = {entry.name for entry in it}
+            except OSError:
+                dir_listing_cache[parent] = set()
+        if name in dir_listing_cache[parent]:
+            existing.append(p)
+    return existing
+
+
+def _build_entry(patent_data: Dict[str, Any], category: str, absolute_image_paths: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+    publication_number = patent_data.get('publication_number')
+    json_path_str = patent_data.get('json_file_path')
+    if not (publication_number and json_path_str):
+        return None
+
+    pdf_path_str = json_path_str.rsplit('.', 1)[0] + '.pdf'
+    if absolute_image_paths is None:
+        # Deferred: keep the unverified paths, see resolve_image_paths
+        absolute_image_paths = [p for p in patent_data.get('image_file_paths', []) if os.path.isabs(p)]
+
+    return {
+        'publication_number': publication_number,
+        'json_file_path': json_path_str,
+        'category': category,
+        'absolute_image_paths': absolute_image_paths,
+        'image_path_str': "\n".join(absolute_image_paths),
+        'pdf_file_path': pdf_path_str
+    }
+
+
+def resolve_image_paths(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Filters an entry's image paths down to files that exist (for entries read with check_images=False)."""
+    absolute_image_paths = _existing_image_paths(entry.get('absolute_image_paths', []), {})
+    return {**entry, 'absolute_image_paths': absolute_image_paths, 'image_path_str': "\n".join(absolute_image_paths)}
+
+
+def iter_patent_metadata(category: str, knowledge_root_dir: str = KNOWLEDGE_ROOT_DIR, check_images: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yields patent metadata entries from the {category}.jsonl file, one line at a time.
+    See get_patent_metadadata for the entry structure.
+    """
+    base_jsonl_path = get_index_path(category, knowledge_root_dir)
+    if not base_jsonl_path.exists():
+        raise FileNotFoundError(f"JSONL index file not found at {base_jsonl_path}")
+
+    dir_listing_cache: Dict[str, set] = {}
+    with open(base_jsonl_path, 'r') as f_jsonl:
+        for line in f_jsonl:
+            if not line.strip():
+                continue
+            patent_data = json.loads(line.strip())
+            absolute_image_paths = None
+            if check_images:
+                absolute_image_paths = _existing_image_paths(patent_data.get('image_file_paths', []), dir_listing_cache)
+                # Only one patent directory is live at a time, don't grow the cache with the corpus
+                if len(dir_listing_cache) > 64:
+                    dir_listing_cache.clear()
+            entry = _build_entry(patent_data, category, absolute_image_paths)
+            if entry is not None:
+                yield entry
+
+
+def get_patent_metadadata(category: str, knowledge_root_dir: str = KNOWLEDGE_ROOT_DIR, check_images: bool = True) -> List[Dict[str, Any]]:
+    """
+    Reads the {category}.jsonl file to get patent metadata.
+    Args:
+        category: The category of patents to process (e.g., 'nlp').
+        knowledge_root_dir: The root directory of the knowledge base, used as a reference.
+        check_images: Verify image paths now (batched per directory). With False, image
+            paths are kept unverified; call resolve_image_paths before use.
+
+    Returns:
+        A list of dictionaries, where each dictionary contains:
+        - 'publication_number': The publication number of the patent.
+        - 'json_file_path': Path to the JSON file, made relative to knowledge_root_dir.
+        - 'pdf_file_path': Path to the PDF file, derived from json_file_path.
+        - 'category': The category of the patent.
+        - 'absolute_image_paths': A list of verified absolute file paths for associated images.
+        - 'image_path_str': The image paths joined by newlines.
+    """
+    return list(iter_patent_metadata(category, knowledge_root_dir, check_images=check_images))
+
+
+def build_offset_index(category: str, knowledge_root_dir: str = KNOWLEDGE_ROOT_DIR) -> Dict[str, int]:
+    """
+    Scans {category}.jsonl once and persists the publication_number -> byte offset sidecar.
+    Returns the offsets.
+    """
+    base_jsonl_path = get_index_path(category, knowledge_root_dir)
+    stat = base_jsonl_path.stat()
+    offsets: Dict[str, int] = {}
+    with open(base_jsonl_path, 'rb') as f_jsonl:
+        offset = 0
+        for line in f_jsonl:
+            if line.strip():
+                try:
+                    publication_number = json.loads(line).get('publication_number')
+                except json.JSONDecodeError:
+                    publication_number = None
+                if publication_number and publication_number not in offsets:
+                    offsets[publication_number] = offset
+            offset += len(line)
+
+    sidecar = {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns, "offsets": offsets}
+    sidecar_path = base_jsonl_path.with_name(base_jsonl_path.name + OFFSET_INDEX_SUFFIX)
+    tmp_path = sidecar_path.with_name(sidecar_path.name + f".{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w') as f_idx:
+            json.dump(sidecar, f_idx, separators=(",", ":"))
+        os.replace(tmp_path, sidecar_path)
+    except OSError as e:
+        print(f"Warning: Could not write offset index {sidecar_path}: {e}")
+    return offsets
+
+
+def load_offset_index(category: str, knowledge_root_dir: str = KNOWLEDGE_ROOT_DIR) -> Dict[str, int]:
+    """Returns the publication_number -> byte offset sidecar, rebuilding it if missing or stale."""
+    base_jsonl_path = get_index_path(category, knowledge_root_dir)
+    if not base_jsonl_path.exists():
+        raise FileNotFoundError(f"JSONL index file not found at {base_jsonl_path}")
+
+    sidecar_path = base_jsonl_path.with_name(base_jsonl_path.name + OFFSET_INDEX_SUFFIX)
+    stat = base_jsonl_path.stat()
+    try:
+        with open(sidecar_path, 'r') as f_idx:
+            sidecar = json.load(f_idx)
+        if sidecar.get("source_size") == stat.st_size and sidecar.get("source_mtime_ns") == stat.st_mtime_ns:
+            return sidecar["offsets"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        pass
+    return build_offset_index(category, knowledge_root_dir)
+
+
+def get_patent_by_publication_number(category: str, publication_number: str, knowledge_root_dir: str = KNOWLEDGE_ROOT_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Returns the metadata entry for one patent with a single seek into {category}.jsonl,
+    or None if the publication number is not in the index.
+    """
+    offset = load_offset_index(category, knowledge_root_dir).get(publication_number)
+    if offset is None:
+        return None
+    with open(get_index_path(category, knowledge_root_dir), 'rb') as f_jsonl:
+        f_jsonl.seek(offset)
+        patent_data = json.loads(f_jsonl.readline())
+    if patent_data.get('publication_number') != publication_number:
+        # The sidecar is out of sync with the file despite matching stats: rebuild and retry once
+        offset = build_offset_index(category, knowledge_root_dir).get(publication_number)
+        if offset is None:
+            return None
+        with open(get_index_path(category, knowledge_root_dir), 'rb') as f_jsonl:
+            f_jsonl.seek(offset)
+            patent_data = json.loads(f_jsonl.readline())
+    entry = _build_entry(patent_data, category, None)
+    return resolve_image_paths(entry) if entry is not None else None
@@ -0,0 +1,184 @@
+'''
+Compact packed store for patent JSON records, one per category.
+
+Instead of one pretty-printed {publication_number}.json per patent, setup_data.py writes:
+- knowledge/{category}/{category}.pack      : header + zlib-compressed compact JSON records, back to back
+- knowledge/{category}/{category}.pack.idx  : JSON index {"pack": {"mtime_ns", "size"}, "records": {publication_number: [offset, length]}}
+
+The index records the size and mtime of the pack it was written for. The two files are replaced one after
+the other, so a reader checks them against each other and never pairs a new pack with an old index.
+
+PatentStore memory-maps the pack file, so fetching one patent is a single slice of the
+mapping plus one decompress/parse of that record, never a parse of the whole corpus.
+'''
+
+import json
+import mmap
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+PACK_MAGIC = b"PATENTPACK1\n"
+PACK_SUFFIX = ".pack"
+INDEX_SUFFIX = ".pack.idx"
+
+
+def store_path_for_category(category_dir: str | Path) -> Path:
+    """Returns the pack file path for a knowledge/{category} directory."""
+    category_dir = Path(category_dir)
+    return category_dir / f"{category_dir.name}{PACK_SUFFIX}"
+
+
+def _index_path(pack_path: Path) -> Path:
+    return pack_path.with_name(pack_path.name[: -len(PACK_SUFFIX)] + INDEX_SUFFIX)
+
+
+def _signature(stat: os.stat_result) -> Dict[str, int]:
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+class PatentStoreWriter:
+    """
+    Writes a pack file and its index. Records are appended in call order; the index is written on close.
+    Both files are written to temporary paths and moved into place on close, so readers never see a partial store.
+
+    Usage:
+        with PatentStoreWriter(pack_path) as writer:
+            writer.add(publication_number, patent_data)
+    """
+
+    def __init__(self, pack_path: str | Path, compression_level: int = 6):
+        self.pack_path = Path(pack_path)
+        self.compression_level = compression_level
+        self.index: Dict[str, Tuple[int, int]] = {}
+        self._tmp_pack_path = self.pack_path.with_name(self.pack_path.name + f".{os.getpid()}.tmp")
+        self.pack_path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self._tmp_pack_path, "wb")
+        self._f.write(PACK_MAGIC)
+        self._offset = len(PACK_MAGIC)
+
+    def add(self, publication_number: str, patent_data: Dict[str, Any]) -> None:
+        """Appends one record. A later record for the same publication number replaces the earlier one in the index."""
+        payload = zlib.compress(
+            json.dumps(patent_data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"),
+            self.compression_level,
+        )
+        self._f.write(payload)
+        self.index[publication_number] = (self._offset, len(payload))
+        self._offset += len(payload)
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        self._f.close()
+        index_path = _index_path(self.pack_path)
+        tmp_index_path = index_path.with_name(index_path.name + f".{os.getpid()}.tmp")
+        # os.replace keeps the mtime, so the signature of the temporary pack is the one readers will see
+        pack_signature = _signature(os.stat(self._tmp_pack_path))
+        with open(tmp_index_path, "w", encoding="utf-8") as f_idx:
+            json.dump({"pack": pack_signature, "records": self.index}, f_idx, separators=(",", ":"))
+        os.replace(self._tmp_pack_path, self.pack_path)
+        os.replace(tmp_index_path, index_path)
+
+    def abort(self) -> None:
+        """Discards the partially written store."""
+        if not self._f.closed:
+            self._f.close()
+        self._tmp_pack_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "PatentStoreWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class PatentStore:
+    """
+    Read-only, memory-mapped view of a pack file.
+    Raises ValueError if the file is not a pack or its index was written for another version of it.
+    """
+
+    def __init__(self, pack_path: str | Path):
+        self.pack_path = Path(pack_path)
+        with open(_index_path(self.pack_path), "r", encoding="utf-8") as f_idx:
+            index = json.load(f_idx)
+        if not isinstance(index, dict) or not isinstance(index.get("records"), dict):
+            raise ValueError(f"Unsupported index format for {self.pack_path}, run setup_data.py again")
+        self.index: Dict[str, List[int]] = index["records"]
+        self._file = open(self.pack_path, "rb")
+        if _signature(os.fstat(self._file.fileno())) != index.get("pack"):
+            self._file.close()
+            raise ValueError(f"The index does not match the pack file (being rewritten?): {self.pack_path}")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(PACK_MAGIC)] != PACK_MAGIC:
+            self.close()
+            raise ValueError(f"Not a patent pack file: {self.pack_path}")
+
+    def get(self, publication_number: str) -> Optional[Dict[str, Any]]:
+        """Returns the patent record, or None if the publication number is not in the store."""
+        location = self.index.get(publication_number)
+        if location is None:
+            return None
+        offset, length = location
+        return json.loads(zlib.decompress(self._mmap[offset: offset + length]))
+
+    def publication_numbers(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def __contains__(self, publication_number: str) -> bool:
+        return publication_number in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+
+_open_stores: Dict[Path, Tuple[Tuple[int, ...], PatentStore]] = {}
+_open_stores_lock = threading.Lock()
+
+
+def open_patent_store(pack_path: str | Path) -> Optional[PatentStore]:
+    """
+    Returns a shared PatentStore for pack_path, or None if the store does not exist or is being rewritten.
+    The store is reopened if the pack or the index file was rewritten since it was first opened.
+    """
+    pack_path = Path(pack_path).resolve()
+    try:
+        pack_stat, index_stat = pack_path.stat(), _index_path(pack_path).stat()
+    except FileNotFoundError:
+        return None
+    key = (pack_stat.st_mtime_ns, pack_stat.st_size, index_stat.st_mtime_ns, index_stat.st_size)
+    with _open_stores_lock:
+        cached = _open_stores.get(pack_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        try:
+            store = PatentStore(pack_path)
+        except (FileNotFoundError, ValueError, json.JSONDecodeError):
+            return None
+        # The old mapping is left to the garbage collector: another thread may still be reading it
+        _open_stores[pack_path] = (key, store)
+        return store
+
+
+def load_patent_from_store(json_file_path: str | Path) -> Optional[Dict[str, Any]]:
+    """
+    Resolves a knowledge/{category}/pdf_and_image/{publication_number}/{publication_number}.json path
+    against its category store. Returns None if there is no store or the patent is not in it.
+    """
+    json_file_path = Path(json_file_path)
+    if len(json_file_path.parents) < 3:
+        return None
+    store = open_patent_store(store_path_for_category(json_file_path.parents[2]))
+    if store is None:
+        return None
+    return store.get(json_file_path.stem)
@@ -0,0 +1,93 @@
+'''
+Phase-boundary context compaction for PatentAnalysisCrew.
+
+Without it, each of the three Phase 3 concept tasks receives the four full Phase 1/2 outputs as context,
+so the same long text is sent to the LLM three times. With USE_PHASE_BRIEF (crew.py), phase_brief_task
+condenses those four outputs once into a structured, size-bounded brief, and the concept tasks read only
+the brief.
+
+measure_context_reduction computes, from a run's task outputs, the prompt tokens of context the concept
+tasks received versus what they would have received without the brief.
+'''
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai import TaskOutput
+
+from patent_crew.output_manifest import parse_output_text
+from patent_crew.rate_governor import estimate_tokens
+
+PHASE_BRIEF_TASK = "phase_brief_task"
+PHASE_BRIEF_SOURCE_TASKS = (
+    "document_analysis_task",
+    "document_visual_analysis_task",
+    "market_opportunity_analysis_task",
+    "user_pain_point_validation_task",
+)
+PHASE_BRIEF_CONSUMER_TASKS = (
+    "product_concept_pm_task",
+    "product_concept_entrepreneur_task",
+    "product_concept_research_task",
+)
+PHASE_BRIEF_SECTIONS = ("technology", "visual_insights", "market", "users", "key_facts")
+# Hard bound on the brief; the task asks for < 500 words (~700 tokens), this leaves room for the JSON syntax
+PHASE_BRIEF_MAX_TOKENS = 1000
+
+
+def ensure_phase_brief_bounded(task_output: TaskOutput) -> Tuple[bool, Any]:
+    """
+    Guardrail for phase_brief_task: the brief must be a JSON object with every section, within PHASE_BRIEF_MAX_TOKENS.
+    """
+    raw = task_output.raw or ""
+    try:
+        brief = parse_output_text(raw)
+    except json.JSONDecodeError as e:
+        return False, f"The phase brief is not valid JSON: {e}"
+    if not isinstance(brief, dict):
+        return False, "The phase brief must be a JSON object."
+    missing = [section for section in PHASE_BRIEF_SECTIONS if not brief.get(section)]
+    if missing:
+        return False, f"The phase brief is missing sections: {', '.join(missing)}."
+    tokens = estimate_tokens(raw)
+    if tokens > PHASE_BRIEF_MAX_TOKENS:
+        return False, f"The phase brief is too long (~{tokens} tokens, max {PHASE_BRIEF_MAX_TOKENS}). Shorten every section."
+    return True, raw
+
+
+def measure_context_reduction(tasks_output: List[TaskOutput], publication_number: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Context tokens sent to the Phase 3 concept tasks, with and without the phase brief, for one patent.
+
+    Baseline: every concept task gets the four source outputs.
+    Compacted: the brief task gets the four source outputs once, every concept task gets the brief.
+
+    Returns:
+        A report dict, or None if the run has no phase brief.
+    """
+    outputs = {output.name: output for output in tasks_output if output.name}
+    if PHASE_BRIEF_TASK not in outputs or not all(name in outputs for name in PHASE_BRIEF_SOURCE_TASKS):
+        return None
+    source_tokens = sum(estimate_tokens(outputs[name].raw or "") for name in PHASE_BRIEF_SOURCE_TASKS)
+    brief_tokens = estimate_tokens(outputs[PHASE_BRIEF_TASK].raw or "")
+    consumers = len(PHASE_BRIEF_CONSUMER_TASKS)
+
+    baseline_tokens = consumers * source_tokens
+    compacted_tokens = source_tokens + consumers * brief_tokens
+    return {
+        "publication_number": publication_number,
+        "source_context_tokens": source_tokens,
+        "brief_tokens": brief_tokens,
+        "baseline_context_tokens": baseline_tokens,
+        "compacted_context_tokens": compacted_tokens,
+        "tokens_saved": baseline_tokens - compacted_tokens,
+        "reduction": round(1 - compacted_tokens / baseline_tokens, 3) if baseline_tokens else 0.0,
+    }
+
+
+def write_phase_brief_report(path: str, report: Dict[str, Any]) -> None:
+    """Appends one per-patent report to a JSONL file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(report) + "\n")
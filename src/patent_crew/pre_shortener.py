@@ -0,0 +1,164 @@
+'''
+Deterministic, rule-based compaction of product concepts before the LLM rewrite (crew_rewrite.py).
+
+Most over-long fields are only a few dozen characters over their limit. Each field over its limit goes
+through these steps, stopping as soon as it fits:
+1. collapse whitespace,
+2. swap wordy phrases for short equivalents ("in order to" -> "to"),
+3. drop lowercase filler words ("seamlessly", "cutting-edge"), only before a lowercase word, so names such as
+   "Advanced Driver Assistance Systems" or a word next to an acronym are never touched,
+4. replace spelled-out acronyms by the acronym ("Structured Query Language (SQL)" -> "SQL"),
+5. trim at the sentence or clause boundary that keeps the most text under the limit.
+   Steps 3 and 4 fix the "a"/"an" before the changed word.
+   A trim only applies if it keeps at least MIN_KEEP_RATIO of the limit, so a field is never gutted.
+
+Fields that fit afterwards skip the LLM; only the remaining ones are sent to the rewrite crew.
+'''
+
+import re
+from typing import Any, Dict, List, Tuple
+
+# Same limits as compile_result.validate_entry
+FIELD_LIMITS = {
+    "title": 100,
+    "product_description": 300,
+    "implementation": 300,
+    "differentiation": 300,
+}
+MIN_KEEP_RATIO = 0.6 # A sentence/clause trim must keep at least this share of the limit
+
+# (pattern, replacement), applied in order, case-insensitive; the replacement keeps the first letter's case
+PHRASE_REPLACEMENTS: List[Tuple[str, str]] = [
+    (r"\bin order to\b", "to"),
+    (r"\b(?:a )?(?:wide|broad|diverse) (?:range|variety|array) of\b", "many"),
+    (r"\ba (?:variety|multitude|plethora) of\b", "many"),
+    (r"\ba large number of\b", "many"),
+    (r"\bdue to the fact that\b", "because"),
+    (r"\bwith the help of\b", "with"),
+    (r"\bby means of\b", "by"),
+    (r"\bprior to\b", "before"),
+    (r"\bas well as\b", "and"),
+    (r"\bleverag(?:es|ing)\b", lambda m: "uses" if m.group(0).lower().endswith("es") else "using"),
+    (r"\butiliz(?:es|ing|e)\b", lambda m: {"utilizes": "uses", "utilizing": "using", "utilize": "use"}[m.group(0).lower()]),
+]
+# Dropped only in lowercase and before a lowercase word; words that carry meaning ("highly available",
+# "a unique identifier", "advanced") are not filler
+FILLER_WORDS = ("seamlessly", "truly", "ultimately", "innovative", "cutting-edge", "state-of-the-art",
+                "groundbreaking", "revolutionary")
+
+_SENTENCE_END = re.compile(r"[.!?](?=\s)")
+# A clause boundary: before "while/whereas/thereby", or a comma/semicolon followed by a participle or "which" (never a list comma)
+_CLAUSE_BOUNDARY = re.compile(r"(?:[,;]|\s—)?\s+(?=(?:while|whereas|thereby)\b)|(?:[,;]|\s—)\s+(?=(?:\w+ing|which)\b)")
+_FILLER = re.compile(r"\b(?:([Aa]n?) )?(?:(?:" + "|".join(map(re.escape, FILLER_WORDS)) + r") )+(?=[a-z])")
+# Initialisms read letter by letter take "an" when their first letter name starts with a vowel sound ("an LSTM")
+_AN_LETTERS = set("AEFHILMNORSX")
+_ACRONYM = re.compile(r"\b((?:[A-Za-z][\w-]*\s+){1,6}?)\(([A-Z][A-Za-z0-9]{1,9})\)")
+
+
+def collapse_whitespace(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _keep_case(replacement: str, original: str) -> str:
+    if replacement and original[:1].isupper():
+        return replacement[0].upper() + replacement[1:]
+    return replacement
+
+
+def replace_phrases(text: str) -> str:
+    for pattern, replacement in PHRASE_REPLACEMENTS:
+        def substitute(match: re.Match, replacement=replacement) -> str:
+            value = replacement(match) if callable(replacement) else replacement
+            return _keep_case(value, match.group(0))
+        text = re.sub(pattern, substitute, text, flags=re.IGNORECASE)
+    return collapse_whitespace(text)
+
+
+def _article_for(next_text: str) -> str | None:
+    """ "a" or "an" before next_text, None when its first letter does not tell (e.g. "user", "hour")."""
+    if next_text.isupper() and next_text.isalpha():
+        return "an" if next_text[0] in _AN_LETTERS else "a"
+    first = next_text[:1].lower()
+    if first in "aeio":
+        return "an"
+    if first in "uh" or not first.isalpha():
+        return None
+    return "a"
+
+
+def drop_filler(text: str) -> str:
+    """Removes lowercase filler words before a lowercase word, adjusting a preceding "a"/"an"."""
+    def substitute(match: re.Match) -> str:
+        article = match.group(1)
+        if article is None:
+            return ""
+        new_article = _article_for(text[match.end():])
+        if new_article is None:
+            return match.group(0)
+        return _keep_case(new_article, article) + " "
+    return collapse_whitespace(_FILLER.sub(substitute, text))
+
+
+def _initials(words: List[str]) -> str:
+    return "".join(part[0] for word in words for part in word.split("-") if part).upper()
+
+
+def collapse_acronyms(text: str) -> str:
+    """"Structured Query Language (SQL)" -> "SQL", when the words right before the parenthesis spell the acronym."""
+    def substitute(match: re.Match) -> str:
+        words, acronym = match.group(1).split(), match.group(2)
+        letters = re.sub(r"[^A-Z]", "", acronym.upper())
+        for start in range(len(words)):
+            initials = _initials(words[start:])
+            if initials == letters or initials == acronym.upper():
+                kept = words[:start]
+                if kept and kept[-1].lower() in ("a", "an"):
+                    article = _article_for(acronym)
+                    if article is None:
+                        return match.group(0)
+                    kept[-1] = _keep_case(article, kept[-1])
+                return " ".join(kept + [acronym])
+        return match.group(0)
+    return collapse_whitespace(_ACRONYM.sub(substitute, text))
+
+
+def trim_at_boundary(text: str, limit: int) -> str:
+    """Cuts text at the sentence or clause boundary that keeps the most under the limit. Returns text unchanged if none fits."""
+    min_keep = int(limit * MIN_KEEP_RATIO)
+    cuts = [m.end() for m in _SENTENCE_END.finditer(text) if m.end() <= limit]
+    cuts += [m.start() for m in _CLAUSE_BOUNDARY.finditer(text) if m.start() < limit]  # "." is appended
+    cuts = [cut for cut in cuts if cut >= min_keep]
+    if not cuts:
+        return text
+    trimmed = text[:max(cuts)].rstrip(" ,;—")
+    return trimmed if trimmed.endswith((".", "!", "?")) else trimmed + "."
+
+
+def shorten_text(text: str, limit: int) -> str:
+    """Applies the compaction steps in order until text fits the limit. May still return a text over the limit."""
+    for step in (collapse_whitespace, replace_phrases, drop_filler, collapse_acronyms):
+        if len(text) <= limit:
+            return text
+        text = step(text)
+    if len(text) <= limit:
+        return text
+    return trim_at_boundary(text, limit)
+
+
+def pre_shorten_entry(entry: Dict[str, Any], limits: Dict[str, int] = FIELD_LIMITS) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Shortens every string field over its limit.
+
+    Returns:
+        (the shortened entry, the fields still over their limit), the input entry is not modified.
+    """
+    shortened = dict(entry)
+    remaining = []
+    for field, limit in limits.items():
+        value = shortened.get(field)
+        if not isinstance(value, str) or len(value) <= limit:
+            continue
+        shortened[field] = shorten_text(value, limit)
+        if len(shortened[field]) > limit:
+            remaining.append(field)
+    return shortened, remaining
@@ -0,0 +1,291 @@
+'''
+Adaptive, rate-limit-aware request governor, one per model.
+
+Each ModelGovernor holds two token buckets, requests/min and tokens/min, sized from MODEL_RATE_LIMITS.
+Callers acquire before each LLM request and report the outcome:
+- success: the allowed rate grows additively (AIMD increase) back towards the configured quota,
+- 429:     the allowed rate is cut multiplicatively (AIMD decrease) and all callers of that model
+           pause until the server's retry-after (Retry-After / retry-after-ms / x-ratelimit-reset-* /
+           Gemini retryDelay) has passed.
+
+So a pool of crews runs at the quota ceiling instead of relying on fixed sleeps far below it.
+Thread-safe: crews call their LLMs from worker threads.
+'''
+
+import asyncio
+import email.utils
+import json
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+R = TypeVar("R")
+
+# --- Quotas per model: (requests per minute, tokens per minute) ---
+# Tier-dependent: set these to the account's actual limits.
+MODEL_RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gemini/gemini-2.0-flash": (2000, 4_000_000),
+    "gemini/gemini-2.5-pro-preview-05-06": (150, 2_000_000),
+    "gpt-4o-mini": (500, 200_000),
+    "openai/o3-mini": (500, 200_000),
+}
+DEFAULT_RATE_LIMIT: Tuple[int, int] = (60, 100_000)
+
+# AIMD parameters, as fractions of the configured quota
+AIMD_ADDITIVE_INCREASE = 0.01  # per successful request
+AIMD_MULTIPLICATIVE_DECREASE = 0.5
+AIMD_MIN_FACTOR = 0.05
+DEFAULT_RETRY_AFTER_S = 5.0
+MAX_RATE_LIMIT_RETRIES = 6
+# ---------------------------
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximates the token count of a prompt or completion."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_s, holding at most capacity tokens. Not thread-safe on its own.
+
+    A request bigger than the capacity waits for a full bucket, then takes its whole amount: the balance goes
+    negative and the next callers wait it off, so the long-run rate holds for any request size.
+    """
+
+    def __init__(self, capacity: float, rate_per_s: float):
+        self.capacity = capacity
+        self.rate_per_s = rate_per_s
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_s)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until a request of amount tokens may go (0 if now)."""
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate_per_s
+
+    def take(self, amount: float) -> None:
+        """Consumes the full amount, possibly leaving a negative balance."""
+        self.tokens -= amount
+
+
+class ModelGovernor:
+    """Requests/min and tokens/min governor for one model, with AIMD adaptation to 429 responses."""
+
+    def __init__(self, model: str, rpm: int, tpm: int):
+        self.model = model
+        self.rpm = rpm
+        self.tpm = tpm
+        self.factor = 1.0
+        self.blocked_until = 0.0
+        self.requests = TokenBucket(capacity=max(1.0, rpm / 60), rate_per_s=rpm / 60)
+        self.tokens = TokenBucket(capacity=max(1.0, tpm / 60), rate_per_s=tpm / 60)
+        self.stats = {"requests": 0, "rate_limited": 0, "waited_s": 0.0}
+        self._lock = threading.Lock()
+
+    def _apply_factor(self) -> None:
+        self.requests.rate_per_s = self.rpm / 60 * self.factor
+        self.tokens.rate_per_s = self.tpm / 60 * self.factor
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        """Returns 0 and consumes quota if the request may go now, else the seconds to wait first."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self.blocked_until - now,
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(estimated_tokens, now),
+            )
+            if wait <= 0:
+                self.requests.take(1)
+                self.tokens.take(estimated_tokens)
+                self.stats["requests"] += 1
+            return max(wait, 0.0)
+
+    def acquire(self, estimated_tokens: int = 0) -> float:
+        """Blocks until the request fits in the current rate. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            wait = self._reserve(estimated_tokens)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+        with self._lock:
+            self.stats["waited_s"] += waited
+        return waited
+
+    async def acquire_async(self, estimated_tokens: int = 0) -> float:
+        """Async variant of acquire."""
+        waited = 0.0
+        while True:
+            wait = self._reserve(estimated_tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+        with self._lock:
+            self.stats["waited_s"] += waited
+        return waited
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Charges (or refunds) the difference between the estimated and the actual token usage."""
+        with self._lock:
+            self.tokens.take(actual_tokens - estimated_tokens)
+
+    def on_success(self) -> None:
+        """AIMD additive increase."""
+        with self._lock:
+            if self.factor < 1.0:
+                self.factor = min(1.0, self.factor + AIMD_ADDITIVE_INCREASE)
+                self._apply_factor()
+
+    def on_rate_limited(self, retry_after_s: Optional[float]) -> None:
+        """
+        AIMD multiplicative decrease, and pause every caller until the retry-after has passed.
+        429s of requests already in flight during a pause belong to the same event and do not decrease again.
+        """
+        with self._lock:
+            self.stats["rate_limited"] += 1
+            now = time.monotonic()
+            if now >= self.blocked_until:
+                self.factor = max(AIMD_MIN_FACTOR, self.factor * AIMD_MULTIPLICATIVE_DECREASE)
+                self._apply_factor()
+            pause = retry_after_s if retry_after_s is not None else DEFAULT_RETRY_AFTER_S
+            self.blocked_until = max(self.blocked_until, now + pause)
+
+
+_governors: Dict[str, ModelGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(model: str) -> ModelGovernor:
+    """Returns the process-wide governor for a model, created from MODEL_RATE_LIMITS on first use."""
+    with _governors_lock:
+        governor = _governors.get(model)
+        if governor is None:
+            rpm, tpm = MODEL_RATE_LIMITS.get(model, DEFAULT_RATE_LIMIT)
+            governor = ModelGovernor(model, rpm, tpm)
+            _governors[model] = governor
+        return governor
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parses '30', '1.5s', '250ms', '6m0s', '1h2m3s' into seconds."""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    unit_s = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(number) * unit_s[unit] for number, unit in parts)
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]] = None, body: Optional[str] = None) -> Optional[float]:
+    """
+    Extracts the server's retry delay, in seconds, from 429 response headers or body.
+    Returns None if the response does not say.
+    """
+    if headers:
+        lowered = {str(k).lower(): str(v) for k, v in headers.items()}
+        if "retry-after-ms" in lowered:
+            delay = _parse_duration(lowered["retry-after-ms"])
+            if delay is not None:
+                return delay / 1000
+        if "retry-after" in lowered:
+            delay = _parse_duration(lowered["retry-after"])
+            if delay is not None:
+                return delay
+            parsed_date = email.utils.parsedate_to_datetime(lowered["retry-after"])
+            if parsed_date is not None:
+                return max(0.0, parsed_date.timestamp() - time.time())
+        resets = [
+            _parse_duration(lowered[name])
+            for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+            if name in lowered
+        ]
+        resets = [r for r in resets if r is not None]
+        if resets:
+            return max(resets)
+    if body:
+        # Gemini: {"error": {"details": [{"@type": "...RetryInfo", "retryDelay": "30s"}]}}
+        match = re.search(r'"retryDelay"\s*:\s*"([^"]+)"', body)
+        if match:
+            return _parse_duration(match.group(1))
+    return None
+
+
+def get_rate_limit_info(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """
+    Classifies an exception from an LLM client (litellm, openai, google-genai, urllib...).
+
+    Returns:
+        (is_rate_limited, retry_after_s)
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    is_rate_limited = (
+        status == 429
+        or "ratelimit" in type(error).__name__.lower()
+        or "RESOURCE_EXHAUSTED" in str(error)
+    )
+    if not is_rate_limited:
+        return False, None
+
+    headers = getattr(error, "headers", None) or getattr(response, "headers", None)
+    body = None
+    try:
+        body = response.text if response is not None and hasattr(response, "text") else None
+    except Exception:
+        body = None
+    if body is None:
+        body = str(error)
+    if not isinstance(body, str):
+        body = json.dumps(body, default=str)
+    return True, parse_retry_after(headers, body)
+
+
+def governed_call(governor: ModelGovernor, fn: Callable[[], R], estimated_tokens: int = 0,
+                  max_retries: int = MAX_RATE_LIMIT_RETRIES) -> R:
+    """
+    Runs fn under the governor: waits for quota, reports success or 429 and retries rate-limited calls.
+    Errors other than rate limits are raised immediately.
+    """
+    attempt = 0
+    while True:
+        governor.acquire(estimated_tokens)
+        try:
+            result = fn()
+        except Exception as e:
+            is_rate_limited, retry_after_s = get_rate_limit_info(e)
+            if not is_rate_limited or attempt >= max_retries:
+                raise
+            attempt += 1
+            print(f"[DEBUG rate_governor.py] {governor.model} rate limited (attempt {attempt}/{max_retries}), "
+                  f"retry after {retry_after_s if retry_after_s is not None else DEFAULT_RETRY_AFTER_S}s, "
+                  f"rate factor {governor.factor:.2f}")
+            governor.on_rate_limited(retry_after_s)
+            continue
+        governor.on_success()
+        return result
+
+
+def get_governor_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of requests, 429s, waiting time and current rate factor per model."""
+    with _governors_lock:
+        return {model: {**g.stats, "rate_factor": round(g.factor, 3)} for model, g in _governors.items()}
@@ -0,0 +1,209 @@
+'''
+Record/replay backend for LLM and tool calls, for deterministic benchmarks without API keys or network.
+
+Modes (PATENT_CREW_REPLAY, or configure_replay()):
+- off:    calls go to the real APIs (default).
+- record: calls go to the real APIs and every response is saved as a fixture, with its latency.
+- replay: responses come from the fixtures only; nothing leaves the machine.
+
+Fixtures live in {fixture_dir}/{llm|tool}/{key}.json, the key being the sha256 of the model or tool name
+and the exact messages or arguments. Replayed calls sleep for a synthetic latency
+(PATENT_CREW_REPLAY_LATENCY: seconds, or "recorded" to reuse the recorded one).
+
+A replay miss raises ReplayMissError, unless PATENT_CREW_REPLAY_ON_MISS=synthetic: then a canned answer
+is returned (a JSON object with the fields the tasks and guardrails expect). Synthetic mode measures
+orchestration overhead on any corpus, recorded or not.
+
+GovernedLLM (every crew LLM) and the network tools (@replayable_tool_call) go through this backend.
+'''
+
+import asyncio
+import functools
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from patent_crew.tools.result_cache import sha256_text
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+REPLAY_MODES = ("off", "record", "replay")
+DEFAULT_FIXTURE_DIR = "tests/fixtures/replay"
+
+
+class ReplayMissError(RuntimeError):
+    """Raised in replay mode when no fixture matches a call."""
+
+
+def synthetic_llm_response(messages: Any) -> str:
+    """
+    A canned final answer in the ReAct format crewai agents parse, holding the fields the tasks,
+    the guardrails (output_guardrails.py, phase_brief.py, crew_rewrite.py) and compile_result.py expect.
+    """
+    text = messages if isinstance(messages, str) else json.dumps(messages, default=str)
+    numbers = re.findall(r"\b([A-Z]{2}-[0-9A-Z]+-[A-Z][0-9]?)\b", text)
+    publication_number = numbers[-1] if numbers else "US-0000000-B1"
+    answer = {
+        "publication_number": publication_number,
+        "title": f"Synthetic product for {publication_number}",
+        "product_description": "Synthetic product description used for replay benchmarks of the patent pipeline.",
+        "implementation": "Synthetic implementation approach used for replay benchmarks of the patent pipeline.",
+        "differentiation": "Synthetic differentiation used for replay benchmarks of the patent pipeline.",
+        "technology": "Synthetic technology summary.",
+        "visual_insights": "Synthetic visual insights.",
+        "market": "Synthetic market summary.",
+        "users": "Synthetic user summary.",
+        "key_facts": ["Synthetic fact."],
+    }
+    # Evaluation tasks (output_guardrails.py): {"product_n": {"product_n_full_json": ..., "scores_n": ...}}
+    scores = dict.fromkeys(("technical_validity", "innovativeness", "specificity", "need_validity", "market_size", "competitive_advantage"), 4)
+    for n in (1, 2, 3):
+        concept = {"concept_title": answer["title"], **{k: answer[k] for k in ("product_description", "implementation", "differentiation")}}
+        answer[f"product_{n}"] = {f"product_{n}_full_json": concept, f"scores_{n}": {**scores, "total_score": 24}}
+    return f"Thought: I now know the final answer\nFinal Answer: {json.dumps(answer)}"
+
+
+class ReplayBackend:
+    """Fixture store for recorded LLM and tool responses."""
+
+    def __init__(self, mode: str = "off", fixture_dir: str | Path = DEFAULT_FIXTURE_DIR,
+                 latency: str | float = 0.0, on_miss: str = "error"):
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode '{mode}', expected one of {REPLAY_MODES}")
+        if on_miss not in ("error", "synthetic"):
+            raise ValueError(f"Unknown on_miss '{on_miss}', expected 'error' or 'synthetic'")
+        self.mode = mode
+        self.fixture_dir = Path(fixture_dir)
+        self.latency = latency if latency == "recorded" else float(latency)
+        self.on_miss = on_miss
+        self.stats = {"recorded": 0, "replayed": 0, "synthetic": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(name: str, payload: Any) -> str:
+        return sha256_text(json.dumps({"name": name, "payload": payload}, sort_keys=True, default=str))
+
+    def _path(self, kind: str, key: str) -> Path:
+        return self.fixture_dir / kind / f"{key}.json"
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def record(self, kind: str, name: str, payload: Any, response: Any, duration_s: float) -> None:
+        """Saves one response as a fixture (atomically, so concurrent recorders never leave partial files)."""
+        path = self._path(kind, self.make_key(name, payload))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fixture = {"name": name, "payload": payload, "response": response, "duration_s": round(duration_s, 3)}
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, default=str)
+        os.replace(tmp_path, path)
+        self._count("recorded")
+
+    def lookup(self, kind: str, name: str, payload: Any) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(kind, self.make_key(name, payload)), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _delay(self, fixture: Optional[Dict[str, Any]]) -> float:
+        if self.latency == "recorded":
+            return float(fixture.get("duration_s", 0.0)) if fixture else 0.0
+        return self.latency
+
+    def replay(self, kind: str, name: str, payload: Any, synthetic: Callable[[], Any]) -> Any:
+        """Returns the recorded response after the synthetic latency. Raises ReplayMissError on a miss, unless on_miss is 'synthetic'."""
+        fixture = self.lookup(kind, name, payload)
+        if fixture is None and self.on_miss == "error":
+            raise ReplayMissError(f"No {kind} fixture for '{name}' in {self.fixture_dir} (set PATENT_CREW_REPLAY_ON_MISS=synthetic to fall back)")
+        delay = self._delay(fixture)
+        if delay > 0:
+            time.sleep(delay)
+        if fixture is None:
+            self._count("synthetic")
+            return synthetic()
+        self._count("replayed")
+        return fixture["response"]
+
+    async def replay_async(self, kind: str, name: str, payload: Any, synthetic: Callable[[], Any]) -> Any:
+        """Async variant of replay: the latency is awaited instead of blocking the event loop."""
+        fixture = self.lookup(kind, name, payload)
+        if fixture is None and self.on_miss == "error":
+            raise ReplayMissError(f"No {kind} fixture for '{name}' in {self.fixture_dir} (set PATENT_CREW_REPLAY_ON_MISS=synthetic to fall back)")
+        delay = self._delay(fixture)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if fixture is None:
+            self._count("synthetic")
+            return synthetic()
+        self._count("replayed")
+        return fixture["response"]
+
+
+_backend: Optional[ReplayBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_replay_backend() -> ReplayBackend:
+    """The process-wide backend, configured from the PATENT_CREW_REPLAY* environment variables on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = ReplayBackend(
+                mode=os.getenv("PATENT_CREW_REPLAY", "off"),
+                fixture_dir=os.getenv("PATENT_CREW_REPLAY_DIR", DEFAULT_FIXTURE_DIR),
+                latency=os.getenv("PATENT_CREW_REPLAY_LATENCY", "0"),
+                on_miss=os.getenv("PATENT_CREW_REPLAY_ON_MISS", "error"),
+            )
+        return _backend
+
+
+def configure_replay(mode: str, fixture_dir: str | Path = DEFAULT_FIXTURE_DIR,
+                     latency: str | float = 0.0, on_miss: str = "error") -> ReplayBackend:
+    """Replaces the process-wide backend, e.g. from a benchmark script."""
+    global _backend
+    with _backend_lock:
+        _backend = ReplayBackend(mode, fixture_dir, latency, on_miss)
+        return _backend
+
+
+def replayable_tool_call(fn: F) -> F:
+    """
+    Decorator for a network tool's _run / _arun: records its results in record mode and answers
+    from the fixtures in replay mode. Arguments are keyed by name, so call the tool with keywords.
+    """
+    def synthetic_for(tool_name: str, kwargs: Dict[str, Any]) -> Callable[[], str]:
+        return lambda: f"Synthetic {tool_name} result for {json.dumps(kwargs, sort_keys=True, default=str)}"
+
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            backend = get_replay_backend()
+            payload = {"args": list(args), "kwargs": kwargs}
+            if backend.mode == "replay":
+                return await backend.replay_async("tool", self.name, payload, synthetic_for(self.name, payload))
+            start = time.monotonic()
+            result = await fn(self, *args, **kwargs)
+            if backend.mode == "record":
+                backend.record("tool", self.name, payload, result, time.monotonic() - start)
+            return result
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        backend = get_replay_backend()
+        payload = {"args": list(args), "kwargs": kwargs}
+        if backend.mode == "replay":
+            return backend.replay("tool", self.name, payload, synthetic_for(self.name, payload))
+        start = time.monotonic()
+        result = fn(self, *args, **kwargs)
+        if backend.mode == "record":
+            backend.record("tool", self.name, payload, result, time.monotonic() - start)
+        return result
+    return wrapper  # type: ignore[return-value]
@@ -1,13 +1,37 @@
 import json
 import os
 import pathlib
-from typing import Type, Dict, Any, List
+from typing import Type, Dict, Any, List, Optional, Tuple
 from pydantic import BaseModel, Field
 from crewai.tools import BaseTool
 
 from google import genai
 from google.genai import types
 
+from patent_crew.instrumentation import instrumented_tool_call
+from patent_crew.patent_store import load_patent_from_store
+from patent_crew.replay import replayable_tool_call
+from patent_crew.tools.gemini_client import get_gemini_client
+from patent_crew.tools.patent_projection import project_patent
+from patent_crew.tools.result_cache import ContentAddressedCache, sha256_bytes, sha256_text
+
+# Model actually used by PatentGeminiPdfLoaderTool for the vision call
+GEMINI_PDF_MODEL = "gemini-2.5-flash-preview-05-20"
+
+# It's crucial that the prompt here asks Gemini to extract/describe,
+# not to summarize or analyze, as that's the job of the subsequent agent.
+# The tool's job is to "load" the information.
+# Changing this prompt changes the cache key, see PatentGeminiPdfLoaderTool.invalidate_cache.
+GEMINI_PDF_EXTRACTION_PROMPT = (
+    "You are an expert patent analyst. First, extract the patent title and abstract to establish context. "
+    "Then extract visual content of figures/diagrams. For each figure, provide detailed analysis maintaining "
+    "overall patent context: 1) Overall design and layout of the figure, 2) Specific entities, components, "
+    "and labeled elements present, 3) Relationships and connections between entities, 4) Key features and "
+    "interactions among entities. Cross-reference figure descriptions in text with visual elements. "
+    "Structure output: PATENT CONTEXT (title, abstract), VISUAL CONTENT for each figure: "
+    "FIGURE [X] ANALYSIS with subsections for Design, Entities, Relationships, Features."
+)
+
 class PatentJsonLoaderInput(BaseModel):
     """Input schema for PatentJsonLoaderTool."""
     json_file_path: str = Field(..., description="The relative path from the 'knowledge' directory to the patent's JSON data file. E.g., 'nlp/pdf_and_image/US-XYZ/US-XYZ.json'.")
@@ -21,22 +45,63 @@ class PatentJsonLoaderTool(BaseTool):
     args_schema: Type[BaseModel] = PatentJsonLoaderInput
     # Define a root directory for knowledge base to ensure correct path resolution
     knowledge_base_root: str = "knowledge"
+    # Optional field projection (field path -> token budget), see patent_projection.py.
+    # None returns the whole patent JSON.
+    projection: Optional[Dict[str, Optional[int]]] = None
+    # Optional JSONL file receiving one bytes/tokens-saved report per projected patent
+    projection_report_path: Optional[str] = None
+
+    def _project(self, patent_data: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.projection or not isinstance(patent_data, dict):
+            return patent_data
+        projected, report = project_patent(patent_data, self.projection)
+        print(
+            f"[DEBUG custom_tool.py] PatentJsonLoaderTool projection for {report['publication_number']}: "
+            f"{report['bytes_saved']} bytes / ~{report['tokens_saved']} tokens saved "
+            f"({report['original_tokens']} -> {report['projected_tokens']} tokens)"
+        )
+        if self.projection_report_path:
+            try:
+                os.makedirs(os.path.dirname(self.projection_report_path) or ".", exist_ok=True)
+                with open(self.projection_report_path, 'a') as f:
+                    f.write(json.dumps(report) + '\n')
+            except OSError as e:
+                print(f"[DEBUG custom_tool.py] PatentJsonLoaderTool could not write projection report: {e}")
+        return projected
+
+    def _load_from_store(self, full_path: str) -> Dict[str, Any] | None:
+        """Looks the patent up in the category pack store written by setup_data.py, if any."""
+        try:
+            return load_patent_from_store(full_path)
+        except Exception as e:
+            print(f"[DEBUG custom_tool.py] PatentJsonLoaderTool store lookup failed for {full_path}: {e}")
+            return None
+
+    def _parse(self, full_path: str, raw_text: str) -> Dict[str, Any] | str:
+        try:
+            patent_data = json.loads(raw_text)
+        except json.JSONDecodeError:
+            error_msg = f"Error: Could not decode JSON from file {full_path}. The file might be corrupted or not in valid JSON format."
+            print(f"[DEBUG custom_tool.py] PatentJsonLoaderTool error: {error_msg}") # DEBUG PRINT
+            return error_msg
+        return self._project(patent_data)
 
+    @instrumented_tool_call
     def _run(self, json_file_path: str) -> Dict[str, Any] | str:
         """Loads JSON data from the specified patent file."""
         full_path = os.path.join(self.knowledge_base_root, json_file_path)
+
+        stored_data = self._load_from_store(full_path)
+        if stored_data is not None:
+            return self._project(stored_data)
         
         if not os.path.exists(full_path):
             return f"Error: File not found at {full_path}. Please ensure the json_file_path is correct and relative to the '{self.knowledge_base_root}' directory."
         
         try:
             with open(full_path, 'r') as f:
-                patent_data = json.load(f)
-            return patent_data
-        except json.JSONDecodeError:
-            error_msg = f"Error: Could not decode JSON from file {full_path}. The file might be corrupted or not in valid JSON format."
-            print(f"[DEBUG custom_tool.py] PatentJsonLoaderTool error: {error_msg}") # DEBUG PRINT
-            return error_msg
+                raw_text = f.read()
+            return self._parse(full_path, raw_text)
         except Exception as e:
             error_msg = f"Error: An unexpected error occurred while reading {full_path}: {str(e)}"
             print(f"[DEBUG custom_tool.py] PatentJsonLoaderTool error: {error_msg}") # DEBUG PRINT
@@ -60,7 +125,80 @@ class PatentGeminiPdfLoaderTool(BaseTool):
     )
     args_schema: Type[BaseModel] = PatentGeminiPdfLoaderInput
     knowledge_base_root: str = "knowledge"
+    # On-disk result cache keyed by (PDF content hash, model, prompt)
+    use_cache: bool = True
+    cache_dir: str = ".cache/gemini_pdf"
+    cache_max_bytes: int = 256 * 1024 * 1024
+
+    def _get_cache(self) -> ContentAddressedCache:
+        return ContentAddressedCache(self.cache_dir, max_bytes=self.cache_max_bytes)
+
+    def invalidate_cache(self, all_entries: bool = False) -> int:
+        """
+        Drops cached extractions. By default only entries produced with a different
+        extraction prompt than the current one are removed; all_entries=True clears the cache.
+        Returns the number of removed entries.
+        """
+        cache = self._get_cache()
+        if all_entries:
+            return cache.invalidate()
+        return cache.invalidate(keep_prompt_hash=sha256_text(GEMINI_PDF_EXTRACTION_PROMPT))
+
+    def _cache_lookup(self, full_path: str, pdf_bytes: bytes) -> Tuple[str | None, str | None]:
+        """Returns (cache_key, cached_content). Both are None when caching is disabled."""
+        if not self.use_cache:
+            return None, None
+        cache_key = ContentAddressedCache.make_key(
+            sha256_bytes(pdf_bytes), GEMINI_PDF_MODEL, GEMINI_PDF_EXTRACTION_PROMPT
+        )
+        cached_content = self._get_cache().get(cache_key)
+        if cached_content is not None:
+            print(f"[DEBUG custom_tool.py] PatentGeminiPdfLoaderTool cache hit for {full_path}")
+        return cache_key, cached_content
+
+    def _cache_store(self, cache_key: str | None, pdf_file_path: str, extracted_content: str) -> None:
+        if cache_key is None or not extracted_content:
+            return
+        try:
+            self._get_cache().put(cache_key, extracted_content, metadata={
+                "pdf_file_path": pdf_file_path,
+                "model_name": GEMINI_PDF_MODEL,
+                "prompt_hash": sha256_text(GEMINI_PDF_EXTRACTION_PROMPT),
+            })
+        except OSError as e:
+            print(f"[DEBUG custom_tool.py] PatentGeminiPdfLoaderTool could not write cache: {e}")
+
+    @staticmethod
+    def _build_contents(pdf_bytes: bytes) -> List[Any]:
+        return [
+            types.Part.from_bytes(
+                data=pdf_bytes, mime_type='application/pdf',
+            ),
+            GEMINI_PDF_EXTRACTION_PROMPT]
+
+    @staticmethod
+    def _extract_text(response: Any, full_path: str) -> Tuple[bool, str]:
+        """Returns (True, text) for a usable response, (False, error message) otherwise."""
+        # Safety check, Gemini API might have safety ratings
+        if not response.candidates or not response.candidates[0].content.parts:
+            # Handle cases where the response might be blocked or empty due to safety settings or other issues
+            safety_ratings_info = ""
+            if response.prompt_feedback and response.prompt_feedback.block_reason:
+                safety_ratings_info = f"Blocked due to: {response.prompt_feedback.block_reason_message}"
+            elif response.candidates and response.candidates[0].finish_reason != 'STOP':
+                safety_ratings_info = f"Finished with reason: {response.candidates[0].finish_reason.name}"
+
+            error_msg = f"Error: Gemini model did not return expected content for {full_path}. {safety_ratings_info}".strip()
+            print(f"[DEBUG custom_tool.py] PatentGeminiPdfLoaderTool error: {error_msg}")
+            return False, error_msg
 
+        extracted_content = response.text # .text conveniently concatenates parts
+
+        print(f"[DEBUG custom_tool.py] Content snippet: {extracted_content[:200]}...")
+        return True, extracted_content
+
+    @instrumented_tool_call
+    @replayable_tool_call
     def _run(self, pdf_file_path: str, model_name: str = "gemini-2.5-flash-preview-05-20") -> str | Dict[str, Any]:
         if not genai:
             return "Error: Google GenAI library is not available or configured."
@@ -75,51 +213,21 @@ class PatentGeminiPdfLoaderTool(BaseTool):
             pdf_file = pathlib.Path(full_path)
             pdf_bytes = pdf_file.read_bytes()
 
-            # It's crucial that the prompt here asks Gemini to extract/describe,
-            # not to summarize or analyze, as that's the job of the subsequent agent.
-            # The tool's job is to "load" the information.
-            extraction_prompt = (
-                "You are an expert patent analyst. First, extract the patent title and abstract to establish context. "
-                "Then extract visual content of figures/diagrams. For each figure, provide detailed analysis maintaining "
-                "overall patent context: 1) Overall design and layout of the figure, 2) Specific entities, components, "
-                "and labeled elements present, 3) Relationships and connections between entities, 4) Key features and "
-                "interactions among entities. Cross-reference figure descriptions in text with visual elements. "
-                "Structure output: PATENT CONTEXT (title, abstract), VISUAL CONTENT for each figure: "
-                "FIGURE [X] ANALYSIS with subsections for Design, Entities, Relationships, Features."
-            )
-            
-            client = genai.Client(api_key=os.environ["GOOGLE_API_KEY"])
-            
+            cache_key, cached_content = self._cache_lookup(full_path, pdf_bytes)
+            if cached_content is not None:
+                return cached_content
+
+            client = get_gemini_client()
             response = client.models.generate_content(
-                model = "gemini-2.5-flash-preview-05-20",
-                contents=[
-                    types.Part.from_bytes(
-                        data=pdf_bytes, mime_type='application/pdf',
-                    ),
-                    extraction_prompt])
-            
-
-            
-            # Safety check, Gemini API might have safety ratings
-            if not response.candidates or not response.candidates[0].content.parts:
-                # Handle cases where the response might be blocked or empty due to safety settings or other issues
-                safety_ratings_info = ""
-                if response.prompt_feedback and response.prompt_feedback.block_reason:
-                    safety_ratings_info = f"Blocked due to: {response.prompt_feedback.block_reason_message}"
-                elif response.candidates and response.candidates[0].finish_reason != 'STOP':
-                    safety_ratings_info = f"Finished with reason: {response.candidates[0].finish_reason.name}"
-
-                error_msg = f"Error: Gemini model did not return expected content for {full_path}. {safety_ratings_info}".strip()
-                print(f"[DEBUG custom_tool.py] PatentGeminiPdfLoaderTool error: {error_msg}")
-                return error_msg
-
-            extracted_content = response.text # .text conveniently concatenates parts
-
-            print(f"[DEBUG custom_tool.py] Content snippet: {extracted_content[:200]}...")
+                model=GEMINI_PDF_MODEL,
+                contents=self._build_contents(pdf_bytes))
+
+            ok, extracted_content = self._extract_text(response, full_path)
+            if ok:
+                self._cache_store(cache_key, pdf_file_path, extracted_content)
             return extracted_content
 
         except Exception as e:
             error_msg = f"Error: An unexpected error occurred while processing PDF {full_path} with Gemini: {str(e)}"
             print(f"[DEBUG custom_tool.py] PatentGeminiPdfLoaderTool error: {error_msg}")
             return error_msg
-
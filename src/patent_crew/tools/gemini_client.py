@@ -0,0 +1,69 @@
+'''
+Process-wide Gemini client shared by the custom tools.
+
+genai.Client keeps its own HTTP client, so building one per tool call means one new
+TLS/HTTP setup per patent per crew copy. Instead, every tool instance (including the
+copies made by Crew.copy() under kickoff_for_each_async) goes through get_gemini_client(),
+which lazily builds a single client with a pooled transport.
+
+Environment:
+- GOOGLE_API_KEY: API key used for the client.
+- GEMINI_BASE_URL: optional endpoint override, e.g. a local stub server in tests.
+'''
+
+import os
+import threading
+from typing import Optional
+
+import httpx
+from google import genai
+from google.genai import types
+
+# --- Connection pool configuration ---
+GEMINI_MAX_CONNECTIONS = 32
+GEMINI_MAX_KEEPALIVE_CONNECTIONS = 16
+GEMINI_KEEPALIVE_EXPIRY = 60.0  # seconds
+# ---------------------------
+
+_client: Optional[genai.Client] = None
+_client_lock = threading.Lock()
+
+
+def _build_http_options() -> types.HttpOptions:
+    """Pooled httpx transport shared by the sync and async sides of the client."""
+    limits = httpx.Limits(
+        max_connections=GEMINI_MAX_CONNECTIONS,
+        max_keepalive_connections=GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=GEMINI_KEEPALIVE_EXPIRY,
+    )
+    http_options = types.HttpOptions(
+        client_args={"limits": limits},
+        async_client_args={"limits": limits},
+    )
+    base_url = os.environ.get("GEMINI_BASE_URL")
+    if base_url:
+        http_options.base_url = base_url
+    return http_options
+
+
+def get_gemini_client() -> genai.Client:
+    """
+    Returns the shared Gemini client, creating it on first use.
+    Safe to call concurrently from worker threads.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = genai.Client(
+                    api_key=os.environ["GOOGLE_API_KEY"],
+                    http_options=_build_http_options(),
+                )
+    return _client
+
+
+def reset_gemini_client() -> None:
+    """Drops the shared client so the next call rebuilds it (e.g. after changing GEMINI_BASE_URL)."""
+    global _client
+    with _client_lock:
+        _client = None
@@ -0,0 +1,126 @@
+'''
+Field projection for patent JSON records.
+
+The full patent dict returned by PatentJsonLoaderTool lands in the patent_analyst context and is
+then forwarded to every downstream task. A projection keeps only configured fields and truncates
+each one to a per-field token budget.
+
+A projection is a dict of field path -> token budget. Paths may use dots to select a section of a
+nested dict, e.g. "description.summary". A budget of None keeps the field untruncated.
+'''
+
+import json
+from typing import Any, Dict, Optional, Tuple
+
+# Rough token estimate, good enough to size budgets without pulling a tokenizer
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = " ...[truncated]"
+
+DEFAULT_PROJECTION: Dict[str, Optional[int]] = {
+    "publication_number": None,
+    "title": 64,
+    "abstract": 400,
+    "claims": 1500,
+    "description": 2000,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximates the token count of a string."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Truncates text to roughly max_tokens, cutting at the last whitespace before the limit."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    if cut < max_chars // 2:
+        cut = max_chars
+    return text[:cut].rstrip() + TRUNCATION_MARKER
+
+
+def truncate_value(value: Any, max_tokens: Optional[int]) -> Any:
+    """
+    Fits a field value into max_tokens.
+    Strings are cut at a word boundary, lists keep whole leading items while the budget allows
+    (the first item is truncated if it alone exceeds the budget), other values are serialized.
+    """
+    if max_tokens is None:
+        return value
+    if isinstance(value, str):
+        return truncate_text(value, max_tokens)
+    if isinstance(value, list):
+        kept = []
+        remaining = max_tokens
+        for item in value:
+            item_text = item if isinstance(item, str) else json.dumps(item, ensure_ascii=False)
+            item_tokens = estimate_tokens(item_text)
+            if item_tokens > remaining:
+                if not kept:
+                    kept.append(truncate_text(item_text, remaining))
+                break
+            kept.append(item)
+            remaining -= item_tokens
+        return kept
+    if isinstance(value, dict):
+        return truncate_text(json.dumps(value, ensure_ascii=False), max_tokens)
+    return value
+
+
+def _get_path(data: Dict[str, Any], path: str) -> Tuple[bool, Any]:
+    current: Any = data
+    for part in path.split("."):
+        if not isinstance(current, dict) or part not in current:
+            return False, None
+        current = current[part]
+    return True, current
+
+
+def _set_path(data: Dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    current = data
+    for part in parts[:-1]:
+        current = current.setdefault(part, {})
+    current[parts[-1]] = value
+
+
+def project_patent(patent_data: Dict[str, Any], projection: Dict[str, Optional[int]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Applies a projection to a patent record.
+
+    Args:
+        patent_data: The full patent dict.
+        projection: Field path -> token budget (None = keep as is).
+
+    Returns:
+        A tuple (projected_data, report) where report holds the byte and token counts
+        before/after projection and the fields that were missing from the record.
+    """
+    projected: Dict[str, Any] = {}
+    missing_fields = []
+    for path, max_tokens in projection.items():
+        found, value = _get_path(patent_data, path)
+        if not found:
+            missing_fields.append(path)
+            continue
+        _set_path(projected, path, truncate_value(value, max_tokens))
+
+    original_text = json.dumps(patent_data, ensure_ascii=False)
+    projected_text = json.dumps(projected, ensure_ascii=False)
+    original_bytes = len(original_text.encode("utf-8"))
+    projected_bytes = len(projected_text.encode("utf-8"))
+    original_tokens = estimate_tokens(original_text)
+    projected_tokens = estimate_tokens(projected_text)
+    report = {
+        "publication_number": patent_data.get("publication_number"),
+        "original_bytes": original_bytes,
+        "projected_bytes": projected_bytes,
+        "bytes_saved": original_bytes - projected_bytes,
+        "original_tokens": original_tokens,
+        "projected_tokens": projected_tokens,
+        "tokens_saved": original_tokens - projected_tokens,
+        "missing_fields": missing_fields,
+    }
+    return projected, report
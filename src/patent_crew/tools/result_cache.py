@@ -0,0 +1,139 @@
+'''
+Content-addressed on-disk cache for tool results.
+
+Entries are keyed by the sha256 of the source file content, the model name and the prompt,
+so a re-run of the same patent returns the stored extraction instead of re-uploading the PDF.
+Other callers (search_cache.py) build their own keys with sha256_text.
+
+Layout: {cache_dir}/{key}.json, each file holding the result plus the metadata used to build the key.
+The cache is size-bounded: when the total size exceeds max_bytes, least recently used entries
+(by file mtime, refreshed on every hit) are evicted first.
+'''
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def sha256_bytes(data: bytes) -> str:
+    """Returns the hex sha256 digest of raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_text(text: str) -> str:
+    """Returns the hex sha256 digest of a utf-8 string."""
+    return sha256_bytes(text.encode("utf-8"))
+
+
+class ContentAddressedCache:
+    """Size-bounded LRU cache of JSON-serializable results stored as one file per entry."""
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(content_hash: str, model_name: str, prompt: str) -> str:
+        """Builds the cache key from the content hash, the model name and the prompt."""
+        return sha256_text(f"{content_hash}\n{model_name}\n{sha256_text(prompt)}")
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str, max_age_s: Optional[float] = None) -> Optional[Any]:
+        """
+        Returns the cached result for key, or None on a miss. A hit refreshes the entry's LRU position.
+        With max_age_s, entries created longer ago count as a miss (TTL).
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if max_age_s is not None and time.time() - entry.get("created_at", 0) > max_age_s:
+            return None
+        try:
+            os.utime(entry_path, None)
+        except OSError:
+            pass
+        return entry.get("result")
+
+    def put(self, key: str, result: Any, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Stores result under key (atomically), then evicts old entries if the cache is over budget."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = {"key": key, "created_at": time.time(), "metadata": metadata or {}, "result": result}
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, entry_path)
+        self.evict(keep_key=key)
+
+    def evict(self, keep_key: Optional[str] = None) -> int:
+        """
+        Removes least recently used entries until the cache fits in max_bytes.
+        The entry for keep_key (typically the one just written) is never evicted.
+        Returns the number of removed entries.
+        """
+        if not self.cache_dir.is_dir():
+            return 0
+        entries = []
+        total_bytes = 0
+        for entry_path in self.cache_dir.glob("*.json"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total_bytes += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            if entry_path.stem == keep_key:
+                continue
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+            removed += 1
+        return removed
+
+    def invalidate(self, keep_prompt_hash: Optional[str] = None, model_name: Optional[str] = None) -> int:
+        """
+        Removes cache entries. With no arguments, clears the whole cache.
+
+        Args:
+            keep_prompt_hash: If set, only entries whose recorded prompt hash differs are removed
+                (i.e. drop everything produced by an outdated prompt).
+            model_name: If set, only entries produced by this model are considered.
+
+        Returns:
+            The number of removed entries.
+        """
+        if not self.cache_dir.is_dir():
+            return 0
+        removed = 0
+        for entry_path in self.cache_dir.glob("*.json"):
+            try:
+                with open(entry_path, "r", encoding="utf-8") as f:
+                    metadata = json.load(f).get("metadata", {})
+            except (FileNotFoundError, json.JSONDecodeError):
+                metadata = {}
+            if model_name is not None and metadata.get("model_name") != model_name:
+                continue
+            if keep_prompt_hash is not None and metadata.get("prompt_hash") == keep_prompt_hash:
+                continue
+            try:
+                entry_path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
@@ -0,0 +1,222 @@
+'''
+Memoizing wrapper for the web search tools (LinkupSearchTool, SerperDevTool).
+
+The market research, user research and evaluator agents run the same or near-identical searches for
+every patent of a category ("market size conversational AI social robots"...). CachedSearchTool puts an
+on-disk cache (result_cache.ContentAddressedCache) in front of the real tool:
+- queries are normalized (case, punctuation, whitespace, stopwords, word order) before keying,
+- entries expire after ttl_s and the cache is size-bounded with LRU eviction,
+- concurrent identical searches (e.g. crew copies of several patents starting their Phase 2 together)
+  are coalesced: one caller performs the request, the others wait for and share its result,
+- hits and misses are counted per agent: wrap the shared tool once per agent with its own agent_label,
+  all wrappers share the same cache directory.
+
+Set SEARCH_CACHE_OFFLINE=1 to never call the search APIs: misses return an error string instead, which
+allows replaying a run from a recorded cache without API keys or network.
+'''
+
+import json
+import os
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel
+
+from patent_crew.instrumentation import instrumented_tool_call
+from patent_crew.replay import replayable_tool_call
+from patent_crew.tools.result_cache import ContentAddressedCache, sha256_text
+
+SEARCH_CACHE_DIR = ".cache/search"
+SEARCH_CACHE_TTL_S = 7 * 24 * 3600  # Market data goes stale: re-search after a week
+SEARCH_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Argument holding the query text: LinkupSearchTool uses query, SerperDevTool search_query
+QUERY_ARG_NAMES = ("query", "search_query")
+
+_STOPWORDS = {"a", "an", "and", "the", "of", "for", "in", "on", "to", "with", "by", "at", "from", "or", "vs", "versus"}
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a search query, so near-identical searches share a cache entry:
+    NFKC, lowercase, punctuation, hyphens and stopwords dropped, words deduplicated and sorted.
+    Quoted phrases keep their word order, since search engines treat them as exact matches.
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    phrases = sorted(" ".join(p.split()) for p in re.findall(r'"([^"]+)"', text))
+    text = re.sub(r'"[^"]+"', " ", text)
+    words = re.findall(r"[\w][\w.+#]*[\w+#]|[\w]", text.replace("-", " "))
+    words = sorted({w for w in words if w not in _STOPWORDS})
+    return " ".join([f'"{p}"' for p in phrases] + words)
+
+
+def make_search_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Cache key of one search: tool name, normalized query and the remaining arguments."""
+    canonical = {
+        name: normalize_query(value) if name in QUERY_ARG_NAMES and isinstance(value, str) else value
+        for name, value in arguments.items()
+    }
+    return sha256_text(json.dumps({"tool": tool_name, "arguments": canonical}, sort_keys=True, default=str))
+
+
+def is_cacheable_result(result: Any) -> bool:
+    """Failed searches are not cached: the tools report errors as strings or as {'success': False}."""
+    if result is None:
+        return False
+    if isinstance(result, str):
+        return bool(result.strip()) and not result.lower().startswith("error")
+    if isinstance(result, dict) and result.get("success") is False:
+        return False
+    return True
+
+
+_stats_lock = threading.Lock()
+_search_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _record(agent_label: str, outcome: str) -> None:
+    with _stats_lock:
+        stats = _search_stats.setdefault(agent_label, {"hits": 0, "coalesced": 0, "misses": 0, "errors": 0})
+        stats[outcome] += 1
+
+
+def get_search_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Search cache counters per agent label: hits, coalesced (shared an identical in-flight search),
+    misses (reached the search API), errors (failed searches, also counted as misses) and hit rate,
+    the share of lookups that did not reach the API.
+    """
+    with _stats_lock:
+        report = {}
+        for agent_label, stats in sorted(_search_stats.items()):
+            saved = stats["hits"] + stats["coalesced"]
+            lookups = saved + stats["misses"]
+            report[agent_label] = {**stats, "hit_rate": round(saved / lookups, 3) if lookups else 0.0}
+        return report
+
+
+def reset_search_cache_stats() -> None:
+    with _stats_lock:
+        _search_stats.clear()
+
+
+def write_search_cache_report(path: str) -> None:
+    """Appends the per-agent hit rates to a JSONL report file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(get_search_cache_stats()) + "\n")
+
+
+class _InFlightSearch:
+    """One outstanding search, awaited by the callers that asked for the same key meanwhile."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+
+
+_in_flight_lock = threading.Lock()
+_in_flight: Dict[str, _InFlightSearch] = {}
+
+
+def single_flight(key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+    """
+    Runs fn once for all concurrent callers with the same key.
+
+    Returns:
+        (result, shared): shared is True for callers that waited for another caller's fn.
+    """
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _InFlightSearch()
+            _in_flight[key] = flight
+    if not is_leader:
+        flight.done.wait()
+        return flight.result, True
+
+    try:
+        flight.result = fn()
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+        flight.done.set()
+    return flight.result, False
+
+
+class CachedSearchTool(BaseTool):
+    """Search tool answering from the on-disk search cache and calling the wrapped tool on a miss."""
+
+    name: str = "Cached Search"
+    description: str = "Web search with an on-disk result cache."
+    inner_tool: BaseTool
+    agent_label: str = "default"
+    cache_dir: str = SEARCH_CACHE_DIR
+    ttl_s: Optional[float] = SEARCH_CACHE_TTL_S
+    cache_max_bytes: int = SEARCH_CACHE_MAX_BYTES
+
+    @classmethod
+    def wrap(cls, tool: BaseTool, agent_label: str, **kwargs: Any) -> "CachedSearchTool":
+        """Wraps a search tool for one agent, keeping its name, description and arguments so prompts are unchanged."""
+        args_schema: Optional[Type[BaseModel]] = getattr(tool, "args_schema", None)
+        extra = {"args_schema": args_schema} if args_schema is not None else {}
+        return cls(
+            name=tool.name,
+            description=tool.description,
+            inner_tool=tool,
+            agent_label=agent_label,
+            **extra,
+            **kwargs,
+        )
+
+    def _get_cache(self) -> ContentAddressedCache:
+        return ContentAddressedCache(Path(self.cache_dir), max_bytes=self.cache_max_bytes)
+
+    @instrumented_tool_call
+    @replayable_tool_call
+    def _run(self, **kwargs: Any) -> Any:
+        cache = self._get_cache()
+        key = make_search_key(self.inner_tool.name, kwargs)
+        cached = cache.get(key, max_age_s=self.ttl_s)
+        if cached is not None:
+            _record(self.agent_label, "hits")
+            return cached
+
+        if os.getenv("SEARCH_CACHE_OFFLINE") == "1":
+            _record(self.agent_label, "misses")
+            return f"Error: no recorded search result for {kwargs} (SEARCH_CACHE_OFFLINE=1)."
+
+        result, shared = single_flight(key, lambda: self._search(cache, key, kwargs))
+        if shared:
+            _record(self.agent_label, "coalesced")
+        return result
+
+    def _search(self, cache: ContentAddressedCache, key: str, kwargs: Dict[str, Any]) -> Any:
+        """Calls the wrapped tool and caches a successful result. Runs once per in-flight key."""
+        # A search for this key may have completed between our cache miss and taking the lead
+        cached = cache.get(key, max_age_s=self.ttl_s)
+        if cached is not None:
+            _record(self.agent_label, "hits")
+            return cached
+
+        _record(self.agent_label, "misses")
+        try:
+            result = self.inner_tool.run(**kwargs)
+        except Exception as e:
+            _record(self.agent_label, "errors")
+            return f"Error: search failed: {e}"
+
+        if is_cacheable_result(result):
+            try:
+                # Round-trip through JSON so a hit returns exactly what a later lookup would
+                result = json.loads(json.dumps(result, default=str))
+                cache.put(key, result, metadata={"tool": self.inner_tool.name, "arguments": kwargs})
+            except (OSError, TypeError, ValueError) as e:
+                print(f"[DEBUG search_cache.py] Could not cache search result: {e}")
+        else:
+            _record(self.agent_label, "errors")
+        return result
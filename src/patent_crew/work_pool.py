@@ -0,0 +1,71 @@
+'''
+Bounded-concurrency work queue for asyncio.
+
+run_sliding_window keeps up to max_in_flight items running at all times: as soon as one
+finishes, the next one starts. Unlike fixed batches, one slow item never stalls the others.
+'''
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def run_sliding_window(
+    items: Iterable[T],
+    worker: Callable[[T], Awaitable[R]],
+    max_in_flight: int,
+    on_done: Optional[Callable[[T, Optional[R], Optional[BaseException]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Runs worker(item) for every item with at most max_in_flight running concurrently.
+
+    Args:
+        items: The work items, consumed lazily.
+        worker: Coroutine function processing one item.
+        max_in_flight: Number of concurrent workers.
+        on_done: Optional callback (item, result, error) called as each item finishes.
+
+    Returns:
+        A summary dict: completed, failed, duration_s and items_per_hour.
+        Worker exceptions are reported through on_done and counted, never raised.
+    """
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1")
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+
+    completed = 0
+    failed = 0
+    start_time = time.monotonic()
+
+    async def consume() -> None:
+        nonlocal completed, failed
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            result, error = None, None
+            try:
+                result = await worker(item)
+                completed += 1
+            except Exception as e:
+                error = e
+                failed += 1
+            if on_done is not None:
+                on_done(item, result, error)
+
+    await asyncio.gather(*(consume() for _ in range(min(max_in_flight, queue.qsize()) or 1)))
+
+    duration = time.monotonic() - start_time
+    return {
+        "completed": completed,
+        "failed": failed,
+        "duration_s": round(duration, 2),
+        "items_per_hour": round(completed * 3600 / duration, 1) if duration > 0 else 0.0,
+    }
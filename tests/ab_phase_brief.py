@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+A/B harness: phase brief (USE_PHASE_BRIEF=True) against the current outputs.
+
+For patents that already have a valid output/{category}/**/{publication_number}_output.json (variant A,
+produced without the brief), the crew is re-run with the phase brief (variant B). Per patent it records:
+- the Phase 3 context tokens with and without the brief (phase_brief.measure_context_reduction),
+- whether B's output is valid (output_manifest.is_valid_output),
+- a pairwise judgement by an LLM judge, with A/B shown in random order to cancel position bias.
+
+B outputs are moved to output/ab_phase_brief/{category}/ so the manifest, crew_rewrite.py and
+compile_result.py never pick them up. Results go to output/ab_phase_brief/{category}/ab_report.jsonl.
+
+The crew's output_file is output/material_chemistry/... (tasks_mc.yaml), hence the default category.
+
+Run:
+uv run tests/ab_phase_brief.py --patents 5
+"""
+
+import argparse
+import json
+import random
+import shutil
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(PROJECT_ROOT / "src")]
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from patent_crew import crew as crew_module
+from patent_crew.crew import PatentAnalysisCrew
+from patent_crew.dag_scheduler import run_crew_dag
+from patent_crew.governed_llm import GovernedLLM
+from patent_crew.output_manifest import OUTPUT_GLOB, OUTPUT_SUFFIX, is_valid_output, parse_output_text, scan_existing_outputs
+from patent_crew.patent_index import get_patent_by_publication_number
+from patent_crew.phase_brief import measure_context_reduction
+
+AB_BATCH_IDX = "ab_phase_brief"
+JUDGE_MODEL = "gpt-4o-mini"
+JUDGE_PROMPT = """You compare two product concepts derived from the same patent.
+Judge them on: fidelity to the patent, market relevance, clarity of the target users and benefits,
+feasibility of the implementation, and strength of the differentiation.
+
+Concept 1:
+{first}
+
+Concept 2:
+{second}
+
+Answer with a JSON object only: {{"winner": 1 or 2 or 0 for a tie, "reason": "one sentence"}}"""
+
+
+def judge(llm: GovernedLLM, concept_a: str, concept_b: str, rng: random.Random) -> str:
+    """Returns 'A', 'B' or 'tie'."""
+    swapped = rng.random() < 0.5
+    first, second = (concept_b, concept_a) if swapped else (concept_a, concept_b)
+    answer = llm.call([{"role": "user", "content": JUDGE_PROMPT.format(first=first, second=second)}])
+    try:
+        winner = parse_output_text(answer).get("winner")
+    except (json.JSONDecodeError, AttributeError):
+        return "tie"
+    if winner not in (1, 2):
+        return "tie"
+    return ("B" if winner == 1 else "A") if swapped else ("A" if winner == 1 else "B")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--category", default="material_chemistry")
+    parser.add_argument("--patents", type=int, default=5, help="Number of patents to re-run with the phase brief")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    output_dir = PROJECT_ROOT / "output" / args.category
+    ab_dir = PROJECT_ROOT / "output" / AB_BATCH_IDX / args.category
+    ab_dir.mkdir(parents=True, exist_ok=True)
+
+    done, _ = scan_existing_outputs(output_dir)
+    baseline_files = {
+        path.name[: -len(OUTPUT_SUFFIX)]: path
+        for path in output_dir.glob(OUTPUT_GLOB)
+        if path.parent.name != AB_BATCH_IDX and path.name[: -len(OUTPUT_SUFFIX)] in done
+    }
+    rng = random.Random(args.seed)
+    selected = rng.sample(sorted(baseline_files), min(args.patents, len(baseline_files)))
+    print(f"A/B on {len(selected)} of {len(baseline_files)} patents with a baseline output in {output_dir}")
+
+    crew_module.USE_PHASE_BRIEF = True
+    judge_llm = GovernedLLM(model=JUDGE_MODEL, temperature=0)
+    tallies = {"A": 0, "B": 0, "tie": 0}
+    reports = []
+
+    for publication_number in selected:
+        patent_input = get_patent_by_publication_number(args.category, publication_number, str(PROJECT_ROOT / "knowledge"))
+        if not patent_input:
+            print(f"Skipping {publication_number}: not in the knowledge base")
+            continue
+        crew = PatentAnalysisCrew().crew()
+        result = run_crew_dag(crew, inputs={**patent_input, "batch_idx": AB_BATCH_IDX})
+
+        written = output_dir / AB_BATCH_IDX / f"{publication_number}{OUTPUT_SUFFIX}"
+        variant_b = ab_dir / written.name
+        if written.exists():
+            shutil.move(str(written), variant_b)
+        else:
+            variant_b.write_text(result.raw, encoding="utf-8")
+
+        report = measure_context_reduction(result.tasks_output, publication_number) or {"publication_number": publication_number}
+        report["b_valid"] = is_valid_output(variant_b)
+        report["judge"] = judge(judge_llm, baseline_files[publication_number].read_text(encoding="utf-8"), variant_b.read_text(encoding="utf-8"), rng)
+        tallies[report["judge"]] += 1
+        reports.append(report)
+        print(json.dumps(report))
+
+    shutil.rmtree(output_dir / AB_BATCH_IDX, ignore_errors=True)
+    with open(ab_dir / "ab_report.jsonl", "a", encoding="utf-8") as f:
+        for report in reports:
+            f.write(json.dumps(report) + "\n")
+
+    if reports:
+        saved = [r["tokens_saved"] for r in reports if "tokens_saved" in r]
+        reductions = [r["reduction"] for r in reports if "reduction" in r]
+        print(f"\n{len(reports)} patents: judge prefers A (no brief) {tallies['A']}, B (brief) {tallies['B']}, tie {tallies['tie']}")
+        print(f"B outputs valid: {sum(r['b_valid'] for r in reports)}/{len(reports)}")
+        if saved:
+            print(f"Context tokens saved per patent: mean {sum(saved) / len(saved):.0f} "
+                  f"(mean reduction {sum(reductions) / len(reductions):.0%})")
+
+
+if __name__ == "__main__":
+    main()
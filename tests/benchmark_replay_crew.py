@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: orchestration overhead of PatentAnalysisCrew and RewriteCrew on the replay backend.
+
+Every LLM call is answered by the replay backend (src/patent_crew/replay.py) after a fixed synthetic
+latency, so the numbers are reproducible and need no API key or network:
+- patents/sec through the async_main sliding window (DAG scheduler, one crew copy per patent),
+- scheduler overhead: measured wall-clock per patent minus the ideal one, i.e. the crew's critical path
+  times the LLM latency,
+- memory per in-flight crew: traced peak Python allocations divided by the patents in flight.
+
+Uses recorded fixtures from --fixtures when they match, synthetic answers otherwise.
+
+Run:
+uv run tests/benchmark_replay_crew.py --patents 20 --in-flight 5 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(PROJECT_ROOT / "src")]
+
+# Tool constructors read these; nothing is sent in replay mode
+for key in ("LINKUP_API_KEY", "SERPER_API_KEY", "OPENAI_API_KEY", "GEMINI_API_KEY", "GOOGLE_API_KEY"):
+    os.environ.setdefault(key, "replay")
+
+from patent_crew.replay import configure_replay
+
+
+def make_inputs(num_patents: int, batch_idx: str) -> list:
+    inputs = []
+    for i in range(num_patents):
+        publication_number = f"US-{i:08d}-B2"
+        inputs.append({
+            "publication_number": publication_number,
+            "json_file_path": f"bench/pdf_and_image/{publication_number}/{publication_number}.json",
+            "pdf_file_path": f"bench/pdf_and_image/{publication_number}/{publication_number}.pdf",
+            "batch_idx": batch_idx,
+        })
+    return inputs
+
+
+def bench_analysis_crew(num_patents: int, max_in_flight: int, latency: float, output_dir: Path) -> dict:
+    from patent_crew.crew import PatentAnalysisCrew
+    from patent_crew.dag_scheduler import get_critical_path_length, get_task_dependencies, kickoff_dag_async
+    from patent_crew.work_pool import run_sliding_window
+
+    crew = PatentAnalysisCrew().crew()
+    critical_path = get_critical_path_length(get_task_dependencies(crew.tasks))
+    inputs = make_inputs(num_patents, "bench_replay")
+
+    tracemalloc.start()
+    summary = asyncio.run(run_sliding_window(inputs, lambda patent_input: kickoff_dag_async(crew, patent_input), max_in_flight))
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ideal_s = critical_path * latency
+    per_patent_s = summary["duration_s"] * min(max_in_flight, num_patents) / max(summary["completed"], 1)
+    return {
+        "patents": num_patents,
+        "completed": summary["completed"],
+        "failed": summary["failed"],
+        "patents_per_s": round(summary["completed"] / summary["duration_s"], 2) if summary["duration_s"] else 0.0,
+        "wall_clock_per_patent_s": round(per_patent_s, 3),
+        "ideal_per_patent_s": round(ideal_s, 3),
+        "scheduler_overhead_s": round(per_patent_s - ideal_s, 3),
+        "peak_mb_per_in_flight_crew": round(peak_bytes / 1024 / 1024 / min(max_in_flight, num_patents), 2),
+    }
+
+
+def bench_rewrite_crew(num_files: int, latency: float) -> dict:
+    from patent_crew.crew_rewrite import RewriteCrew
+
+    start = time.monotonic()
+    for i in range(num_files):
+        RewriteCrew().crew().kickoff(inputs={"json_file": f'{{"publication_number": "US-{i:08d}-B2"}}'})
+    duration = time.monotonic() - start
+    return {
+        "files": num_files,
+        "files_per_s": round(num_files / duration, 2),
+        "overhead_per_file_s": round(duration / num_files - latency, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patents", type=int, default=20)
+    parser.add_argument("--in-flight", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="Synthetic seconds per LLM call")
+    parser.add_argument("--fixtures", default=str(PROJECT_ROOT / "tests" / "fixtures" / "replay"))
+    parser.add_argument("--rewrite-files", type=int, default=10)
+    args = parser.parse_args()
+
+    backend = configure_replay("replay", args.fixtures, latency=args.latency, on_miss="synthetic")
+    output_dir = PROJECT_ROOT / "output" / "material_chemistry" / "bench_replay"
+    try:
+        print("PatentAnalysisCrew:", bench_analysis_crew(args.patents, args.in_flight, args.latency, output_dir))
+        print("RewriteCrew:", bench_rewrite_crew(args.rewrite_files, args.latency))
+    finally:
+        # The final task's output_file lands in output/material_chemistry/bench_replay/
+        for path in output_dir.glob("*"):
+            path.unlink()
+        if output_dir.is_dir():
+            output_dir.rmdir()
+    print("Replay backend:", backend.stats)
+
+
+if __name__ == "__main__":
+    main()
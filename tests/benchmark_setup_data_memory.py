@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak RSS of setup_data.py on a synthetic category.
+
+Compares:
+- load_all: the previous approach, every record of data/{category}/{category}.jsonl loaded into a dict
+  (load_all_patent_data_from_jsonl) before the knowledge base is written.
+- stream:   synchronize_patent_knowledge_base, single streaming pass over the JSONL.
+
+Each mode runs in a fresh subprocess so ru_maxrss is not shared between them.
+
+Run:
+uv run tests/benchmark_setup_data_memory.py --patents 2000 --record-kb 200
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(PROJECT_ROOT / "src")]
+
+
+def make_corpus(root: Path, num_patents: int, record_kb: int) -> None:
+    """Writes data/bench/bench.jsonl and one pdf_and_image/{publication_number}/ directory per patent."""
+    artifacts_dir = root / "data" / "bench" / "pdf_and_image"
+    artifacts_dir.mkdir(parents=True)
+    filler = "lorem ipsum dolor sit amet " * (record_kb * 1024 // 27)
+    with open(root / "data" / "bench" / "bench.jsonl", "w", encoding="utf-8") as f:
+        for i in range(num_patents):
+            publication_number = f"US-{i:08d}-B2"
+            f.write(json.dumps({"publication_number": publication_number, "title": f"Patent {i}", "description": filler}) + "\n")
+            patent_dir = artifacts_dir / publication_number
+            patent_dir.mkdir()
+            (patent_dir / f"{publication_number}.pdf").write_bytes(b"%PDF-1.4 bench")
+            (patent_dir / "1.png").write_bytes(b"png")
+
+
+def run_mode(mode: str, root: Path) -> None:
+    """Executes one mode in this process and prints its peak RSS in MB."""
+    import setup_data
+
+    setup_data.CATEGORY = "bench"
+    jsonl_path = root / "data" / "bench" / "bench.jsonl"
+    if mode == "load_all":
+        patent_data_map = setup_data.load_all_patent_data_from_jsonl(jsonl_path)
+        print(f"loaded {len(patent_data_map)} records", file=sys.stderr)
+    else:
+        setup_data.synchronize_patent_knowledge_base(
+            jsonl_path,
+            root / "data" / "bench" / "pdf_and_image",
+            root / "knowledge" / "bench" / "pdf_and_image",
+        )
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "peak_rss_mb": round(peak_kb / 1024, 1)}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patents", type=int, default=1000)
+    parser.add_argument("--record-kb", type=int, default=200)
+    parser.add_argument("--mode", choices=["load_all", "stream"], help=argparse.SUPPRESS)
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, Path(args.root))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        print(f"Generating {args.patents} patents of ~{args.record_kb} KB in {root}...")
+        make_corpus(root, args.patents, args.record_kb)
+        corpus_mb = (root / "data" / "bench" / "bench.jsonl").stat().st_size / 1024 / 1024
+        print(f"Corpus JSONL size: {corpus_mb:.1f} MB")
+
+        for mode in ("load_all", "stream"):
+            result = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--root", str(root)],
+                capture_output=True, text=True, check=True, env={**os.environ, "PYTHONUNBUFFERED": "1"},
+            )
+            print(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the end-to-end patent pipeline, with regression thresholds.
+
+Cases, run in order on one synthetic corpus per size, each in a fresh subprocess so peak RSS is its own:
+- setup_sync:  setup_data.synchronize_patent_knowledge_base (data/ -> knowledge/ store and index)
+- metadata:    patent_index.get_patent_metadadata on the synced index
+- json_loader: PatentJsonLoaderTool._run for every patent (per-call latency)
+- pdf_loader:  PatentGeminiPdfLoaderTool._run on the replay backend (per-call latency)
+- crew:        a full PatentAnalysisCrew run per patent (DAG scheduler) on the replay backend, no LLM latency
+- rewrite:     crew_rewrite.rewrite_files on synthetic over-limit *_output.json files, on the replay backend:
+               pre-shortener, RewriteCrew for the fields still too long, limit check and file I/O, with the
+               real fan-out (half of the files are shortened locally, half need the crew)
+- compile:     compile_result.main on the synthetic *_output_short.json files
+
+The crew and rewrite cases are capped at --crew-patents patents per size: they measure per-patent
+orchestration overhead, which does not depend on the corpus size.
+
+Each case reports duration, throughput, p50/p95 latency where per-item, and peak RSS. Results are compared
+with tests/benchmark_thresholds.json (max_duration_s, max_peak_rss_mb, max_latency_p95_ms per case and size);
+the exit code is 1 on any regression. --update-baseline rewrites the thresholds from this run, with headroom.
+Cases whose optional dependencies are missing (e.g. crewai) are reported as skipped; a case failing for any
+other reason fails the run (exit code 1), and the baseline is then left unchanged.
+
+Run:
+uv run tests/benchmark_suite.py --sizes 100 1000 10000
+uv run tests/benchmark_suite.py --sizes 100 --cases setup_sync metadata compile --update-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(PROJECT_ROOT / "src")]
+
+CASES = ("setup_sync", "metadata", "json_loader", "pdf_loader", "crew", "rewrite", "compile")
+# Cases reading the knowledge/ store written by setup_sync
+NEEDS_KNOWLEDGE = ("metadata", "json_loader", "pdf_loader", "crew")
+THRESHOLDS_PATH = Path(__file__).resolve().parent / "benchmark_thresholds.json"
+RESULTS_DIR = PROJECT_ROOT / "output" / "benchmarks"
+CATEGORY = "bench"
+# Baseline = measured value x (1 + headroom): timings are noisier than memory
+TIME_HEADROOM = 0.5
+MEMORY_HEADROOM = 0.25
+# Absolute slack on top, so sub-second cases do not flag scheduler noise
+MIN_SLACK_S = 0.5
+# Modules of this repository: failing to import one of them is a crash, not a missing optional dependency
+PROJECT_MODULES = ("patent_crew", "setup_data", "compile_result")
+
+
+def make_corpus(root: Path, num_patents: int, record_kb: int) -> None:
+    """
+    Writes data/bench/bench.jsonl, one pdf_and_image/{publication_number}/ directory per patent, and one
+    output/bench/{batch_idx}/{publication_number}_output_short.json per patent for the compile case.
+    """
+    artifacts_dir = root / "data" / CATEGORY / "pdf_and_image"
+    artifacts_dir.mkdir(parents=True)
+    filler = "lorem ipsum dolor sit amet " * (record_kb * 1024 // 27)
+    with open(root / "data" / CATEGORY / f"{CATEGORY}.jsonl", "w", encoding="utf-8") as f:
+        for i in range(num_patents):
+            publication_number = f"US-{i:08d}-B2"
+            record = {"publication_number": publication_number, "title": f"Patent {i}", "abstract": filler[:1000],
+                      "description": filler, "image_paths": [f"{publication_number}/1.png"]}
+            f.write(json.dumps(record) + "\n")
+            patent_dir = artifacts_dir / publication_number
+            patent_dir.mkdir()
+            (patent_dir / f"{publication_number}.pdf").write_bytes(b"%PDF-1.4 bench")
+            (patent_dir / "1.png").write_bytes(b"png")
+
+            output_dir = root / "output" / CATEGORY / str(i // 5)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            entry = {"publication_number": publication_number, "title": f"Product {i}",
+                     "product_description": "d" * 250, "implementation": "i" * 250, "differentiation": "x" * 250}
+            (output_dir / f"{publication_number}_output_short.json").write_text(json.dumps(entry), encoding="utf-8")
+
+
+def _percentile_ms(latencies_s: list, q: float) -> float:
+    if not latencies_s:
+        return 0.0
+    ordered = sorted(latencies_s)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))] * 1000, 2)
+
+
+def _timed_calls(fn, items) -> tuple:
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def make_rewrite_sources(root: Path, count: int) -> list:
+    """
+    Writes rewrite/{batch_idx}/{publication_number}_output.json files with over-limit fields, outside output/ so
+    the compile case never sees their short versions. Even files can be shortened locally (a sentence trim),
+    odd ones have a field without any boundary, left for the crew.
+    """
+    paths = []
+    for i in range(count):
+        publication_number = f"US-{i:08d}-B2"
+        output_dir = root / "rewrite" / str(i // 5)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        implementation = "x" * 400 if i % 2 else ("Implementation detail " * 10).strip() + ". " + "More context. " * 10
+        entry = {"publication_number": publication_number, "title": f"Product {i}", "product_description": "d" * 250,
+                 "implementation": implementation, "differentiation": "x" * 250}
+        path = output_dir / f"{publication_number}_output.json"
+        path.write_text(json.dumps(entry, indent=2), encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def _patent_inputs(root: Path) -> list:
+    from patent_crew.patent_index import get_patent_metadadata
+    return get_patent_metadadata(CATEGORY, str(root / "knowledge"))
+
+
+def run_case(case: str, root: Path, crew_patents: int) -> dict:
+    """Runs one case in this process and returns its measurements."""
+    os.chdir(root)  # The crews write their output_file relative to the working directory
+    for key in ("LINKUP_API_KEY", "SERPER_API_KEY", "OPENAI_API_KEY", "GEMINI_API_KEY", "GOOGLE_API_KEY"):
+        os.environ.setdefault(key, "replay")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")  # No crewAI telemetry export (and its retries) from the cases
+    latencies: list = []
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    start = time.perf_counter()
+
+    if case == "setup_sync":
+        import setup_data
+        with quiet:
+            summary = setup_data.synchronize_patent_knowledge_base(
+                root / "data" / CATEGORY / f"{CATEGORY}.jsonl",
+                root / "data" / CATEGORY / "pdf_and_image",
+                root / "knowledge" / CATEGORY / "pdf_and_image",
+                category=CATEGORY,
+            )
+        items = (summary or {}).get("patents_indexed", 0)
+
+    elif case == "metadata":
+        items = len(_patent_inputs(root))
+
+    elif case == "json_loader":
+        from patent_crew.tools.custom_tool import PatentJsonLoaderTool
+        inputs = _patent_inputs(root)
+        tool = PatentJsonLoaderTool(knowledge_base_root=str(root / "knowledge"))
+        start = time.perf_counter()
+        with quiet:
+            latencies = _timed_calls(lambda p: tool._run(json_file_path=p["json_file_path"]), inputs)
+        items = len(inputs)
+
+    elif case == "pdf_loader":
+        from patent_crew.replay import configure_replay
+        from patent_crew.tools.custom_tool import PatentGeminiPdfLoaderTool
+        configure_replay("replay", root / "fixtures", on_miss="synthetic")
+        inputs = _patent_inputs(root)
+        tool = PatentGeminiPdfLoaderTool(knowledge_base_root=str(root / "knowledge"))
+        start = time.perf_counter()
+        latencies = _timed_calls(lambda p: tool._run(pdf_file_path=p["pdf_file_path"]), inputs)
+        items = len(inputs)
+
+    elif case == "crew":
+        from patent_crew.crew import PatentAnalysisCrew
+        from patent_crew.dag_scheduler import run_crew_dag
+        from patent_crew.replay import configure_replay
+        configure_replay("replay", root / "fixtures", on_miss="synthetic")
+        inputs = _patent_inputs(root)[:crew_patents]
+        crew = PatentAnalysisCrew().crew()
+        start = time.perf_counter()
+        with quiet:
+            latencies = _timed_calls(lambda p: run_crew_dag(crew.copy(), inputs={**p, "batch_idx": "bench"}), inputs)
+        items = len(inputs)
+
+    elif case == "rewrite":
+        import asyncio
+        from patent_crew.crew_rewrite import rewrite_files
+        from patent_crew.replay import configure_replay
+        configure_replay("replay", root / "fixtures", on_miss="synthetic")
+        files = make_rewrite_sources(root, crew_patents)
+        start = time.perf_counter()
+        with quiet:
+            summary = asyncio.run(rewrite_files(files))
+        if summary["failed"]:
+            raise RuntimeError(f"{summary['failed']} of {len(files)} rewrites failed")
+        items = summary["completed"]
+
+    elif case == "compile":
+        import compile_result
+        compile_result.CATEGORY = CATEGORY
+        compile_result.INPUT_JSONL_FILE = root / "knowledge" / CATEGORY / f"{CATEGORY}.jsonl"
+        compile_result.OUTPUT_DIR = root / "output" / CATEGORY
+        compile_result.OUTPUT_JSONL_FILE = root / "output" / CATEGORY / f"{CATEGORY}_output.jsonl"
+        with quiet:
+            compile_result.main()
+        items = sum(1 for _ in open(compile_result.OUTPUT_JSONL_FILE))
+
+    else:
+        raise ValueError(f"Unknown case '{case}'")
+
+    duration = time.perf_counter() - start
+    return {
+        "items": items,
+        "duration_s": round(duration, 3),
+        "items_per_s": round(items / duration, 1) if duration > 0 else 0.0,
+        "latency_p50_ms": _percentile_ms(latencies, 50),
+        "latency_p95_ms": _percentile_ms(latencies, 95),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def check_thresholds(results: dict, thresholds: dict) -> list:
+    """Returns the regressions: measured values above their max_* threshold."""
+    regressions = []
+    for case, by_size in results.items():
+        for size, measured in by_size.items():
+            limits = thresholds.get(case, {}).get(size, {})
+            for metric in ("duration_s", "peak_rss_mb", "latency_p95_ms"):
+                limit = limits.get(f"max_{metric}")
+                if limit is not None and measured.get(metric) is not None and measured[metric] > limit:
+                    regressions.append(f"{case} @ {size}: {metric} {measured[metric]} > {limit}")
+    return regressions
+
+
+def make_thresholds(results: dict, previous: dict) -> dict:
+    thresholds = {case: dict(by_size) for case, by_size in previous.items()}
+    for case, by_size in results.items():
+        for size, measured in by_size.items():
+            limits = {
+                "max_duration_s": round(measured["duration_s"] * (1 + TIME_HEADROOM) + MIN_SLACK_S, 3),
+                "max_peak_rss_mb": round(measured["peak_rss_mb"] * (1 + MEMORY_HEADROOM), 1),
+            }
+            if measured["latency_p95_ms"]:
+                limits["max_latency_p95_ms"] = round(measured["latency_p95_ms"] * (1 + TIME_HEADROOM) + MIN_SLACK_S * 1000 / 10, 2)
+            thresholds.setdefault(case, {})[size] = limits
+    return thresholds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--record-kb", type=int, default=10, help="Approximate size of one patent record")
+    parser.add_argument("--crew-patents", type=int, default=20, help="Cap on patents for the crew and rewrite cases")
+    parser.add_argument("--update-baseline", action="store_true", help=f"Rewrite {THRESHOLDS_PATH.name} from this run")
+    parser.add_argument("--case", choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        try:
+            measured = run_case(args.case, Path(args.root), args.crew_patents)
+        except ModuleNotFoundError as e:
+            if (e.name or "").split(".")[0] in PROJECT_MODULES:
+                raise
+            measured = {"skipped": f"missing dependency '{e.name}'"}
+        print(json.dumps(measured))
+        return
+
+    results: dict = {}
+    skipped = []
+    failed = []
+    # Run in CASES order; setup_sync also runs, unrecorded, when a selected case needs the store it writes
+    needs_setup = any(case in NEEDS_KNOWLEDGE for case in args.cases)
+    cases = [case for case in CASES if case in args.cases or (case == "setup_sync" and needs_setup)]
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_corpus(root, size, args.record_kb)
+            for case in cases:
+                process = subprocess.run(
+                    [sys.executable, __file__, "--case", case, "--root", str(root), "--crew-patents", str(args.crew_patents)],
+                    capture_output=True, text=True,
+                )
+                if process.returncode != 0:
+                    reason = (process.stderr.strip().splitlines() or ["unknown error"])[-1]
+                    failed.append(f"{case} @ {size}: {reason}")
+                    print(f"{case:12} {size:>6}  FAILED ({reason})")
+                    continue
+                measured = json.loads(process.stdout.strip().splitlines()[-1])
+                if "skipped" in measured:
+                    skipped.append(f"{case} @ {size}: {measured['skipped']}")
+                    print(f"{case:12} {size:>6}  skipped ({measured['skipped']})")
+                    continue
+                if case not in args.cases:
+                    continue
+                results.setdefault(case, {})[str(size)] = measured
+                print(f"{case:12} {size:>6}  {measured['items']:>6} items  {measured['duration_s']:>8.2f}s  "
+                      f"{measured['items_per_s']:>9.1f}/s  p50 {measured['latency_p50_ms']:>7.2f}ms  "
+                      f"p95 {measured['latency_p95_ms']:>7.2f}ms  peak {measured['peak_rss_mb']:>7.1f} MB")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    results_path = RESULTS_DIR / f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    results_path.write_text(json.dumps({"results": results, "skipped": skipped, "failed": failed}, indent=2), encoding="utf-8")
+    print(f"\nResults written to {results_path}")
+    if failed:
+        print("\nFailed cases:")
+        for failure in failed:
+            print(f"- {failure}")
+        sys.exit(1)
+
+    thresholds = json.loads(THRESHOLDS_PATH.read_text(encoding="utf-8")) if THRESHOLDS_PATH.exists() else {}
+    if args.update_baseline:
+        THRESHOLDS_PATH.write_text(json.dumps(make_thresholds(results, thresholds), indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline updated: {THRESHOLDS_PATH}")
+        return
+
+    regressions = check_thresholds(results, thresholds)
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"- {regression}")
+        sys.exit(1)
+    print("No regression against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test case for the output validation of compile_result.py.
+Entries with non-string fields and files that disappear between the scan and the read must be skipped
+as invalid, without aborting the compile.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(PROJECT_ROOT / "src")]
+
+from compile_result import compile_outputs, read_output_file, validate_entry
+
+ENTRY = {
+    "publication_number": "US-1-B2",
+    "title": "NameGuard: AI-Powered Access Control",
+    "product_description": "NameGuard helps IT admins block unauthorized access.",
+    "implementation": "A name screening API in login flows.",
+    "differentiation": "Detects altered name matches.",
+}
+
+
+def test_non_string_fields_are_invalid():
+    print("\n=== Test: Non-string fields ===")
+    assert validate_entry(ENTRY)
+    assert not validate_entry({**ENTRY, "title": None})
+    assert not validate_entry({**ENTRY, "publication_number": 1})
+    assert not validate_entry([ENTRY])
+    print("✓ Null, numeric and non-object entries rejected")
+
+
+def test_compile_skips_unreadable_and_invalid_files():
+    print("\n=== Test: Compile with invalid and deleted files ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp) / "output" / "bench"
+        (output_dir / "0").mkdir(parents=True)
+        for number, entry in (("US-1-B2", ENTRY), ("US-2-B2", {**ENTRY, "publication_number": "US-2-B2", "title": None})):
+            with open(output_dir / "0" / f"{number}_output_short.json", "w") as f:
+                json.dump(entry, f)
+
+        missing = output_dir / "0" / "US-3-B2_output_short.json"
+        record, entry = read_output_file(missing)
+        assert entry is None and record["publication_number"] is None
+
+        output_jsonl_file = output_dir / "bench_output.jsonl"
+        summary = compile_outputs(output_dir, output_jsonl_file)
+        assert summary["publication_numbers"] == {"US-1-B2"}
+        assert summary["invalid_files"] == 1
+        with open(output_jsonl_file) as f:
+            assert [json.loads(line) for line in f] == [ENTRY]
+    print("✓ Invalid file skipped, deleted file reported as invalid")
+
+
+if __name__ == "__main__":
+    test_non_string_fields_are_invalid()
+    test_compile_skips_unreadable_and_invalid_files()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test case for rewrite_file (src/patent_crew/crew_rewrite.py) with a fake crew.
+A field still over its limit after the LLM rewrite, or left out by the crew, must fail the file
+instead of being saved.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+from patent_crew.crew_rewrite import get_short_output_path, rewrite_file
+
+ENTRY = {
+    "publication_number": "US-1-B2",
+    "title": "NameGuard",
+    "product_description": "Short enough.",
+    "implementation": "X" * 400,  # No boundary: the pre-shortener leaves it for the LLM
+    "differentiation": "Y" * 400,
+}
+
+
+class _FakeCrew:
+    def __init__(self, answer: dict):
+        self.answer = answer
+
+    def copy(self) -> "_FakeCrew":
+        return self
+
+    async def kickoff_async(self, inputs: dict) -> SimpleNamespace:
+        return SimpleNamespace(raw=json.dumps(self.answer))
+
+
+def _rewrite(answer: dict) -> str:
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = os.path.join(tmp, "US-1-B2_output.json")
+        with open(json_file, "w") as f:
+            json.dump(ENTRY, f)
+        try:
+            asyncio.run(rewrite_file(_FakeCrew(answer), json_file))
+        except ValueError as e:
+            assert not os.path.exists(get_short_output_path(json_file))
+            return str(e)
+        with open(get_short_output_path(json_file)) as f:
+            return json.load(f)
+
+
+def test_fields_over_limit_after_rewrite_fail():
+    print("\n=== Test: Fields over their limit after the rewrite ===")
+    saved = _rewrite({"implementation": "Short implementation.", "differentiation": "Short differentiation."})
+    assert saved["implementation"] == "Short implementation." and saved["title"] == "NameGuard"
+
+    message = _rewrite({"implementation": "Short implementation."})  # differentiation left out
+    assert "differentiation" in message and "implementation" not in message
+
+    message = _rewrite({"implementation": "Z" * 400, "differentiation": "Short differentiation."})
+    assert "implementation" in message
+    print("✓ Fields left out or still too long reported, nothing saved")
+
+
+if __name__ == "__main__":
+    test_fields_over_limit_after_rewrite_fail()
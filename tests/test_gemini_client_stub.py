@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test case for the shared Gemini client used by PatentGeminiPdfLoaderTool.
+A local stub HTTP server stands in for the Gemini endpoint (via GEMINI_BASE_URL),
+and several tool instances call it from worker threads.
+The test checks that a single client is created and every call reaches the stub.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from patent_crew.tools import gemini_client
+from patent_crew.tools.custom_tool import PatentGeminiPdfLoaderTool
+
+STUB_RESPONSE = {
+    "candidates": [
+        {
+            "content": {"role": "model", "parts": [{"text": "PATENT CONTEXT: stub extraction"}]},
+            "finishReason": "STOP",
+        }
+    ]
+}
+
+
+class _StubGeminiHandler(BaseHTTPRequestHandler):
+    request_count = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with _StubGeminiHandler.lock:
+            _StubGeminiHandler.request_count += 1
+        body = json.dumps(STUB_RESPONSE).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_shared_gemini_client_with_stub_server():
+    """
+    Runs the PDF loader tool from several threads against the stub server.
+    """
+    print("\n=== Test: Shared Gemini client against a local stub server ===")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubGeminiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("GOOGLE_API_KEY", "stub-key")
+    gemini_client.reset_gemini_client()
+
+    knowledge_root = tempfile.mkdtemp()
+    num_patents = 8
+    for i in range(num_patents):
+        patent_dir = os.path.join(knowledge_root, "nlp", "pdf_and_image", f"US-{i}")
+        os.makedirs(patent_dir)
+        with open(os.path.join(patent_dir, f"US-{i}.pdf"), "wb") as f:
+            f.write(f"%PDF-1.4 stub {i}".encode("utf-8"))
+
+    def run_tool(i):
+        tool = PatentGeminiPdfLoaderTool(knowledge_base_root=knowledge_root, use_cache=False)
+        return tool._run(f"nlp/pdf_and_image/US-{i}/US-{i}.pdf")
+
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(run_tool, range(num_patents)))
+
+        assert all(r == "PATENT CONTEXT: stub extraction" for r in results), results
+        assert _StubGeminiHandler.request_count == num_patents
+        assert gemini_client.get_gemini_client() is gemini_client.get_gemini_client()
+        print(f"✓ {num_patents} calls served by one shared client")
+    finally:
+        server.shutdown()
+        gemini_client.reset_gemini_client()
+        del os.environ["GEMINI_BASE_URL"]
+
+
+if __name__ == "__main__":
+    test_shared_gemini_client_with_stub_server()
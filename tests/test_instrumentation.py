@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test case for the per-task instrumentation (src/patent_crew/instrumentation.py).
+Simulated tasks of two patents run concurrently in threads, each making LLM and tool calls inside its
+task span. The records must be attributed to the right task and the summary must aggregate them.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from patent_crew.instrumentation import (
+    instrumented_tool_call,
+    load_records,
+    record_llm_call,
+    summarize,
+    task_span,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class _FakeSearchTool:
+    name = "Linkup Search Tool"
+
+    @instrumented_tool_call
+    def _run(self, query: str) -> str:
+        time.sleep(0.05)
+        return f"results for {query}"
+
+
+def test_task_spans_and_summary():
+    """
+    Two patents x three tasks in parallel, then the summary and the CLI.
+    """
+    print("\n=== Test: Per-task instrumentation ===")
+    tool = _FakeSearchTool()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "instrumentation.jsonl")
+
+        def run_task(args):
+            publication_number, task_name, llm_calls = args
+            ready_at = time.time()
+            time.sleep(0.02)  # Queue wait
+            with task_span(path, publication_number, task_name, "Analyst", ready_at) as span:
+                for _ in range(llm_calls):
+                    record_llm_call("gpt-4o-mini", prompt_tokens=1000, completion_tokens=200, duration_s=0.1)
+                tool._run(query=task_name)
+                span.guardrail_retries = 1 if task_name == "final_product_selection_task" else 0
+
+        work = [
+            (publication_number, task_name, llm_calls)
+            for publication_number in ("US-1-B2", "US-2-B2")
+            for task_name, llm_calls in (("document_analysis_task", 1), ("market_opportunity_analysis_task", 3), ("final_product_selection_task", 2))
+        ]
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(run_task, work))
+
+        # Calls outside a span are not attributed anywhere
+        record_llm_call("gpt-4o-mini", 5, 5, 0.1)
+
+        records = load_records(path)
+        assert len(records) == 6
+        market = [r for r in records if r["task"] == "market_opportunity_analysis_task"]
+        assert all(r["llm_calls"] == 3 and r["prompt_tokens"] == 3000 and r["tool_calls"] == 1 for r in market)
+        assert all(r["queue_wait_s"] >= 0.02 and r["tool_time_s"] >= 0.05 for r in records)
+
+        summary = summarize(records)
+        assert summary["tasks"]["final_product_selection_task"]["runs"] == 2
+        # 6 LLM calls per patent: 6 x (1000 x 0.15 + 200 x 0.60) / 1e6 USD
+        assert abs(summary["patents"]["US-1-B2"]["cost_usd"] - 6 * 270 / 1e6) < 1e-6
+
+        cli = subprocess.run(
+            [sys.executable, "-m", "patent_crew.instrumentation", path],
+            capture_output=True, text=True, env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT / "src")},
+        )
+        assert cli.returncode == 0, cli.stderr
+        assert "market_opportunity_analysis_task" in cli.stdout and "cost per patent" in cli.stdout
+        print(cli.stdout)
+    print("✓ Records attributed per task and summarized")
+
+
+if __name__ == "__main__":
+    test_task_spans_and_summary()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test case for the schema-aware guardrails (src/patent_crew/output_guardrails.py).
+Trivially broken JSON (fences, surrounding text, trailing commas, a wrong total_score) must be repaired
+locally; structurally wrong output must fail with a message naming the problem.
+"""
+
+import json
+from types import SimpleNamespace
+
+from patent_crew.output_guardrails import (
+    ensure_concept_json,
+    ensure_evaluation_json,
+    ensure_final_product_json,
+)
+
+CONCEPT = {
+    "publication_number": "US-1-B2",
+    "title": "NameGuard: AI-Powered Access Control",
+    "product_description": "NameGuard helps IT admins block unauthorized access.",
+    "implementation": "A name screening API in login flows.",
+    "differentiation": "Detects altered name matches.",
+}
+
+
+def _output(raw: str) -> SimpleNamespace:
+    return SimpleNamespace(raw=raw)
+
+
+def test_valid_output_is_kept():
+    print("\n=== Test: Valid output kept as is ===")
+    raw = json.dumps(CONCEPT)
+    assert ensure_concept_json(_output(raw)) == (True, raw)
+    assert ensure_final_product_json(_output(raw)) == (True, raw)
+    # The concept tasks of tasks_mc.yaml ask for a product_title
+    product_title_raw = json.dumps({**{k: v for k, v in CONCEPT.items() if k != "title"}, "product_title": CONCEPT["title"]})
+    assert ensure_concept_json(_output(product_title_raw)) == (True, product_title_raw)
+    print("✓ Raw output unchanged")
+
+
+def test_local_repairs():
+    print("\n=== Test: Local repairs ===")
+    fenced = "Here is the product:\n```json\n" + json.dumps(CONCEPT, indent=2)[:-2] + ",\n}\n```"
+    ok, repaired = ensure_final_product_json(_output(fenced))
+    assert ok and json.loads(repaired) == CONCEPT
+
+    evaluation = {"product_2": {
+        "product_2_full_json": {"concept_source": "serial_entrepreneur", **CONCEPT},
+        "scores_2": {"technical_validity": 5, "innovativeness": "4", "specificity": 3, "need_validity": 4,
+                     "market_size": 3, "competitive_advantage": 4, "total_score": 30},
+    }}
+    ok, repaired = ensure_evaluation_json("product_evaluation_entrepreneur_task")(_output(json.dumps(evaluation)))
+    scores = json.loads(repaired)["product_2"]["scores_2"]
+    assert ok and scores["innovativeness"] == 4 and scores["total_score"] == 23
+    print("✓ Fences, trailing commas and total_score repaired without a retry")
+
+
+def test_structural_errors_fail_fast():
+    print("\n=== Test: Structural errors ===")
+    ok, message = ensure_final_product_json(_output(json.dumps({**CONCEPT, "implementation": ""})))
+    assert not ok and "'implementation'" in message
+
+    ok, message = ensure_evaluation_json("product_evaluation_pm_task")(_output(json.dumps({"product_1": {"scores_1": {}}})))
+    assert not ok and "'product_1_full_json'" in message
+
+    evaluation = {"product_3": {"product_3_full_json": CONCEPT, "scores_3": {"technical_validity": 7}}}
+    ok, message = ensure_evaluation_json("product_evaluation_research_task")(_output(json.dumps(evaluation)))
+    assert not ok and "scores_3.technical_validity" in message
+
+    ok, message = ensure_concept_json(_output("I could not produce a concept."))
+    assert not ok and "not valid JSON" in message
+    print("✓ First problem reported")
+
+
+if __name__ == "__main__":
+    test_valid_output_is_kept()
+    test_local_repairs()
+    test_structural_errors_fail_fast()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Test case for the packed patent store (src/patent_crew/patent_store.py).
+A rewritten store must be reopened, and a pack paired with the index of another version must be refused.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from patent_crew.patent_store import PatentStoreWriter, open_patent_store
+
+
+def test_rewritten_store_is_reopened():
+    print("\n=== Test: Store rewrite ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        pack_path = Path(tmp) / "nlp" / "nlp.pack"
+        with PatentStoreWriter(pack_path) as writer:
+            writer.add("US-1-B2", {"title": "first"})
+        store = open_patent_store(pack_path)
+        assert store.get("US-1-B2") == {"title": "first"} and open_patent_store(pack_path) is store
+        old_index = pack_path.with_name("nlp.pack.idx").read_bytes()
+
+        time.sleep(0.01)
+        with PatentStoreWriter(pack_path) as writer:
+            writer.add("US-1-B2", {"title": "second"})
+            writer.add("US-2-B2", {"title": "other"})
+        assert open_patent_store(pack_path).get("US-1-B2") == {"title": "second"}
+
+        # New pack, index of the previous version: what a reader sees between the two renames
+        pack_path.with_name("nlp.pack.idx").write_bytes(old_index)
+        assert open_patent_store(pack_path) is None
+    print("✓ Rewritten store reopened, mismatched pack and index refused")
+
+
+if __name__ == "__main__":
+    test_rewritten_store_is_reopened()
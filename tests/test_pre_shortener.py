@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test case for the deterministic pre-shortener (src/patent_crew/pre_shortener.py).
+Over-long fields must be brought within the compile_result limits by phrase replacement, acronym
+collapsing and boundary trims, and fields that cannot be trimmed safely must be left for the LLM.
+"""
+
+from patent_crew.pre_shortener import (
+    FIELD_LIMITS,
+    collapse_acronyms,
+    drop_filler,
+    pre_shorten_entry,
+    replace_phrases,
+    trim_at_boundary,
+)
+
+
+def test_phrase_and_acronym_rules():
+    print("\n=== Test: Phrase and acronym rules ===")
+    assert replace_phrases("Leveraging a wide range of sensors in order to  detect faults.") == "Using many sensors to detect faults."
+    assert replace_phrases("The system utilizes cameras.") == "The system uses cameras."
+    assert drop_filler("It seamlessly detects faults with a truly innovative sensor.") == "It detects faults with a sensor."
+    assert drop_filler("An innovative approach and a cutting-edge engine") == "An approach and an engine"
+    assert collapse_acronyms("into Structured Query Language (SQL) commands") == "into SQL commands"
+    assert collapse_acronyms("a Long Short-Term Memory (LSTM) model") == "an LSTM model"
+    # Words that do not spell the acronym are kept
+    assert collapse_acronyms("monitors overprovisioning (excess capacity) with data tables (SQL)") == "monitors overprovisioning (excess capacity) with data tables (SQL)"
+    print("✓ Phrases replaced, filler dropped and acronyms collapsed")
+
+
+def test_names_and_meaningful_words_kept():
+    print("\n=== Test: Capitalized names and meaningful words ===")
+    for text in ("Advanced Driver Assistance Systems (ADAS) warn drivers.",
+                 "Keys use the Advanced Encryption Standard (AES).",
+                 "Each tag holds a unique identifier.",
+                 "A highly available cluster serves requests.",
+                 "Innovative Materials Inc. supplies a cutting-edge AI chip.",  # Capitalized, and next to an acronym
+                 "It offers an innovative user portal."):  # "a"/"an" before "user" is not decided by its first letter
+        assert drop_filler(replace_phrases(text)) == text, text
+    print("✓ Names, acronym neighbours and meaning-carrying words unchanged")
+
+
+def test_trim_at_boundary():
+    print("\n=== Test: Sentence and clause trims ===")
+    first = "A" * 150 + " does one thing."
+    text = f"{first} It also does another thing for many users, improving their workflow considerably in daily use."
+    trimmed = trim_at_boundary(text, 220)
+    assert trimmed == f"{first} It also does another thing for many users."
+    # A trim that would keep less than MIN_KEEP_RATIO of the limit is refused
+    assert trim_at_boundary("Short. " + "B" * 300, 300) == "Short. " + "B" * 300
+    print("✓ Cut at the boundary keeping the most text")
+
+
+def test_pre_shorten_entry():
+    print("\n=== Test: Entry pre-shortening ===")
+    description = ("Navigator lets analysts query databases in plain English, converting questions into Structured Query Language (SQL) "
+                   "and Not Only SQL (NoSQL) commands. It serves a wide range of managers and analysts in finance, healthcare and retail, "
+                   "delivering insights seamlessly while reducing dependence on data teams.")
+    entry = {
+        "publication_number": "US-1-B2",
+        "title": "Navigator",
+        "product_description": description,
+        "implementation": "X" * 400,  # No boundary: left for the LLM
+        "differentiation": "Short enough.",
+    }
+    shortened, remaining = pre_shorten_entry(entry)
+    assert len(description) > 300 and len(shortened["product_description"]) <= FIELD_LIMITS["product_description"]
+    # Phrase replacement is enough here, so nothing is trimmed
+    assert shortened["product_description"].endswith("while reducing dependence on data teams.")
+    assert remaining == ["implementation"]
+    assert entry["product_description"] == description  # Input not modified
+    print(f"✓ {len(description)} -> {len(shortened['product_description'])} characters, {remaining} left for the LLM")
+
+
+if __name__ == "__main__":
+    test_phrase_and_acronym_rules()
+    test_names_and_meaningful_words_kept()
+    test_trim_at_boundary()
+    test_pre_shorten_entry()
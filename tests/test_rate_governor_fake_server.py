@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test case for the adaptive rate governor (src/patent_crew/rate_governor.py).
+A local fake LLM server accepts SERVER_RPS requests per second and answers the rest with
+429 + retry-after-ms. The governor is configured with a quota far above that, so it must
+learn the real ceiling from the 429s (AIMD) and still complete every request.
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from patent_crew.rate_governor import ModelGovernor, governed_call
+
+SERVER_RPS = 20
+NUM_REQUESTS = 120
+
+
+class _FakeLLMHandler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    window_start = time.monotonic()
+    window_count = 0
+    served = 0
+    rejected = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        cls = _FakeLLMHandler
+        with cls.lock:
+            now = time.monotonic()
+            if now - cls.window_start >= 1.0:
+                cls.window_start, cls.window_count = now, 0
+            allowed = cls.window_count < SERVER_RPS
+            if allowed:
+                cls.window_count += 1
+                cls.served += 1
+            else:
+                cls.rejected += 1
+                retry_after_ms = int((1.0 - (now - cls.window_start)) * 1000)
+
+        if allowed:
+            body = json.dumps({"choices": [{"message": {"content": "ok"}}]}).encode("utf-8")
+            self.send_response(200)
+        else:
+            body = json.dumps({"error": {"message": "Rate limit exceeded"}}).encode("utf-8")
+            self.send_response(429)
+            self.send_header("retry-after-ms", str(retry_after_ms))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_governor_against_fake_server():
+    """
+    Sends NUM_REQUESTS chat requests from 8 threads through one governor.
+    """
+    print("\n=== Test: Rate governor against a fake LLM server injecting 429s ===")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+
+    # Configured quota: 100 req/s, 5x what the server really allows
+    governor = ModelGovernor("fake-model", rpm=6000, tpm=10_000_000)
+
+    def send(i):
+        request = urllib.request.Request(url, data=json.dumps({"messages": [{"role": "user", "content": f"hi {i}"}]}).encode("utf-8"), method="POST")
+        return governed_call(governor, lambda: json.load(urllib.request.urlopen(request)), estimated_tokens=10, max_retries=20)
+
+    try:
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(send, range(NUM_REQUESTS)))
+        duration = time.monotonic() - start_time
+
+        assert all(r["choices"][0]["message"]["content"] == "ok" for r in results)
+        assert _FakeLLMHandler.served == NUM_REQUESTS
+        achieved_rps = NUM_REQUESTS / duration
+        print(f"✓ {NUM_REQUESTS} requests in {duration:.1f}s ({achieved_rps:.1f} req/s, server ceiling {SERVER_RPS}), "
+              f"{_FakeLLMHandler.rejected} x 429, final rate factor {governor.factor:.2f}")
+        assert _FakeLLMHandler.rejected < NUM_REQUESTS
+        assert achieved_rps > SERVER_RPS * 0.5
+    finally:
+        server.shutdown()
+
+
+def test_request_above_one_second_of_quota():
+    """
+    A request estimated above the bucket capacity (one second of tokens/min quota) must still be charged
+    in full: the next request waits until the excess is refilled.
+    """
+    print("\n=== Test: Request bigger than one second of token quota ===")
+    # 100k tokens/s, so the tokens bucket holds 100k tokens
+    governor = ModelGovernor("big-request-model", rpm=60_000, tpm=6_000_000)
+    assert governor.tokens.capacity == 100_000
+
+    start_time = time.monotonic()
+    governor.acquire(140_000)  # Full bucket: goes now, leaves a 40k token debt
+    first_wait = time.monotonic() - start_time
+    governor.acquire(10)
+    second_wait = time.monotonic() - start_time - first_wait
+
+    print(f"✓ First request waited {first_wait:.2f}s, the next one {second_wait:.2f}s")
+    assert first_wait < 0.1
+    assert second_wait >= 0.35  # 40k token debt at 100k tokens/s
+
+
+if __name__ == "__main__":
+    test_governor_against_fake_server()
+    test_request_above_one_second_of_quota()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test case for the record/replay backend (src/patent_crew/replay.py).
+A fake network tool is called once in record mode, then replayed offline with a synthetic latency.
+Replay misses either raise or fall back to a synthetic answer.
+"""
+
+import asyncio
+import json
+import tempfile
+import time
+
+import pytest
+
+from patent_crew.replay import ReplayMissError, configure_replay, replayable_tool_call, synthetic_llm_response
+
+
+class _FakeNetworkTool:
+    name = "Fake Search"
+
+    def __init__(self):
+        self.calls = 0
+
+    @replayable_tool_call
+    def _run(self, query: str) -> dict:
+        self.calls += 1
+        time.sleep(0.05)
+        return {"success": True, "results": [{"content": f"live result for {query}"}]}
+
+    @replayable_tool_call
+    async def _arun(self, query: str) -> dict:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"success": True, "results": [{"content": f"live result for {query}"}]}
+
+
+def test_record_then_replay():
+    print("\n=== Test: Record/replay backend ===")
+    tool = _FakeNetworkTool()
+    with tempfile.TemporaryDirectory() as fixture_dir:
+        backend = configure_replay("record", fixture_dir)
+        live = tool._run(query="polymer market size")
+        live_async = asyncio.run(tool._arun(query="polymer market size"))
+        assert tool.calls == 2 and backend.stats["recorded"] == 2
+
+        backend = configure_replay("replay", fixture_dir, latency=0.1)
+        start = time.monotonic()
+        assert tool._run(query="polymer market size") == live
+        assert time.monotonic() - start >= 0.1
+        assert asyncio.run(tool._arun(query="polymer market size")) == live_async
+        assert tool.calls == 2 and backend.stats["replayed"] == 2
+
+        backend = configure_replay("replay", fixture_dir, latency="recorded")
+        start = time.monotonic()
+        tool._run(query="polymer market size")
+        assert time.monotonic() - start >= 0.05
+
+        with pytest.raises(ReplayMissError):
+            tool._run(query="unrecorded query")
+
+        backend = configure_replay("replay", fixture_dir, on_miss="synthetic")
+        assert tool._run(query="unrecorded query").startswith("Synthetic Fake Search result")
+        assert tool.calls == 2 and backend.stats["synthetic"] == 1
+
+    configure_replay("off")
+    print("✓ Recorded once, replayed offline")
+
+
+def test_synthetic_llm_response():
+    response = synthetic_llm_response([{"role": "user", "content": "Evaluate the concept for patent US-11423042-B2."}])
+    assert response.startswith("Thought:")
+    answer = json.loads(response.split("Final Answer:", 1)[1])
+    assert answer["publication_number"] == "US-11423042-B2"
+    assert all(len(answer[field]) <= 100 for field in ("title", "product_description", "implementation", "differentiation"))
+
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    test_synthetic_llm_response()
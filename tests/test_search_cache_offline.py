@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test case for the search cache (src/patent_crew/tools/search_cache.py), fully offline.
+A recorded-response tool replays tests/fixtures/recorded_search_responses.json in place of
+LinkupSearchTool. Several agents issue the same or near-identical queries; only the first one
+may reach the underlying tool, and the hit rates are reported per agent.
+Concurrent identical searches from several crew copies must share one call to the tool.
+"""
+
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from patent_crew.tools.search_cache import CachedSearchTool, get_search_cache_stats, normalize_query, reset_search_cache_stats
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "recorded_search_responses.json"
+
+
+class _RecordedSearchInput(BaseModel):
+    query: str = Field(..., description="The search query.")
+    depth: str = Field(default="standard", description="Search depth.")
+
+
+class RecordedSearchTool(BaseTool):
+    """Replays recorded search responses, keyed by normalized query, and counts the calls that reach it."""
+
+    name: str = "Linkup Search Tool"
+    description: str = "Recorded Linkup responses for offline tests."
+    args_schema: Type[BaseModel] = _RecordedSearchInput
+    calls: int = 0
+    latency_s: float = 0.0
+
+    def _run(self, query: str, depth: str = "standard") -> Any:
+        self.calls += 1
+        time.sleep(self.latency_s)
+        with open(FIXTURE_PATH, "r", encoding="utf-8") as f:
+            recorded = {normalize_query(q): response for q, response in json.load(f).items()}
+        return recorded.get(normalize_query(query), {"success": False, "error": f"No recording for '{query}'"})
+
+
+def test_search_cache_offline():
+    """
+    Three agents share one recorded tool through the cache.
+    """
+    print("\n=== Test: Search cache against recorded responses ===")
+    reset_search_cache_stats()
+    recorded_tool = RecordedSearchTool()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tools = {
+            label: CachedSearchTool.wrap(recorded_tool, agent_label=label, cache_dir=cache_dir)
+            for label in ("market_research_analyst", "product_research_analyst", "product_evaluator_1")
+        }
+
+        first = tools["market_research_analyst"].run(query="market size conversational AI social robots")
+        assert first["success"] and len(first["results"]) == 2
+        assert recorded_tool.calls == 1
+
+        # Same search, different casing, punctuation and word order: served from the cache
+        again = tools["product_evaluator_1"].run(query="Market size: social robots & conversational AI")
+        assert again == first
+        assert recorded_tool.calls == 1
+
+        tools["product_research_analyst"].run(query="user pain points elderly care companion robots")
+        tools["product_research_analyst"].run(query="User pain points for elderly-care companion robots")
+        assert recorded_tool.calls == 2
+
+        # A failed search is not cached
+        tools["market_research_analyst"].run(query="unrecorded query")
+        tools["market_research_analyst"].run(query="unrecorded query")
+        assert recorded_tool.calls == 4
+
+        # Offline mode: a miss never reaches the tool
+        os.environ["SEARCH_CACHE_OFFLINE"] = "1"
+        try:
+            offline = tools["product_evaluator_1"].run(query="another unrecorded query")
+            cached = tools["product_evaluator_1"].run(query="conversational AI social robots market size")
+        finally:
+            del os.environ["SEARCH_CACHE_OFFLINE"]
+        assert isinstance(offline, str) and offline.startswith("Error")
+        assert cached == first
+        assert recorded_tool.calls == 4
+
+    stats = get_search_cache_stats()
+    for agent_label, agent_stats in stats.items():
+        print(f"  - {agent_label}: {agent_stats}")
+    assert stats["product_evaluator_1"]["hits"] == 2
+    assert stats["product_research_analyst"]["hit_rate"] == 0.5
+    assert stats["market_research_analyst"]["hits"] == 0
+    print("✓ Repeated searches are served from the cache")
+
+
+def test_concurrent_searches_are_coalesced():
+    """
+    Eight crew copies search for the same market terms at the same moment.
+    """
+    print("\n=== Test: Single-flight coalescing of concurrent identical searches ===")
+    reset_search_cache_stats()
+    recorded_tool = RecordedSearchTool(latency_s=0.5)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tools = [
+            CachedSearchTool.wrap(recorded_tool, agent_label="market_research_analyst", cache_dir=cache_dir)
+            for _ in range(8)  # One wrapper per crew copy, as crew.copy() would produce
+        ]
+        queries = ["market size conversational AI social robots", "Conversational AI social robots: market size"] * 4
+
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda args: args[0].run(query=args[1]), zip(tools, queries)))
+        duration = time.monotonic() - start_time
+
+    assert recorded_tool.calls == 1
+    assert all(r == results[0] for r in results)
+    stats = get_search_cache_stats()["market_research_analyst"]
+    assert stats["misses"] == 1 and stats["hits"] + stats["coalesced"] == 7
+    print(f"✓ 8 concurrent searches, 1 tool call, {duration:.2f}s ({stats})")
+
+
+if __name__ == "__main__":
+    test_search_cache_offline()
+    test_concurrent_searches_are_coalesced()